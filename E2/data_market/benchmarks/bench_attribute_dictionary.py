@@ -0,0 +1,133 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+CLEAN_DATA_PATH = os.path.join("..", "outputs", "products_clean.csv")
+
+# Disposition antérieure de product_attributes : clé et valeur textuelles sur chaque ligne
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE product_attributes (
+        product_id INTEGER NOT NULL,
+        attribute_key TEXT NOT NULL,
+        attribute_value TEXT
+    );
+    """,
+    "CREATE INDEX idx_attributes_product ON product_attributes(product_id);",
+    "CREATE INDEX idx_attributes_key ON product_attributes(attribute_key);"
+]
+
+# Filtre sur deux attributs (Composition contient Polyester, Origin = Imported)
+LEGACY_FILTER_SQL = """
+SELECT a1.product_id
+FROM product_attributes a1
+JOIN product_attributes a2 ON a2.product_id = a1.product_id
+WHERE a1.attribute_key = 'Composition' AND a1.attribute_value LIKE '%Polyester%'
+  AND a2.attribute_key = 'Origin' AND a2.attribute_value = 'Imported';
+"""
+
+DICTIONARY_FILTER_SQL = """
+SELECT a1.product_id
+FROM product_attributes a1
+JOIN attribute_values v1 ON v1.value_id = a1.value_id
+JOIN product_attributes a2
+  ON a2.product_id = a1.product_id
+ AND a2.key_id = (SELECT key_id FROM attribute_keys WHERE attribute_key = 'Origin')
+WHERE a1.key_id = (SELECT key_id FROM attribute_keys WHERE attribute_key = 'Composition')
+  AND v1.attribute_value LIKE '%Polyester%'
+  AND a2.value_id = (SELECT value_id FROM attribute_values WHERE attribute_value = 'Imported');
+"""
+
+COMPATIBILITY_FILTER_SQL = LEGACY_FILTER_SQL.replace("product_attributes", "view_product_attributes")
+
+
+def build_attributes(split_tables, copies):
+    df = pd.read_csv(CLEAN_DATA_PATH)
+    df = pd.concat([df] * copies, ignore_index=True)
+    df["url"] = df["url"] + "#" + (df.index // (len(df) // copies)).astype(str)
+
+    brands = split_tables.create_brands_table(df)
+    categories = split_tables.create_categories_table(df)
+    _, products_full = split_tables.create_products_table(df, brands, categories)
+    return split_tables.create_product_attributes_table(products_full, workers=1)
+
+
+def load_legacy(split_tables, db_path, attributes):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    split_tables.apply_load_pragmas(conn)
+    conn.execute("BEGIN;")
+    conn.execute(LEGACY_SCHEMA[0])
+    split_tables.bulk_insert(conn, "product_attributes", attributes)
+    conn.execute("COMMIT;")
+    for index_sql in LEGACY_SCHEMA[1:]:
+        conn.execute(index_sql)
+    return conn
+
+
+def load_dictionary(split_tables, db_path, attributes):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    split_tables.apply_load_pragmas(conn)
+    split_tables.create_database_schema(conn)
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("BEGIN;")
+    split_tables.load_product_attributes(conn, attributes)
+    conn.execute("COMMIT;")
+    split_tables.create_indexes(conn)
+    split_tables.create_business_views(conn)
+    return conn
+
+
+def measure(loader, split_tables, db_path, attributes, queries, repeats):
+    conn, load_time = timed(loader, split_tables, db_path, attributes)
+    conn.execute("VACUUM;")
+    conn.execute("ANALYZE;")
+
+    latencies = {}
+    for label, sql in queries.items():
+        matches = len(conn.execute(sql).fetchall())
+        latency = statistics.median(timed(lambda: conn.execute(sql).fetchall())[1] for _ in range(repeats)) * 1000
+        latencies[label] = (matches, latency)
+    conn.close()
+
+    return load_time, os.path.getsize(db_path) / 1024 ** 2, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dictionnaire d'attributs : taille et filtre par attribut")
+    parser.add_argument("--copies", type=int, default=100, help="Nombre de copies de l'échantillon nettoyé")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    split_tables = load_script("02_split_tables.py")
+    split_tables.logger.setLevel("WARNING")
+    attributes = build_attributes(split_tables, args.copies)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy = measure(
+            load_legacy, split_tables, os.path.join(tmp_dir, "legacy.db"), attributes,
+            {"Texte (avant)": LEGACY_FILTER_SQL}, args.repeats
+        )
+        dictionary = measure(
+            load_dictionary, split_tables, os.path.join(tmp_dir, "dictionary.db"), attributes,
+            {"Identifiants (après)": DICTIONARY_FILTER_SQL, "Vue de compatibilité": COMPATIBILITY_FILTER_SQL},
+            args.repeats
+        )
+
+    print_header(f"product_attributes : {len(attributes):,} attributs")
+    print(f"{'Disposition':<24}{'Chargement (s)':>16}{'Taille (Mo)':>14}")
+    print(f"{'Texte (avant)':<24}{legacy[0]:>16.2f}{legacy[1]:>14.1f}")
+    print(f"{'Dictionnaire (après)':<24}{dictionary[0]:>16.2f}{dictionary[1]:>14.1f}")
+
+    print(f"\n{'Filtre Composition + Origin':<28}{'Produits':>10}{'Latence (ms)':>14}")
+    for label, (matches, latency) in {**legacy[2], **dictionary[2]}.items():
+        print(f"{label:<28}{matches:>10,}{latency:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+PRODUCT_TYPES = ["ski", "hiking", "running", "cycling", "swimming", "camping", "tennis", "fitness", "kayak", "climbing"]
+ITEMS = ["jacket", "pants", "shoes", "base-layer", "backpack", "gloves", "tent", "helmet", "socks", "t-shirt"]
+GENDER_PREFIXES = ["", "mens-", "womens-", "kids-"]
+BASE_URL = "https://decathlon-usa.myshopify.com/products/"
+
+
+def generate_urls(n_rows, n_slugs, seed=42):
+    rng = np.random.default_rng(seed)
+
+    slugs = np.array([
+        f"{rng.choice(GENDER_PREFIXES)}{rng.choice(PRODUCT_TYPES)}-{rng.choice(ITEMS)}-{i}"
+        for i in range(n_slugs)
+    ], dtype=object)
+    urls = np.array([f"{BASE_URL}{slug}?adept-product={slug}" for slug in slugs], dtype=object)
+    urls[:: max(n_slugs // 100, 1)] = "https://decathlon-usa.myshopify.com/collections/sale"
+
+    urls = pd.Series(urls[rng.integers(0, n_slugs, size=n_rows)], dtype=object)
+    urls[rng.random(n_rows) < 0.001] = np.nan
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction des catégories : apply vs vectorisé")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--slugs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    cleaning = load_script("01_load_and_clean.py")
+
+    print_header(f"Extraction des catégories sur {args.rows:,} URLs ({args.slugs:,} slugs distincts)")
+    urls, generation_time = timed(generate_urls, args.rows, args.slugs)
+    print(f"Génération des URLs synthétiques : {generation_time:.2f} s")
+
+    expected, apply_time = timed(urls.apply, cleaning.extract_category_from_url)
+    print(f"apply(extract_category_from_url)  : {apply_time:.2f} s")
+
+    cleaning._category_cache.clear()
+    cold, cold_time = timed(cleaning.extract_categories, urls)
+    print(f"extract_categories (cache froid)  : {cold_time:.2f} s  (x{apply_time / cold_time:.1f})")
+
+    warm, warm_time = timed(cleaning.extract_categories, urls)
+    print(f"extract_categories (cache chaud)  : {warm_time:.2f} s  (x{apply_time / warm_time:.1f})")
+
+    if not (expected.equals(cold) and expected.equals(warm)):
+        raise AssertionError("Les catégories vectorisées diffèrent de extract_category_from_url")
+    print("Résultats identiques à extract_category_from_url")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+CLEAN_DATA_PATH = os.path.join("..", "outputs", "products_clean.csv")
+TABLE_NAMES = ["brands", "categories", "products", "reviews", "product_attributes", "product_fingerprints"]
+
+
+def build_tables(split_tables, copies):
+    df = pd.read_csv(CLEAN_DATA_PATH)
+    df = pd.concat([df] * copies, ignore_index=True)
+    df["url"] = df["url"] + "#" + (df.index // (len(df) // copies)).astype(str)
+
+    brands = split_tables.create_brands_table(df)
+    categories = split_tables.create_categories_table(df)
+    products, products_full = split_tables.create_products_table(df, brands, categories)
+    fingerprints = split_tables.create_fingerprints_table(df, products_full)
+    reviews = split_tables.create_reviews_table(products_full)
+    attributes = split_tables.create_product_attributes_table(products_full)
+
+    return dict(zip(TABLE_NAMES, [brands, categories, products, reviews, attributes, fingerprints]))
+
+
+def load_with_to_sql(db_path, tables):
+    conn = sqlite3.connect(db_path)
+    timings = {}
+    for table_name, df in tables.items():
+        timings[table_name] = timed(df.to_sql, table_name, conn, if_exists="replace", index=False)[1]
+    conn.close()
+    return timings
+
+
+def load_with_bulk_loader(split_tables, db_path, tables):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    split_tables.apply_load_pragmas(conn)
+    split_tables.create_database_schema(conn)
+
+    timings = {}
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("BEGIN;")
+    for table_name, df in tables.items():
+        if table_name == "product_attributes":
+            # Clés et valeurs encodées dans les dictionnaires attribute_keys / attribute_values
+            timings[table_name] = timed(split_tables.load_product_attributes, conn, df)[1]
+        else:
+            timings[table_name] = timed(split_tables.bulk_insert, conn, table_name, df)[1]
+    conn.execute("COMMIT;")
+    check_time = timed(split_tables.check_foreign_keys, conn)[1]
+    conn.close()
+    return timings, check_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chargement SQLite : to_sql vs chargeur bulk")
+    parser.add_argument("--copies", type=int, default=100, help="Nombre de copies de l'échantillon nettoyé")
+    args = parser.parse_args()
+
+    split_tables = load_script("02_split_tables.py")
+    split_tables.logger.setLevel("WARNING")
+    tables = build_tables(split_tables, args.copies)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        to_sql_timings = load_with_to_sql(os.path.join(tmp_dir, "to_sql.db"), tables)
+        bulk_timings, check_time = load_with_bulk_loader(split_tables, os.path.join(tmp_dir, "bulk.db"), tables)
+
+    print_header(f"Chargement SQLite ({len(tables['products']):,} produits)")
+    print(f"{'Table':<22}{'Lignes':>12}{'to_sql (l/s)':>16}{'bulk (l/s)':>16}{'Gain':>8}")
+    for table_name, df in tables.items():
+        to_sql_rate = len(df) / to_sql_timings[table_name]
+        bulk_rate = len(df) / bulk_timings[table_name]
+        print(f"{table_name:<22}{len(df):>12,}{to_sql_rate:>16,.0f}{bulk_rate:>16,.0f}{bulk_rate / to_sql_rate:>7.1f}x")
+
+    print(f"\nTotal to_sql : {sum(to_sql_timings.values()):.2f} s")
+    print(f"Total bulk   : {sum(bulk_timings.values()):.2f} s + {check_time:.2f} s de vérification des clés étrangères")
+
+
+if __name__ == "__main__":
+    main()
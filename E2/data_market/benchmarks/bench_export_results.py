@@ -0,0 +1,77 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from bench_query_pool import build_database
+from bench_utils import load_script, print_header
+
+import instrumentation
+
+CATALOG_SQL = "SELECT * FROM view_catalog ORDER BY product_id LIMIT :limit;"
+
+
+def export_with_excel_writer(service, path):
+    # Chemin précédent de 03 : DataFrame complet puis classeur openpyxl en mémoire
+    df = service.run("Catalogue", use_cache=False)
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name="Catalogue", index=False)
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export d'un résultat volumineux : ExcelWriter vs export en flux")
+    parser.add_argument("--db", default=None, help="Base interrogée (défaut : base synthétique construite avec --rows)")
+    parser.add_argument("--rows", type=int, default=200_000, help="Lignes brutes de la base synthétique")
+    parser.add_argument(
+        "--legacy-max-rows", type=int, default=200_000,
+        help="Au-delà de ce volume, le chemin pandas + openpyxl n'est pas mesuré (trop lent)"
+    )
+    args = parser.parse_args()
+
+    export_results = load_script("export_results.py")
+    query_service = load_script("query_service.py")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db or build_database(args.rows, tmp_dir)
+        service = query_service.QueryService(db_path, registry={})
+        service.register("Catalogue", CATALOG_SQL, limit=-1)
+        service.register("Catalogue_Count", "SELECT COUNT(*) FROM view_catalog;")
+
+        exports = [
+            ("xlsx en flux", 'xlsx', os.path.join(tmp_dir, "export.xlsx")),
+            ("csv", 'csv', os.path.join(tmp_dir, "csv")),
+            ("parquet", 'parquet', os.path.join(tmp_dir, "parquet"))
+        ]
+        results = {}
+        metrics_path = os.path.join(tmp_dir, "metrics.jsonl")
+        with instrumentation.pipeline_run("bench_export", metrics_path=metrics_path) as run:
+            if service.run("Catalogue_Count", use_cache=False).iloc[0, 0] <= args.legacy_max_rows:
+                legacy_path = os.path.join(tmp_dir, "legacy.xlsx")
+                with instrumentation.step("pandas + openpyxl") as metrics:
+                    metrics.rows_out = export_with_excel_writer(service, legacy_path)
+                results["pandas + openpyxl"] = os.path.getsize(legacy_path)
+
+            for label, output_format, path in exports:
+                with instrumentation.step(label) as metrics:
+                    row_counts = export_results.export_query_results(service, ["Catalogue"], path, output_format)
+                    metrics.rows_out = row_counts["Catalogue"]
+                file_path = path if output_format == 'xlsx' else os.path.join(path, f"Catalogue.{output_format}")
+                results[label] = os.path.getsize(file_path)
+
+        service.close()
+
+    summary = instrumentation.summarize(run.records)
+    print_header(f"Export de view_catalog ({summary[exports[0][0]]['rows_out']:,} lignes)")
+    print(f"{'Méthode':<22}{'Durée (s)':>11}{'Lignes/s':>12}{'+Pic (Mo)':>11}{'Fichier (Mo)':>14}")
+    for label, size in results.items():
+        step = summary[label]
+        print(
+            f"{label:<22}{step['wall_s']:>11.2f}{step['rows_out'] / step['wall_s']:>12,.0f}"
+            f"{step['peak_delta_mb']:>11.1f}{size / 1024 ** 2:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+# Attributs synthétiques : (clé, nombre de valeurs distinctes, part des produits renseignés)
+ATTRIBUTES = [
+    ("Origin", 6, 1.0),
+    ("Composition", 400, 0.95),
+    ("Storage instructions", 12, 0.3),
+    ("Product testing", 60, 0.6),
+    ("Gender", 4, 0.8),
+    ("Season", 5, 0.7),
+    ("Sport", 40, 0.9),
+    ("Size range", 25, 0.85)
+]
+FIBRES = ["Polyester", "Cotton", "Elastane", "Polyamide", "Wool", "Merino", "Nylon", "Viscose"]
+
+FILTER_SETS = {
+    "1 filtre": {"Origin": "Imported"},
+    "2 filtres": {"Origin": "Imported", "Composition": ("CONTAINS", "polyester")},
+    "3 filtres": {"Origin": "Imported", "Composition": ("CONTAINS", "polyester"), "Gender": "Women"},
+    "4 filtres": {
+        "Origin": "Imported", "Composition": ("CONTAINS", "polyester"), "Gender": "Women", "Season": "Winter"
+    }
+}
+
+
+def attribute_value(key, position):
+    if key == "Origin":
+        return ["Imported", "Made in France", "Made in Vietnam", "Made in China", "Made in India", "Made in Portugal"][position]
+    if key == "Composition":
+        first, second = FIBRES[position % len(FIBRES)], FIBRES[(position // len(FIBRES) + 1) % len(FIBRES)]
+        return f"Main fabric: {100 - position % 50}% {first}, {position % 50}% {second} (variant {position})"
+    if key == "Gender":
+        return ["Women", "Men", "Kids", "Unisex"][position]
+    if key == "Season":
+        return ["Winter", "Summer", "Spring", "Autumn", "All seasons"][position]
+    return f"{key} {position}"
+
+
+def build_catalog(split_tables, db_path, n_products, seed=0):
+    rng = np.random.default_rng(seed)
+    product_ids = np.arange(1, n_products + 1)
+
+    frames = []
+    for key, cardinality, coverage in ATTRIBUTES:
+        covered = product_ids[rng.random(n_products) < coverage]
+        weights = 1.0 / np.arange(1, cardinality + 1)
+        positions = rng.choice(cardinality, size=len(covered), p=weights / weights.sum())
+        values = np.array([attribute_value(key, position) for position in range(cardinality)], dtype=object)
+        frames.append(pd.DataFrame({'product_id': covered, 'attribute_key': key, 'attribute_value': values[positions]}))
+    attributes = pd.concat(frames, ignore_index=True)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    split_tables.apply_load_pragmas(conn)
+    split_tables.create_database_schema(conn)
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("BEGIN;")
+    split_tables.bulk_insert(conn, "products", pd.DataFrame({
+        'product_id': product_ids,
+        'name': [f"Produit {i}" for i in product_ids],
+        'url': [f"https://example.com/products/item-{i}" for i in product_ids]
+    }))
+    split_tables.load_product_attributes(conn, attributes)
+    conn.execute("COMMIT;")
+    split_tables.create_indexes(conn)
+    split_tables.create_business_views(conn)
+
+    conn.execute("BEGIN;")
+    _, postings_time = timed(split_tables.refresh_attribute_postings, conn)
+    conn.execute("COMMIT;")
+    conn.execute("ANALYZE;")
+    conn.close()
+
+    return len(attributes), postings_time
+
+
+def self_join_sql(filters):
+    # Une auto-jointure par attribut filtré sur la vue de compatibilité
+    joins, conditions, params = [], [], []
+    for position, (key, condition) in enumerate(filters.items()):
+        operator, value = condition if isinstance(condition, tuple) else ('=', condition)
+        alias = f"a{position}"
+        if position > 0:
+            joins.append(f"JOIN view_product_attributes {alias} ON {alias}.product_id = a0.product_id")
+        conditions.append(f"{alias}.attribute_key = ?")
+        params.append(key)
+        if operator == 'CONTAINS':
+            conditions.append(f"{alias}.attribute_value LIKE ?")
+            params.append(f"%{value}%")
+        else:
+            conditions.append(f"{alias}.attribute_value = ?")
+            params.append(value)
+
+    sql = f"""
+    SELECT a0.product_id
+    FROM view_product_attributes a0
+    {' '.join(joins)}
+    WHERE {' AND '.join(conditions)};
+    """
+    return sql, params
+
+
+def median_ms(func, repeats):
+    return statistics.median(timed(func)[1] for _ in range(repeats)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recherche à facettes : index inversés vs auto-jointures SQL")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    split_tables = load_script("02_split_tables.py")
+    split_tables.logger.setLevel("WARNING")
+    facet_search = load_script("facet_search.py")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "facets.db")
+        attribute_rows, postings_time = build_catalog(split_tables, db_path, args.products)
+
+        index = facet_search.FacetIndex(db_path)
+        _, warm_time = timed(lambda: [index.key_postings(key) for key, _, _ in ATTRIBUTES])
+
+        conn = sqlite3.connect(db_path)
+        rows = []
+        for label, filters in FILTER_SETS.items():
+            sql, params = self_join_sql(filters)
+            sql_matches = len(conn.execute(sql, params).fetchall())
+            sql_ms = median_ms(lambda: conn.execute(sql, params).fetchall(), args.repeats)
+            index_matches = len(index.filter(filters))
+            index_ms = median_ms(lambda: index.filter(filters), args.repeats)
+            facets_ms = median_ms(lambda: index.facet_counts(filters, keys=[key for key, _, _ in ATTRIBUTES]), args.repeats)
+            rows.append((label, sql_matches, index_matches, sql_ms, index_ms, facets_ms))
+        conn.close()
+        index.close()
+
+    print_header(f"Recherche à facettes sur {args.products:,} produits ({attribute_rows:,} attributs)")
+    print(f"Construction des index inversés : {postings_time:.2f} s, chargement en mémoire : {warm_time:.2f} s\n")
+    print(f"{'Filtres':<12}{'Produits':>10}{'SQL (ms)':>12}{'Index (ms)':>12}{'Facettes (ms)':>16}{'Identiques':>12}")
+    for label, sql_matches, index_matches, sql_ms, index_ms, facets_ms in rows:
+        same = "oui" if sql_matches == index_matches else "non"
+        print(f"{label:<12}{index_matches:>10,}{sql_ms:>12.1f}{index_ms:>12.2f}{facets_ms:>16.1f}{same:>12}")
+    print(f"\nFacettes : comptage par valeur des {len(ATTRIBUTES)} attributs parmi les produits filtrés.")
+
+
+if __name__ == "__main__":
+    main()
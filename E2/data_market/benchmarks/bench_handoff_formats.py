@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+CLEAN_DATA_PATH = os.path.join("..", "outputs", "products_clean.csv")
+PROJECTED_COLUMNS = ["brand", "category", "rating", "review_count", "popularity_score"]
+
+
+def build_clean_data(copies):
+    df = pd.read_csv(CLEAN_DATA_PATH)
+    df = pd.concat([df] * copies, ignore_index=True)
+    df["url"] = df["url"] + "#" + (df.index // (len(df) // copies)).astype(str)
+    return df
+
+
+def measure_format(clean, split_tables, df, output_path, output_format):
+    write_time = timed(clean.export_data, df, output_path, output_format)[1]
+    full, read_time = timed(split_tables.load_clean_data, output_path, split_tables.CLEAN_DATA_COLUMNS)
+    projected, projected_time = timed(split_tables.load_clean_data, output_path, PROJECTED_COLUMNS)
+
+    return {
+        "write": write_time,
+        "size": os.path.getsize(output_path),
+        "read": read_time,
+        "memory": full.memory_usage(deep=True).sum(),
+        "projected_read": projected_time,
+        "projected_memory": projected.memory_usage(deep=True).sum(),
+        "dtypes": full.dtypes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du passage 01 -> 02 : CSV vs Parquet")
+    parser.add_argument("--copies", type=int, default=100, help="Nombre de copies de l'échantillon nettoyé")
+    args = parser.parse_args()
+
+    clean = load_script("01_load_and_clean.py")
+    split_tables = load_script("02_split_tables.py")
+    clean.logger.setLevel("WARNING")
+    split_tables.logger.setLevel("WARNING")
+    clean.require_pyarrow()
+
+    df = build_clean_data(args.copies)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {
+            output_format: measure_format(
+                clean, split_tables, df, os.path.join(tmp_dir, f"products_clean.{output_format}"), output_format
+            )
+            for output_format in clean.OUTPUT_FORMATS
+        }
+
+    csv, parquet = results["csv"], results["parquet"]
+    print_header(f"Passage 01 -> 02 ({len(df):,} produits)")
+    print(f"{'Mesure':<36}{'CSV':>14}{'Parquet':>14}{'Gain':>8}")
+    rows = [
+        ("Écriture (s)", "write", "{:.2f}"),
+        ("Taille (Mo)", "size", "{:.1f}"),
+        ("Lecture complète (s)", "read", "{:.2f}"),
+        ("Mémoire lecture complète (Mo)", "memory", "{:.1f}"),
+        (f"Lecture de {len(PROJECTED_COLUMNS)} colonnes (s)", "projected_read", "{:.3f}"),
+        ("Mémoire lecture projetée (Mo)", "projected_memory", "{:.1f}")
+    ]
+    for label, key, fmt in rows:
+        scale = 1024 * 1024 if key in ("size", "memory", "projected_memory") else 1
+        csv_value, parquet_value = csv[key] / scale, parquet[key] / scale
+        print(
+            f"{label:<36}{fmt.format(csv_value):>14}{fmt.format(parquet_value):>14}"
+            f"{csv_value / parquet_value:>7.1f}x"
+        )
+
+    print("\nTypes relus :")
+    for column in split_tables.CLEAN_DATA_COLUMNS:
+        print(f"  {column:<20}{str(csv['dtypes'][column]):>12}{str(parquet['dtypes'][column]):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
+
+from bench_query_pool import DB_PATH, build_database
+from bench_utils import load_script, print_header
+
+PAGE_LIMIT = 100
+
+# Requêtes variées : sans cache de réponses, chacune est exécutée par SQLite
+REQUEST_PATHS = [
+    "/views/view_catalog?limit=50",
+    "/views/view_catalog?price_sale__lte=30&order_by=price_sale&limit=50",
+    "/views/view_top_products?rating__gte=4.5&order_by=review_count&desc=1&limit=20",
+    "/views/view_promotions?order_by=computed_discount_pct&desc=1&limit=20",
+    "/views/view_category_stats?order_by=total_reviews&desc=1&limit=10",
+    "/views/view_brand_stats?fields=brand,avg_rating&limit=25"
+]
+
+
+def start_server(http_service):
+    # Serveur dans sa propre boucle asyncio, sur un thread dédié, port choisi par le système
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(http_service.start(port=0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop, server, server.sockets[0].getsockname()[1]
+
+
+def stop_server(loop, server):
+    async def shutdown():
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+async def http_get(reader, writer, path, headers=None):
+    extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode("latin-1"))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length, etag = 0, None
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "etag":
+            etag = value.strip()
+    body = await reader.readexactly(length)
+    return status, etag, body
+
+
+async def load(port, paths, connections, requests, expected_status, headers=None):
+    async def client(index):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for number in range(requests):
+            path = paths[(index + number) % len(paths)]
+            status = (await http_get(reader, writer, path, headers.get(path) if headers else None))[0]
+            if status != expected_status:
+                raise RuntimeError(f"{path} : statut {status} (attendu {expected_status})")
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(connections)))
+    return connections * requests / (time.perf_counter() - start)
+
+
+async def collect_etags(port, paths):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {path: (await http_get(reader, writer, path))[1] for path in paths}
+    writer.close()
+    return {path: {'If-None-Match': etag} for path, etag in etags.items()}
+
+
+async def walk_pages(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    pages, cursor, page_times = 0, None, []
+    while True:
+        path = f"/views/view_catalog?limit={PAGE_LIMIT}" + (f"&cursor={cursor}" if cursor else "")
+        start = time.perf_counter()
+        body = (await http_get(reader, writer, path))[2]
+        page_times.append(time.perf_counter() - start)
+        pages += 1
+        cursor = json.loads(body)['next_cursor']
+        if cursor is None:
+            break
+    writer.close()
+    return pages, page_times
+
+
+def offset_page_time(service, offset):
+    # Équivalent OFFSET de la même page : SQLite lit et saute toutes les lignes qui la précèdent
+    sql = f"SELECT * FROM view_catalog ORDER BY product_id LIMIT {PAGE_LIMIT} OFFSET {offset};"
+    start = time.perf_counter()
+    with service.pool.connection() as conn:
+        conn.execute(sql).fetchall()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du service HTTP local : cache, ETag et pagination par curseur")
+    parser.add_argument("--db", default=DB_PATH, help="Base interrogée (ignorée avec --rows)")
+    parser.add_argument("--rows", type=int, default=None, help="Construit une base synthétique de N lignes brutes")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 8, 32], help="Connexions HTTP simultanées")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes envoyées par connexion")
+    args = parser.parse_args()
+
+    http_module = load_script("http_service.py")
+    query_service = load_script("query_service.py")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db if args.rows is None else build_database(args.rows, tmp_dir)
+        service = query_service.QueryService(db_path)
+        cached = http_module.ViewHttpService(service)
+        uncached = http_module.ViewHttpService(service, cache_ttl=0)
+        servers = [start_server(cached), start_server(uncached)]
+        cached_port, uncached_port = servers[0][2], servers[1][2]
+
+        etags = asyncio.run(collect_etags(cached_port, REQUEST_PATHS))
+        results = {}
+        for connections in args.connections:
+            scenarios = [
+                ("sans cache (SQLite)", uncached_port, 200, None),
+                ("cache de réponses", cached_port, 200, None),
+                ("If-None-Match (304)", cached_port, 304, etags)
+            ]
+            for label, port, status, headers in scenarios:
+                results[(connections, label)] = asyncio.run(
+                    load(port, REQUEST_PATHS, connections, args.requests, status, headers)
+                )
+
+        pages, page_times = asyncio.run(walk_pages(uncached_port))
+        offset_first = offset_page_time(service, 0)
+        offset_last = offset_page_time(service, (pages - 1) * PAGE_LIMIT)
+
+        for loop, server, _ in servers:
+            stop_server(loop, server)
+        cached.close()
+        uncached.close()
+        service.close()
+
+    print_header(f"Service HTTP sur {db_path} ({args.requests} requêtes par connexion, {len(REQUEST_PATHS)} URL)")
+    print(f"{'Connexions':>11}  {'Scénario':<24}{'Requêtes/s':>12}")
+    for (connections, label), throughput in results.items():
+        print(f"{connections:>11}  {label:<24}{throughput:>12,.0f}")
+
+    print(f"\nParcours complet de view_catalog par curseur ({pages} pages de {PAGE_LIMIT}, requête HTTP comprise) :")
+    print(f"  curseur : première page {page_times[0] * 1000:.2f} ms, dernière {page_times[-1] * 1000:.2f} ms")
+    print(f"  OFFSET (SQL seul) : première page {offset_first * 1000:.2f} ms, dernière {offset_last * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
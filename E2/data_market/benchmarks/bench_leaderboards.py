@@ -0,0 +1,81 @@
+import argparse
+import sqlite3
+import statistics
+import tempfile
+
+import pandas as pd
+
+from bench_query_pool import build_database
+from bench_utils import load_script, print_header, timed
+
+# Équivalent « tri à la lecture » d'un classement : tri de view_top_products à chaque appel
+SORT_ON_READ_SQL = """
+SELECT product_id, name, brand, category, rating, review_count, popularity_score
+FROM view_top_products
+WHERE rating IS NOT NULL {where}
+ORDER BY rating DESC, review_count DESC, product_id
+LIMIT ?;
+"""
+
+
+def sort_on_read(conn, limit, category=None, brand=None):
+    if category is not None:
+        return pd.read_sql_query(SORT_ON_READ_SQL.format(where="AND category = ?"), conn, params=[category, limit])
+    if brand is not None:
+        return pd.read_sql_query(SORT_ON_READ_SQL.format(where="AND brand = ?"), conn, params=[brand, limit])
+    return pd.read_sql_query(SORT_ON_READ_SQL.format(where=""), conn, params=[limit])
+
+
+def total_latency(func, repeats, calls):
+    # Durée médiane d'un balayage complet (tous les classements demandés), en millisecondes
+    return statistics.median(
+        timed(lambda: [func(**call) for call in calls])[1] for _ in range(repeats)
+    ) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark classements : product_rankings vs tri de view_top_products")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    query_service = load_script("query_service.py")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = build_database(args.rows, tmp_dir)
+
+        conn = sqlite3.connect(db_path)
+        categories = [row[0] for row in conn.execute("SELECT category FROM categories ORDER BY category;")]
+        brands = [row[0] for row in conn.execute("SELECT brand FROM brands ORDER BY brand;")]
+        ranking_rows = conn.execute("SELECT COUNT(*) FROM product_rankings;").fetchone()[0]
+
+        calls = [{}] + [{'category': name} for name in categories] + [{'brand': name} for name in brands]
+        service = query_service.QueryService(db_path)
+
+        # Même contenu attendu pour les deux chemins (classement par note)
+        mismatches = sum(
+            not sort_on_read(conn, args.limit, **call)['name'].tolist()
+            == service.leaderboard('rating', limit=args.limit, use_cache=False, **call)['name'].tolist()
+            for call in calls
+        )
+
+        sort_ms = total_latency(lambda **call: sort_on_read(conn, args.limit, **call), args.repeats, calls)
+        table_ms = total_latency(
+            lambda **call: service.leaderboard('rating', limit=args.limit, use_cache=False, **call), args.repeats, calls
+        )
+
+        service.close()
+        conn.close()
+
+    print_header(f"Classements top {args.limit} sur {args.rows:,} lignes brutes")
+    print(f"{len(calls)} classements (global, {len(categories)} catégories, {len(brands)} marques)")
+    print(f"product_rankings : {ranking_rows:,} lignes\n")
+    print(f"{'Chemin':<32}{'Total (ms)':>12}{'Par classement (ms)':>22}")
+    for label, elapsed in (("Tri de view_top_products", sort_ms), ("Lecture de product_rankings", table_ms)):
+        print(f"{label:<32}{elapsed:>12.1f}{elapsed / len(calls):>22.2f}")
+    print(f"\nClassements différents entre les deux chemins : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
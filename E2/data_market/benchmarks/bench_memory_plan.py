@@ -0,0 +1,98 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+RAW_DATA_PATH = os.path.join("..", "data", "decathlon_webscrapped_raw.csv")
+
+VARIANTS = {
+    "object": {"compact": False, "lazy_text": False},
+    "compact": {"compact": True, "lazy_text": False},
+    "compact + lazy-text": {"compact": True, "lazy_text": True}
+}
+
+
+def build_raw_data(path, copies):
+    df = pd.read_csv(RAW_DATA_PATH)
+    df = pd.concat([df] * copies, ignore_index=True)
+    # Suffixe par copie : le parseur CSV partage les chaînes identiques, des textes répétés
+    # sous-estimeraient la mémoire des colonnes texte
+    suffix = "#" + (df.index // (len(df) // copies)).astype(str)
+    for col in ["product_url", "product information", "description"]:
+        df[col] = df[col] + suffix
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+def peak_rss_kb():
+    # Sous Linux, ru_maxrss conserve après exec() le pic du processus parent (ici gonflé par
+    # la génération du CSV) : VmHWM ne mesure que l'image courante
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_variant(variant, input_path, output_path):
+    clean = load_script("01_load_and_clean.py")
+    clean.logger.setLevel("WARNING")
+    quarantine_path = os.path.splitext(output_path)[0] + "_quarantine.csv"
+    elapsed = timed(
+        clean.run_batch_pipeline, input_path, output_path, quarantine_path=quarantine_path, **VARIANTS[variant]
+    )[1]
+    print(f"{elapsed} {peak_rss_kb()}")
+
+
+def measure_variant(variant, input_path, output_path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--variant", variant, "--input", input_path, "--output", output_path],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(output[0]), int(output[1]) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mémoire du nettoyage : types object vs plan compact")
+    parser.add_argument("--copies", type=int, default=200, help="Nombre de copies de l'échantillon brut")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.input, args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "raw.csv")
+        rows = build_raw_data(input_path, args.copies)
+        input_size = os.path.getsize(input_path) / 1024 ** 2
+
+        results = {}
+        for variant in VARIANTS:
+            output_path = os.path.join(tmp_dir, f"clean_{len(results)}.csv")
+            results[variant] = measure_variant(variant, input_path, output_path)
+
+        reference = open(os.path.join(tmp_dir, "clean_0.csv"), "rb").read()
+        identical = all(
+            open(os.path.join(tmp_dir, f"clean_{i}.csv"), "rb").read() == reference for i in range(1, len(VARIANTS))
+        )
+
+    print_header(f"Nettoyage en mode batch ({rows:,} lignes, CSV brut de {input_size:.0f} Mo)")
+    print(f"{'Variante':<24}{'Durée (s)':>12}{'Pic RSS (Mo)':>16}{'Gain RSS':>10}")
+    reference_peak = results["object"][1]
+    for variant, (elapsed, peak) in results.items():
+        print(f"{variant:<24}{elapsed:>12.2f}{peak:>16.0f}{reference_peak / peak:>9.1f}x")
+    print(f"\nFichiers produits identiques : {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import filecmp
+import os
+import tempfile
+
+from bench_utils import load_script, print_header, timed
+from synthetic_data import write_raw_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du nettoyage : mode batch vs mode parallèle")
+    parser.add_argument("--rows", type=int, default=500_000, help="Nombre de lignes du CSV brut synthétique")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Nombres de processus comparés"
+    )
+    args = parser.parse_args()
+
+    clean = load_script("01_load_and_clean.py")
+    clean.logger.setLevel("ERROR")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = write_raw_csv(os.path.join(tmp_dir, "raw.csv"), args.rows)
+        serial_path = os.path.join(tmp_dir, "serial.csv")
+        quarantine_path = os.path.join(tmp_dir, "quarantine.csv")
+        serial_time = timed(clean.run_batch_pipeline, input_path, serial_path, quarantine_path=quarantine_path)[1]
+
+        results = {}
+        for workers in args.workers:
+            output_path = os.path.join(tmp_dir, f"parallel_{workers}.csv")
+            elapsed = timed(
+                clean.run_parallel_pipeline, input_path, output_path, workers, quarantine_path=quarantine_path
+            )[1]
+            results[workers] = (elapsed, filecmp.cmp(serial_path, output_path, shallow=False))
+            os.remove(output_path)
+
+    print_header(f"Nettoyage de {args.rows:,} lignes synthétiques ({os.cpu_count()} cœurs disponibles)")
+    print(f"{'Mode':<24}{'Durée (s)':>12}{'Lignes/s':>14}{'Accélération':>14}{'Identique':>11}")
+    print(f"{'batch':<24}{serial_time:>12.2f}{args.rows / serial_time:>14,.0f}{1:>13.2f}x{'-':>11}")
+    for workers, (elapsed, identical) in results.items():
+        print(
+            f"{f'parallèle ({workers} proc.)':<24}{elapsed:>12.2f}{args.rows / elapsed:>14,.0f}"
+            f"{serial_time / elapsed:>13.2f}x{str(identical):>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
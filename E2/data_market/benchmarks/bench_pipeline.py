@@ -0,0 +1,235 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from bench_utils import load_script, print_header
+from synthetic_data import write_raw_csv
+
+import instrumentation
+
+BASELINE_PATH = "baseline.json"
+DEFAULT_SIZES = [10_000, 100_000]
+SEED = 0
+
+# Une étape n'est en régression que si elle dépasse la référence à la fois en relatif
+# (tolérance) et en absolu (seuil) : les étapes de quelques millisecondes sont trop bruitées
+TIME_TOLERANCE = 0.5
+MIN_TIME_REGRESSION_S = 0.05
+MEMORY_TOLERANCE = 0.5
+MIN_MEMORY_REGRESSION_MB = 20
+
+
+def result_checksum(df):
+    return f"{int(pd.util.hash_pandas_object(df, index=False).sum()):016x}"
+
+
+def run_clean_stage(clean, raw_path, clean_path):
+    df = clean.load_data(raw_path)
+    df = clean.remove_duplicates(df)
+    df = clean.clean_missing_values(df)
+    df = clean.rename_columns(df)
+    df = clean.convert_data_types(df)
+    df = clean.add_calculated_fields(df)
+    df = clean.compact_dtypes(df, log_memory=False)
+    df = clean.validate_data(df)
+    clean.export_data(df, clean_path)
+
+
+def run_split_stage(split_tables, clean_path, db_path, workers):
+    df = split_tables.load_clean_data(clean_path, columns=split_tables.CLEAN_DATA_COLUMNS)
+    brands = split_tables.create_brands_table(df)
+    categories = split_tables.create_categories_table(df)
+    products, products_full = split_tables.create_products_table(df, brands, categories)
+    fingerprints = split_tables.create_fingerprints_table(df, products_full)
+    reviews = split_tables.create_reviews_table(products_full)
+    attributes = split_tables.create_product_attributes_table(products_full, workers=workers)
+    variants = split_tables.create_product_variants_table(products_full)
+    split_tables.export_to_database(brands, categories, products, reviews, attributes, fingerprints, variants, db_path)
+
+
+def run_query_stage(query_service, db_path):
+    checksums = {}
+    service = query_service.QueryService(db_path)
+    for name in service.registry:
+        with instrumentation.step(f"query:{name}") as metrics:
+            df = service.run(name, use_cache=False)
+            metrics.rows_out = len(df)
+        checksums[f"query:{name}"] = result_checksum(df)
+    service.close()
+    return checksums
+
+
+def benchmark_size(size, tmp_dir, workers):
+    clean = load_script("01_load_and_clean.py")
+    split_tables = load_script("02_split_tables.py")
+    query_service = load_script("query_service.py")
+
+    raw_path = os.path.join(tmp_dir, f"raw_{size}.csv")
+    clean_path = os.path.join(tmp_dir, f"clean_{size}.csv")
+    db_path = os.path.join(tmp_dir, f"market_{size}.db")
+    write_raw_csv(raw_path, size, seed=SEED)
+
+    metrics_path = os.path.join(tmp_dir, "metrics.jsonl")
+    with instrumentation.pipeline_run(f"bench_{size}", metrics_path=metrics_path) as run:
+        run_clean_stage(clean, raw_path, clean_path)
+        run_split_stage(split_tables, clean_path, db_path, workers)
+        checksums = run_query_stage(query_service, db_path)
+
+    steps = {}
+    for name, step in instrumentation.summarize(run.records).items():
+        steps[name] = {
+            'depth': step['depth'],
+            'wall_s': round(step['wall_s'], 4),
+            'cpu_s': round(step['cpu_s'], 4),
+            'peak_delta_mb': step['peak_delta_mb'],
+            'rows_in': step['rows_in'],
+            'rows_out': step['rows_out']
+        }
+        if name in checksums:
+            steps[name]['checksum'] = checksums[name]
+
+    return steps
+
+
+def compare_to_baseline(results, baseline, time_tolerance, memory_tolerance):
+    """Renvoie (régressions, étapes sans référence) : une étape nouvelle n'est pas une régression."""
+    regressions = []
+    missing = []
+
+    for size, steps in results.items():
+        reference_steps = baseline.get('sizes', {}).get(str(size))
+        if reference_steps is None:
+            missing.append(f"{size:,} lignes (toutes les étapes)")
+            continue
+
+        for name, current in steps.items():
+            reference = reference_steps.get(name)
+            if reference is None:
+                missing.append(f"{size:,} lignes, {name}")
+                continue
+
+            for key in ('rows_in', 'rows_out', 'checksum'):
+                if reference.get(key) != current.get(key):
+                    regressions.append(
+                        f"{size:,} lignes, {name} : {key} = {current.get(key)} (référence {reference.get(key)})"
+                    )
+
+            time_limit = max(reference['wall_s'] * (1 + time_tolerance), reference['wall_s'] + MIN_TIME_REGRESSION_S)
+            if current['wall_s'] > time_limit:
+                regressions.append(
+                    f"{size:,} lignes, {name} : {current['wall_s']:.3f} s "
+                    f"(référence {reference['wall_s']:.3f} s, limite {time_limit:.3f} s)"
+                )
+
+            memory_limit = max(
+                reference['peak_delta_mb'] * (1 + memory_tolerance),
+                reference['peak_delta_mb'] + MIN_MEMORY_REGRESSION_MB
+            )
+            if current['peak_delta_mb'] > memory_limit:
+                regressions.append(
+                    f"{size:,} lignes, {name} : +{current['peak_delta_mb']:.1f} Mo de pic "
+                    f"(référence {reference['peak_delta_mb']:.1f} Mo, limite {memory_limit:.1f} Mo)"
+                )
+
+    return regressions, missing
+
+
+def print_results(size, steps, reference_steps):
+    print_header(f"Pipeline 01 -> 02 -> 03 sur {size:,} lignes synthétiques")
+    print(
+        f"{'Étape':<40}{'Mur (s)':>10}{'Réf. (s)':>10}{'Ratio':>8}{'+Pic (Mo)':>11}{'Réf. (Mo)':>11}{'Lignes out':>12}"
+    )
+    for name, step in steps.items():
+        reference = (reference_steps or {}).get(name)
+        label = ("  " * step['depth'] + name)[:39]
+        if reference:
+            ratio = step['wall_s'] / reference['wall_s'] if reference['wall_s'] > 0 else float("nan")
+            reference_columns = f"{reference['wall_s']:>10.3f}{ratio:>7.2f}x"
+            reference_memory = f"{reference['peak_delta_mb']:>11.1f}"
+        else:
+            reference_columns = f"{'-':>10}{'-':>8}"
+            reference_memory = f"{'-':>11}"
+        rows_out = "-" if step['rows_out'] is None else f"{step['rows_out']:,}"
+        print(
+            f"{label:<40}{step['wall_s']:>10.3f}{reference_columns}"
+            f"{step['peak_delta_mb']:>11.1f}{reference_memory}{rows_out:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline complet sur données synthétiques")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+        help="Tailles du CSV brut généré (ex. 10000 100000 1000000 10000000)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Processus pour l'extraction des attributs")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Fichier de référence JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistre les mesures comme nouvelle référence")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE, help="Dépassement relatif toléré (temps)")
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=MEMORY_TOLERANCE, help="Dépassement relatif toléré (mémoire)"
+    )
+    args = parser.parse_args()
+
+    for module in ("01_load_and_clean.py", "02_split_tables.py", "query_service.py"):
+        load_script(module)
+    for logger_name in ("script_01_load_and_clean", "script_02_split_tables", "instrumentation"):
+        logging.getLogger(logger_name).setLevel("ERROR")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            results[size] = benchmark_size(size, tmp_dir, args.workers)
+            print_results(size, results[size], baseline.get('sizes', {}).get(str(size)))
+
+    if args.update_baseline:
+        sizes = dict(baseline.get('sizes', {}))
+        sizes.update({str(size): steps for size, steps in results.items()})
+        baseline = {
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'machine': f"{platform.platform()} / Python {platform.python_version()} / {os.cpu_count()} CPU",
+            'seed': SEED,
+            'workers': args.workers,
+            'sizes': sizes
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nRéférence mise à jour : {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"\nAucune référence ({args.baseline}) : relancer avec --update-baseline pour l'enregistrer")
+        return
+
+    print(f"\nRéférence : {baseline.get('machine')} ({baseline.get('updated_at')})")
+    regressions, missing = compare_to_baseline(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if missing:
+        print(f"\nSans référence ({len(missing)}, non comparées) : relancer avec --update-baseline pour les enregistrer")
+        for step in missing:
+            print(f"  - {step}")
+    if regressions:
+        print("\n" + "!" * 80)
+        print(f"RÉGRESSIONS DÉTECTÉES ({len(regressions)}) :")
+        for regression in regressions:
+            print(f"  - {regression}")
+        print("!" * 80)
+        sys.exit(1)
+
+    print("Aucune régression par rapport à la référence")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bench_utils import load_script, print_header, timed
+
+START_DATE = datetime(2024, 1, 1)
+DROP_WINDOWS = [7, 30, 90]
+
+
+def daily_snapshots(n_products, days, change_rate, seed=0):
+    # Relevés quotidiens d'un catalogue fixe : chaque jour, une fraction des produits change de
+    # prix soldé (promotion ou retour au prix catalogue)
+    rng = np.random.default_rng(seed)
+    urls = [f"https://example.com/products/item-{i}" for i in range(n_products)]
+    names = [f"Produit {i}" for i in range(n_products)]
+    price_mrp = rng.uniform(5, 200, n_products).round(2)
+    price_sale = price_mrp.copy()
+
+    for day in range(days):
+        changed = rng.random(n_products) < change_rate
+        on_sale = rng.random(n_products) < 0.5
+        price_sale[changed] = np.where(
+            on_sale[changed], (price_mrp[changed] * rng.uniform(0.4, 0.95, changed.sum())).round(2), price_mrp[changed]
+        )
+        discount = ((price_mrp - price_sale) / price_mrp).round(4)
+        rows = zip(urls, names, price_mrp.tolist(), price_sale.tolist(), discount.tolist())
+        yield START_DATE + timedelta(days=day), rows
+
+
+def file_size_mb(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p)) / 1024 ** 2
+
+
+def drop_latencies(price_history, conn, repeats, limit):
+    return {
+        days: statistics.median(
+            timed(price_history.biggest_price_drops, conn, days=days, limit=limit)[1] for _ in range(repeats)
+        ) * 1000
+        for days in DROP_WINDOWS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark historique des prix : capture de changements et compaction")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--change-rate", type=float, default=0.02)
+    parser.add_argument("--keep-days", type=int, default=90)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    price_history = load_script("price_history.py")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "price_history.db")
+        conn = price_history.open_price_history(db_path)
+
+        snapshot_times = []
+        for observed_at, rows in daily_snapshots(args.products, args.days, args.change_rate):
+            snapshot_times.append(
+                timed(price_history.record_price_rows, conn, rows, price_history.format_timestamp(observed_at))[1]
+            )
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+        history_rows = conn.execute("SELECT COUNT(*) FROM price_history;").fetchone()[0]
+        full_copy_rows = args.products * args.days
+        size_before = file_size_mb(db_path)
+        latencies_before = drop_latencies(price_history, conn, args.repeats, args.limit)
+
+        compacted, compact_time = timed(price_history.compact_price_history, conn, keep_days=args.keep_days)
+        conn.execute("VACUUM;")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        size_after = file_size_mb(db_path)
+        latencies_after = drop_latencies(price_history, conn, args.repeats, args.limit)
+        conn.close()
+
+    print_header(f"Historique des prix : {args.products:,} produits, {args.days} relevés quotidiens")
+    print(f"Lignes price_history : {history_rows:,} (copies quotidiennes complètes : {full_copy_rows:,})")
+    print(f"Relevé quotidien : médiane {statistics.median(snapshot_times) * 1000:.1f} ms, "
+          f"max {max(snapshot_times) * 1000:.1f} ms")
+    print(f"Compaction (> {args.keep_days} jours, par semaine) : {compacted:,} lignes en {compact_time:.2f} s")
+    print(f"Taille de la base : {size_before:.1f} Mo -> {size_after:.1f} Mo\n")
+    print(f"{'Fenêtre':<12}{'Avant compaction (ms)':>24}{'Après compaction (ms)':>24}")
+    for days in DROP_WINDOWS:
+        print(f"{f'{days} jours':<12}{latencies_before[days]:>24.1f}{latencies_after[days]:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_pipeline import run_clean_stage, run_split_stage
+from bench_utils import load_script, print_header
+from synthetic_data import write_raw_csv
+
+DB_PATH = os.path.join("..", "outputs", "data_market.db")
+
+# Requêtes ad hoc mêlées aux cinq requêtes métier : (vue, colonnes, filtres, tri décroissant)
+VIEW_REQUESTS = [
+    ('view_catalog', ['product_id', 'name', 'price_sale'], {'price_sale': ('<=', 30.0)}, 'price_sale'),
+    ('view_top_products', ['name', 'rating', 'review_count'], {'rating': ('>=', 4.5)}, 'review_count'),
+    ('view_promotions', ['name', 'computed_discount_pct'], {}, 'computed_discount_pct')
+]
+
+
+def build_database(rows, tmp_dir):
+    clean = load_script("01_load_and_clean.py")
+    split_tables = load_script("02_split_tables.py")
+    for logger_name in ("script_01_load_and_clean", "script_02_split_tables"):
+        logging.getLogger(logger_name).setLevel("ERROR")
+
+    raw_path = os.path.join(tmp_dir, "raw.csv")
+    clean_path = os.path.join(tmp_dir, "clean.csv")
+    db_path = os.path.join(tmp_dir, "market.db")
+    write_raw_csv(raw_path, rows)
+    run_clean_stage(clean, raw_path, clean_path)
+    run_split_stage(split_tables, clean_path, db_path, workers=1)
+    return db_path
+
+
+def workload(service, requests, seed):
+    # Même séquence de requêtes pour chaque mode : la graine dépend seulement du client
+    rng = np.random.default_rng(seed)
+    names = list(service.registry)
+    calls = []
+    for choice in rng.integers(0, len(names) + len(VIEW_REQUESTS), size=requests):
+        limit = int(rng.integers(5, 50))
+        if choice < len(names):
+            params = service.resolve_params(names[choice], {'limit': limit})
+            sql = service.sql(names[choice], params)
+        else:
+            view, columns, filters, order_by = VIEW_REQUESTS[choice - len(names)]
+            sql, params = service.view_sql(view, columns, filters, order_by, descending=True, limit=limit)
+        calls.append((sql, params))
+    return calls
+
+
+def run_clients(execute, workloads):
+    latencies = [[] for _ in workloads]
+    barrier = threading.Barrier(len(workloads) + 1)
+
+    def client(index):
+        barrier.wait()
+        for sql, params in workloads[index]:
+            start = time.perf_counter()
+            execute(sql, params)
+            latencies[index].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(len(workloads))]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.array(client_latencies) for client_latencies in latencies]) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge : pool de connexions vs une connexion par requête")
+    parser.add_argument("--db", default=DB_PATH, help="Base interrogée (ignorée avec --rows)")
+    parser.add_argument("--rows", type=int, default=None, help="Construit une base synthétique de N lignes brutes")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32], help="Nombres de clients simultanés")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes envoyées par client")
+    parser.add_argument("--pool-size", type=int, default=None, help="Taille du pool (défaut : POOL_SIZE)")
+    args = parser.parse_args()
+
+    db_pool = load_script("db_pool.py")
+    query_service = load_script("query_service.py")
+    pool_size = args.pool_size or db_pool.POOL_SIZE
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db if args.rows is None else build_database(args.rows, tmp_dir)
+        service = query_service.QueryService(db_path, pool_size=pool_size)
+
+        def pooled(sql, params):
+            with service.pool.connection() as conn:
+                return pd.read_sql_query(sql, conn, params=params)
+
+        def connection_per_request(sql, params):
+            conn = sqlite3.connect(db_path)
+            try:
+                return pd.read_sql_query(sql, conn, params=params)
+            finally:
+                conn.close()
+
+        results = {}
+        for clients in args.clients:
+            workloads = [workload(service, args.requests, seed) for seed in range(clients)]
+            for mode, execute in (("connexion par requête", connection_per_request), ("pool", pooled)):
+                results[(clients, mode)] = run_clients(execute, workloads)
+
+        journal_mode = service.pool.journal_mode()
+        service.close()
+
+    print_header(
+        f"Test de charge sur {db_path} (journal {journal_mode}, pool de {pool_size} connexions, "
+        f"{args.requests} requêtes par client)"
+    )
+    print(f"{'Clients':>8}  {'Mode':<24}{'p50 (ms)':>10}{'p99 (ms)':>10}{'Requêtes/s':>12}")
+    for (clients, mode), (p50, p99, throughput) in results.items():
+        print(f"{clients:>8}  {mode:<24}{p50:>10.2f}{p99:>10.2f}{throughput:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import load_script, print_header, timed
+
+VOCABULARY = (
+    "base layer warm thermal ski snow hiking trail running shoes jacket waterproof breathable "
+    "polyester cotton wool merino lightweight durable tent camping backpack cycling bike helmet "
+    "gloves socks fleece insulated windproof stretch comfort grip sole cushioning kayak paddle "
+    "swim goggles tennis racket fitness yoga mat dumbbell climbing harness rope compact foldable"
+).split()
+BRANDS = ["Wedze", "Quechua", "Kalenji", "Forclaz", "Btwin", "Kipsta", "Domyos", "Tribord", "Artengo", "Simond"]
+CATEGORIES = ["ski", "hiking", "running", "cycling", "camping", "swimming", "tennis", "fitness", "climbing", "kayak"]
+SYLLABLES = ["ka", "lo", "mi", "re", "tu", "za", "po", "ne", "vi", "da", "su", "fo", "gi", "ba", "xe", "ry"]
+VOCABULARY_SIZE = 50_000
+QUERY_RANKS = [10, 200, 2_000, 20_000]
+
+
+def build_vocabulary(rng):
+    generated = set()
+    while len(generated) < VOCABULARY_SIZE - len(VOCABULARY):
+        generated.add("".join(rng.choice(SYLLABLES, size=rng.integers(3, 6))))
+    words = np.array(VOCABULARY + sorted(generated), dtype=object)
+    weights = 1.0 / np.arange(1, len(words) + 1) ** 1.05
+    return words, weights / weights.sum()
+
+
+def random_text(rng, vocabulary, n_rows, n_words):
+    words, probabilities = vocabulary
+    indices = rng.choice(len(words), size=(n_rows, n_words), p=probabilities)
+    text = pd.Series(words[indices[:, 0]])
+    for column in range(1, n_words):
+        text = text + " " + words[indices[:, column]]
+    return text
+
+
+def build_catalog(split_tables, db_path, n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    vocabulary = build_vocabulary(rng)
+
+    brands = pd.DataFrame({'brand_id': range(1, len(BRANDS) + 1), 'brand': BRANDS})
+    categories = pd.DataFrame({'category_id': range(1, len(CATEGORIES) + 1), 'category': CATEGORIES})
+    price_mrp = rng.uniform(5, 200, n_rows).round(2)
+    products = pd.DataFrame({
+        'product_id': np.arange(1, n_rows + 1),
+        'name': random_text(rng, vocabulary, n_rows, 5),
+        'brand_id': rng.integers(1, len(BRANDS) + 1, n_rows),
+        'category_id': rng.integers(1, len(CATEGORIES) + 1, n_rows),
+        'url': [f"https://example.com/products/item-{i}" for i in range(n_rows)],
+        'colour': "Black",
+        'price_mrp': price_mrp,
+        'price_sale': (price_mrp * rng.uniform(0.5, 1.0, n_rows)).round(2),
+        'discount_rate': 0.0,
+        'is_on_sale': False,
+        'information': None,
+        'description': random_text(rng, vocabulary, n_rows, 25)
+    })
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    split_tables.apply_load_pragmas(conn)
+    split_tables.create_database_schema(conn)
+    conn.execute("BEGIN;")
+    split_tables.bulk_insert(conn, "brands", brands)
+    split_tables.bulk_insert(conn, "categories", categories)
+    split_tables.bulk_insert(conn, "products", products)
+    conn.execute("COMMIT;")
+    split_tables.create_indexes(conn)
+    split_tables.create_business_views(conn)
+    _, index_time = timed(split_tables.create_search_index, conn)
+    conn.close()
+
+    queries = [
+        vocabulary[0][QUERY_RANKS[0]],
+        f"{vocabulary[0][QUERY_RANKS[0]]} {vocabulary[0][QUERY_RANKS[1]]}",
+        vocabulary[0][QUERY_RANKS[2]],
+        vocabulary[0][QUERY_RANKS[3]],
+        "goretex"
+    ]
+
+    return index_time, queries
+
+
+def like_search(conn, query, limit):
+    conditions = " AND ".join("(p.name LIKE ? OR p.description LIKE ?)" for _ in query.split())
+    params = [f"%{term}%" for term in query.split() for _ in range(2)]
+    sql = f"""
+    SELECT v.*
+    FROM products p
+    JOIN view_catalog v ON v.product_id = p.product_id
+    WHERE {conditions}
+    LIMIT ?;
+    """
+    return pd.read_sql_query(sql, conn, params=params + [limit])
+
+
+def median_latency(func, repeats, *args, **kwargs):
+    return statistics.median(timed(func, *args, **kwargs)[1] for _ in range(repeats)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recherche plein texte : FTS5/bm25 vs LIKE")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    split_tables = load_script("02_split_tables.py")
+    split_tables.logger.setLevel("WARNING")
+    catalog_search = load_script("catalog_search.py")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "search.db")
+        index_time, queries = build_catalog(split_tables, db_path, args.rows)
+
+        print_header(f"Recherche par mots-clés sur {args.rows:,} produits")
+        print(f"Construction de l'index FTS5 : {index_time:.1f} s\n")
+        print(f"{'Requête':<26}{'LIKE (ms)':>12}{'FTS5 (ms)':>12}{'FTS5 + filtres (ms)':>22}")
+
+        conn = sqlite3.connect(db_path)
+        for query in queries:
+            like_ms = median_latency(like_search, args.repeats, conn, query, args.limit)
+            fts_ms = median_latency(catalog_search.search_products, args.repeats, conn, query, limit=args.limit)
+            filtered_ms = median_latency(
+                catalog_search.search_products, args.repeats, conn, query,
+                brand="Quechua", min_price=20, max_price=80, limit=args.limit
+            )
+            print(f"{query:<26}{like_ms:>12.1f}{fts_ms:>12.1f}{filtered_ms:>22.1f}")
+        conn.close()
+
+    print("\nLIKE s'arrête aux premières correspondances sans classement ; FTS5 classe toutes les correspondances (bm25).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import gzip
+import os
+import shutil
+import tempfile
+
+from bench_utils import load_script, print_header, timed
+from synthetic_data import generate_raw_chunks
+
+
+def write_shards(directory, shards, rows_per_shard):
+    for shard_number, chunk in enumerate(generate_raw_chunks(shards * rows_per_shard, chunk_rows=rows_per_shard)):
+        with gzip.open(os.path.join(directory, f"shard_{shard_number:04d}.csv.gz"), "wt", newline="") as f:
+            chunk.to_csv(f, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'ingestion multi-fichiers (shards gzip)")
+    parser.add_argument("--shards", type=int, default=40, help="Nombre de shards générés")
+    parser.add_argument("--rows-per-shard", type=int, default=5_000, help="Lignes par shard")
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Nombres de threads de lecture comparés"
+    )
+    args = parser.parse_args()
+
+    clean = load_script("01_load_and_clean.py")
+    clean.logger.setLevel("ERROR")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shards_dir = os.path.join(tmp_dir, "shards")
+        os.makedirs(shards_dir)
+        write_shards(shards_dir, args.shards, args.rows_per_shard)
+        shards_size = sum(os.path.getsize(os.path.join(shards_dir, name)) for name in os.listdir(shards_dir))
+
+        reference = None
+        for threads in args.threads:
+            run_dir = os.path.join(tmp_dir, f"run_{threads}")
+            output_path = os.path.join(run_dir, "products_clean.csv")
+            manifest_path = os.path.join(run_dir, "shards_manifest.json")
+            options = {'quarantine_path': os.path.join(run_dir, "quarantine.csv")}
+            full_time = timed(
+                clean.run_shard_pipeline, shards_dir, output_path, "csv", manifest_path, threads, **options
+            )[1]
+            rerun_time = timed(
+                clean.run_shard_pipeline, shards_dir, output_path, "csv", manifest_path, threads, **options
+            )[1]
+
+            with open(output_path, "rb") as f:
+                content = f.read()
+            reference = content if reference is None else reference
+            results[threads] = (full_time, rerun_time, content == reference)
+            shutil.rmtree(run_dir)
+
+    rows = args.shards * args.rows_per_shard
+    print_header(f"Ingestion de {args.shards} shards gzip ({rows:,} lignes, {shards_size / 1024 ** 2:.0f} Mo compressés)")
+    print(f"{'Threads':<10}{'Durée (s)':>12}{'Lignes/s':>14}{'Relance (s)':>14}{'Identique':>11}")
+    for threads, (full_time, rerun_time, identical) in results.items():
+        print(f"{threads:<10}{full_time:>12.2f}{rows / full_time:>14,.0f}{rerun_time:>14.3f}{str(identical):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_PATH = os.path.join("..", "data", "decathlon_webscrapped_raw.csv")
+URL_PREFIX = "https://decathlon-usa.myshopify.com/products/"
+CHUNK_ROWS = 200_000
+
+# Taux par défaut : l'échantillon Kaggle est déjà propre (0 doublon, 0 valeur manquante),
+# ces valeurs reproduisent un scrape brut avant dédoublonnage
+DUPLICATE_RATE = 0.02
+SALE_ABOVE_MRP_RATE = 0.01
+DISCOUNT_RATE = 0.5
+NAN_RATES = {
+    "product_name": 0.002,
+    "star_rating": 0.05,
+    "number_of_reviews": 0.05,
+    "MRP": 0.01,
+    "sale_price": 0.002,
+    "colour": 0.03,
+    "description": 0.02
+}
+
+RAW_COLUMNS = [
+    "product_url", "product_name", "brand", "star_rating", "number_of_reviews",
+    "MRP", "sale_price", "colour", "product information", "description"
+]
+
+
+def _open_containers(values, empty):
+    values = values.dropna().str.rstrip()
+    return values[values != empty].str[:-1].to_numpy(dtype=object)
+
+
+def load_vocabulary(sample_path=SAMPLE_PATH):
+    sample = pd.read_csv(sample_path)
+    brand_counts = sample["brand"].value_counts()
+
+    return {
+        "slugs": sample["product_url"].str.extract(r"/products/([^?]+)")[0].dropna().to_numpy(dtype=object),
+        "names": sample["product_name"].dropna().to_numpy(dtype=object),
+        "brands": brand_counts.index.to_numpy(dtype=object),
+        "brand_weights": (brand_counts / brand_counts.sum()).to_numpy(),
+        "colours": sample["colour"].dropna().unique().astype(object),
+        # Dictionnaires d'attributs et listes de description ouverts avant le délimiteur final
+        # pour y ajouter une valeur propre à chaque ligne
+        "informations": _open_containers(sample["product information"], "{}"),
+        "descriptions": _open_containers(sample["description"], "[]")
+    }
+
+
+def _pick(rng, values, size, weights=None):
+    return values[rng.choice(len(values), size=size, p=weights)]
+
+
+def generate_chunk(rng, vocabulary, start_id, rows, duplicate_rate=DUPLICATE_RATE,
+                   sale_above_mrp_rate=SALE_ABOVE_MRP_RATE, nan_rates=None):
+    ids = pd.Series(np.arange(start_id, start_id + rows)).astype(str).to_numpy(dtype=object)
+    slugs = _pick(rng, vocabulary["slugs"], rows) + "-" + ids
+
+    mrp = np.floor(rng.lognormal(mean=3.1, sigma=0.8, size=rows)) + 0.99
+    discount = np.where(rng.random(rows) < DISCOUNT_RATE, rng.uniform(0.1, 0.5, size=rows), 0.0)
+    sale_price = np.round(mrp * (1 - discount), 2)
+    above_mrp = rng.random(rows) < sale_above_mrp_rate
+    sale_price[above_mrp] = np.round(mrp[above_mrp] * rng.uniform(1.05, 1.5, size=above_mrp.sum()), 2)
+
+    df = pd.DataFrame({
+        "product_url": URL_PREFIX + slugs + "?adept-product=" + slugs,
+        "product_name": _pick(rng, vocabulary["names"], rows),
+        "brand": _pick(rng, vocabulary["brands"], rows, vocabulary["brand_weights"]),
+        "star_rating": np.clip(np.round(rng.normal(4.5, 0.25, size=rows), 1), 1.0, 5.0),
+        "number_of_reviews": np.maximum(np.round(rng.lognormal(mean=7.0, sigma=1.3, size=rows)), 1),
+        "MRP": mrp,
+        "sale_price": sale_price,
+        "colour": _pick(rng, vocabulary["colours"], rows),
+        "product information": (
+            _pick(rng, vocabulary["informations"], rows) + ", '      Reference    ': ' " + ids + "'}"
+        ),
+        "description": _pick(rng, vocabulary["descriptions"], rows) + ", 'Ref. " + ids + "']"
+    })
+
+    for column, rate in (NAN_RATES if nan_rates is None else nan_rates).items():
+        df.loc[rng.random(rows) < rate, column] = np.nan
+
+    duplicate_count = int(rows * duplicate_rate)
+    if duplicate_count and rows > duplicate_count:
+        targets = rng.choice(np.arange(1, rows), size=duplicate_count, replace=False)
+        sources = (rng.random(duplicate_count) * targets).astype(np.int64)
+        df.iloc[targets] = df.iloc[sources].to_numpy()
+
+    return df[RAW_COLUMNS]
+
+
+def generate_raw_chunks(rows, seed=0, chunk_rows=CHUNK_ROWS, **options):
+    rng = np.random.default_rng(seed)
+    vocabulary = load_vocabulary()
+
+    for start in range(0, rows, chunk_rows):
+        yield generate_chunk(rng, vocabulary, start, min(chunk_rows, rows - start), **options)
+
+
+def write_raw_csv(path, rows, seed=0, chunk_rows=CHUNK_ROWS, **options):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for chunk_number, chunk in enumerate(generate_raw_chunks(rows, seed, chunk_rows, **options)):
+        chunk.to_csv(path, mode="w" if chunk_number == 0 else "a", header=chunk_number == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un CSV brut synthétique au format du scrape Decathlon")
+    parser.add_argument("--rows", type=int, default=100_000, help="Nombre de lignes générées")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur aléatoire")
+    parser.add_argument("--output", default=os.path.join("..", "data", "synthetic_raw.csv"), help="Fichier produit")
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE, help="Part de lignes dupliquées")
+    parser.add_argument(
+        "--sale-above-mrp-rate", type=float, default=SALE_ABOVE_MRP_RATE,
+        help="Part de lignes avec un prix soldé supérieur au prix catalogue"
+    )
+    args = parser.parse_args()
+
+    write_raw_csv(
+        args.output, args.rows, seed=args.seed,
+        duplicate_rate=args.duplicate_rate, sale_above_mrp_rate=args.sale_above_mrp_rate
+    )
+    print(f"{args.rows:,} lignes écrites dans {args.output} ({os.path.getsize(args.output) / 1024 ** 2:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    main()
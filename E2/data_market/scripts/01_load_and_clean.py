@@ -3,6 +3,32 @@ import numpy as np
 import os
 import logging
 import re
+import argparse
+import functools
+import glob
+import json
+import multiprocessing
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+from data_validation import VALIDATION_RULES, QuarantineWriter, evaluate_rules
+from instrumentation import detach_run, instrumented, pipeline_run
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,11 +40,91 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-
-def load_data(input_path):
+OUTPUT_FORMATS = ("csv", "parquet")
+
+COLUMN_MAPPING = {
+    "product_url": "url",
+    "product_name": "name",
+    "brand": "brand",
+    "star_rating": "rating",
+    "number_of_reviews": "review_count",
+    "MRP": "price_mrp",
+    "sale_price": "price_sale",
+    "colour": "colour",
+    "product information": "information",
+    "description": "description"
+}
+
+LOAD_DTYPES = {"brand": "category", "colour": "category"}
+CATEGORY_COLUMNS = ["brand", "colour", "category"]
+
+# float32 n'est retenu que si l'arrondi à ce nombre de décimales restitue exactement
+# la valeur float64 : l'export reconvertit alors sans perte (restore_float64_columns)
+COMPACT_FLOAT_DECIMALS = {
+    "rating": 1,
+    "price_mrp": 2,
+    "price_sale": 2,
+    "discount_rate": 2,
+    "popularity_score": 2
+}
+COMPACT_INT_COLUMNS = ["review_count"]
+
+LAZY_TEXT_COLUMNS = ["product information", "description"]
+TEXT_HASH_COLUMN = "text_hash"
+LAZY_TEXT_CHUNKSIZE = 5_000
+PARALLEL_PARTITION_ROWS = 50_000
+EXPORT_COPY_BUFFER_SIZE = 1024 * 1024
+SHARD_PATTERNS = ("*.csv", "*.csv.gz", "*.csv.zst")
+SHARD_MANIFEST_PATH = os.path.join("..", "outputs", "shards_manifest.json")
+SHARD_READ_THREADS = 4
+QUARANTINE_PATH = os.path.join("..", "outputs", "products_quarantine.csv")
+PASSTHROUGH_COLUMNS = ["product_url", "product_name", "brand", "colour", "product information", "description"]
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Le format parquet nécessite pyarrow (pip install -r requirements.txt)")
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise ImportError("Les shards .zst nécessitent zstandard (pip install -r requirements.txt)")
+
+
+def _dictionary_string():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def clean_data_schema():
+    require_pyarrow()
+    return pa.schema([
+        ("url", pa.string()),
+        ("name", pa.string()),
+        ("brand", _dictionary_string()),
+        ("rating", pa.float64()),
+        ("review_count", pa.int64()),
+        ("price_mrp", pa.float64()),
+        ("price_sale", pa.float64()),
+        ("colour", _dictionary_string()),
+        ("information", pa.string()),
+        ("description", pa.string()),
+        ("discount_rate", pa.float64()),
+        ("is_on_sale", pa.bool_()),
+        ("category", _dictionary_string()),
+        ("popularity_score", pa.float64())
+    ])
+
+
+def to_arrow_table(df):
+    table = pa.Table.from_pandas(df, schema=clean_data_schema(), preserve_index=False)
+    return table.replace_schema_metadata(None)
+
+
+@instrumented
+def load_data(input_path, dtypes=LOAD_DTYPES):
     try:
         logger.info(f"Chargement des données depuis {input_path}")
-        df = pd.read_csv(input_path)
+        df = pd.read_csv(input_path, dtype=dtypes)
         logger.info(f"Données chargées avec succès : {len(df)} lignes, {len(df.columns)} colonnes")
         logger.info(f"Colonnes disponibles : {df.columns.tolist()}")
         return df
@@ -33,6 +139,119 @@ def load_data(input_path):
         raise
 
 
+def read_text_columns(input_path, chunksize=LAZY_TEXT_CHUNKSIZE):
+    return pd.read_csv(input_path, usecols=LAZY_TEXT_COLUMNS, dtype=object, chunksize=chunksize)
+
+
+@instrumented
+def load_data_lazy(input_path, dtypes=LOAD_DTYPES, chunksize=LAZY_TEXT_CHUNKSIZE):
+    try:
+        logger.info(f"Chargement des données depuis {input_path} sans les colonnes texte {LAZY_TEXT_COLUMNS}")
+        # Lecture par blocs : le parseur CSV garde sinon les jetons de tout le fichier en mémoire,
+        # colonnes ignorées comprises
+        chunks = pd.read_csv(
+            input_path, usecols=lambda col: col not in LAZY_TEXT_COLUMNS, dtype=dtypes, chunksize=chunksize
+        )
+        df = pd.concat(chunks)
+        if dtypes:
+            df = df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+        # Les colonnes texte restent sur disque : seule leur empreinte est gardée pour la
+        # détection des doublons, elles sont relues bloc par bloc à l'export
+        text_hashes = [
+            pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            for chunk in read_text_columns(input_path, chunksize)
+        ]
+        df[TEXT_HASH_COLUMN] = np.concatenate(text_hashes) if text_hashes else np.array([], dtype=np.uint64)
+
+        logger.info(f"Données chargées avec succès : {len(df)} lignes, {len(df.columns)} colonnes")
+        logger.info(f"Colonnes disponibles : {df.columns.tolist()}")
+        return df
+    except FileNotFoundError:
+        logger.error(f"Fichier non trouvé : {input_path}")
+        raise
+    except pd.errors.EmptyDataError:
+        logger.error(f"Fichier vide : {input_path}")
+        raise
+
+
+def infer_column_dtypes(input_path, chunksize):
+    dtypes = {}
+
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        for col, dtype in chunk.dtypes.items():
+            if col not in dtypes or dtypes[col] == dtype:
+                dtypes[col] = dtype
+            elif {dtypes[col].kind, dtype.kind} <= {"i", "f"}:
+                dtypes[col] = np.dtype("float64")
+            else:
+                dtypes[col] = np.dtype("object")
+
+    return dtypes
+
+
+def load_data_chunks(input_path, chunksize):
+    try:
+        logger.info(f"Chargement en streaming depuis {input_path} (blocs de {chunksize} lignes)")
+        dtypes = infer_column_dtypes(input_path, chunksize)
+        dtypes.update(LOAD_DTYPES)
+        logger.info(f"Types de colonnes déterminés sur l'ensemble du fichier : {len(dtypes)} colonnes")
+        yield from pd.read_csv(input_path, chunksize=chunksize, dtype=dtypes)
+    except FileNotFoundError:
+        logger.error(f"Fichier non trouvé : {input_path}")
+        raise
+    except pd.errors.EmptyDataError:
+        logger.error(f"Fichier vide : {input_path}")
+        raise
+
+
+class RowHashSet:
+
+    def __init__(self):
+        self._levels = []
+
+    def __len__(self):
+        return sum(len(level) for level in self._levels)
+
+    @classmethod
+    def from_array(cls, hashes):
+        row_hashes = cls()
+        if len(hashes) > 0:
+            row_hashes._levels.append(np.sort(np.asarray(hashes, dtype=np.uint64)))
+        return row_hashes
+
+    def to_array(self):
+        if not self._levels:
+            return np.zeros(0, dtype=np.uint64)
+        return np.sort(np.concatenate(self._levels))
+
+    def filter_new(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+
+        is_new = np.zeros(len(hashes), dtype=bool)
+        is_new[np.unique(hashes, return_index=True)[1]] = True
+
+        for level in self._levels:
+            positions = np.minimum(np.searchsorted(level, hashes), len(level) - 1)
+            is_new &= level[positions] != hashes
+
+        new_hashes = np.sort(hashes[is_new])
+        if len(new_hashes) > 0:
+            self._levels.append(new_hashes)
+            while len(self._levels) > 1 and len(self._levels[-2]) <= len(self._levels[-1]):
+                last = self._levels.pop()
+                self._levels[-1] = np.sort(np.concatenate([self._levels[-1], last]))
+
+        return is_new
+
+
+@instrumented
+def remove_duplicates_chunk(df, seen_hashes):
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return df[seen_hashes.filter_new(hashes)]
+
+
+@instrumented
 def remove_duplicates(df):
     initial_count = len(df)
     df = df.drop_duplicates()
@@ -46,6 +265,7 @@ def remove_duplicates(df):
     return df
 
 
+@instrumented
 def clean_missing_values(df):
     initial_count = len(df)
     df = df.dropna(subset=["product_name", "sale_price"])
@@ -65,26 +285,15 @@ def clean_missing_values(df):
     return df
 
 
+@instrumented
 def rename_columns(df):
-    column_mapping = {
-        "product_url": "url",
-        "product_name": "name",
-        "brand": "brand",
-        "star_rating": "rating",
-        "number_of_reviews": "review_count",
-        "MRP": "price_mrp",
-        "sale_price": "price_sale",
-        "colour": "colour",
-        "product information": "information",
-        "description": "description"
-    }
-
-    df = df.rename(columns=column_mapping)
+    df = df.rename(columns=COLUMN_MAPPING)
     logger.info("Colonnes renommées avec succès")
 
     return df
 
 
+@instrumented
 def convert_data_types(df):
     numeric_columns = ["rating", "review_count", "price_mrp", "price_sale"]
 
@@ -118,6 +327,46 @@ def extract_category_from_url(url):
     return "Unknown"
 
 
+CATEGORY_CACHE_MAX_SIZE = 1_000_000
+_category_cache = {}
+
+
+def _categories_from_slugs(slugs):
+    parts = slugs.str.split("-", n=2)
+    has_gender_token = slugs.str.contains(r"(?:^|-)(?:wo)?mens(?:-|$)")
+    return pd.Series(
+        np.where(has_gender_token, parts.str[1].fillna("Unknown"), parts.str[0]),
+        index=slugs.index,
+        dtype=object
+    )
+
+
+@instrumented
+def extract_categories(urls):
+    # Colonne objet ou de type chaîne pandas (défaut de pandas >= 3, lectures parquet / dtype_backend)
+    if not pd.api.types.is_string_dtype(urls.dtype):
+        return pd.Series("Unknown", index=urls.index, dtype=object)
+    urls = urls.astype(object)
+
+    url_codes, unique_urls = pd.factorize(urls)
+    slugs = pd.Series(unique_urls, dtype=object).str.extract(r'/products/([^/]+)', expand=False)
+    slug_codes, unique_slugs = pd.factorize(slugs)
+
+    categories = pd.Series(unique_slugs, dtype=object).map(_category_cache).astype(object)
+    missing = categories.isna().to_numpy()
+    if missing.any():
+        computed = _categories_from_slugs(pd.Series(unique_slugs[missing], dtype=object))
+        if len(_category_cache) + len(computed) > CATEGORY_CACHE_MAX_SIZE:
+            _category_cache.clear()
+        _category_cache.update(zip(unique_slugs[missing], computed))
+        categories[missing] = computed.to_numpy()
+
+    url_categories = np.append(categories.to_numpy(dtype=object), "Unknown")[slug_codes]
+    lookup = np.append(url_categories, "Unknown")
+    return pd.Series(lookup[url_codes], index=urls.index, dtype=object)
+
+
+@instrumented
 def add_calculated_fields(df):
     df["discount_rate"] = np.where(
         (df["price_mrp"].notna()) & (df["price_mrp"] > 0),
@@ -126,7 +375,7 @@ def add_calculated_fields(df):
     )
 
     df["is_on_sale"] = df["discount_rate"] > 0
-    df["category"] = df["url"].apply(extract_category_from_url)
+    df["category"] = extract_categories(df["url"])
     df["popularity_score"] = np.where(
         df["review_count"].notna() & df["rating"].notna(),
         (df["rating"] * np.log1p(df["review_count"])).round(2),
@@ -138,35 +387,135 @@ def add_calculated_fields(df):
     return df
 
 
-def validate_data(df):
-    issues = []
+def log_memory_usage(before_usage, before_dtypes, df):
+    after_usage = df.memory_usage(deep=True, index=False)
+
+    logger.info("Mémoire par colonne (avant -> après) :")
+    for col in df.columns:
+        logger.info(
+            f"  - {col}: {before_dtypes.get(col, '-')} {before_usage.get(col, 0) / 1024 ** 2:.2f} Mo"
+            f" -> {df[col].dtype} {after_usage[col] / 1024 ** 2:.2f} Mo"
+        )
+    logger.info(
+        f"Mémoire totale : {before_usage.sum() / 1024 ** 2:.2f} Mo -> {after_usage.sum() / 1024 ** 2:.2f} Mo"
+    )
 
-    if (df["price_sale"] < 0).any():
-        issues.append("Détection de prix de vente négatifs")
 
-    if ((df["rating"] < 0) | (df["rating"] > 5)).any():
-        issues.append("Détection de ratings invalides (< 0 ou > 5)")
+@instrumented
+def compact_dtypes(df, log_memory=True):
+    if log_memory:
+        before_usage = df.memory_usage(deep=True, index=False)
+        before_dtypes = df.dtypes
 
-    if (df["review_count"] < 0).any():
-        issues.append("Détection de nombres d'avis négatifs")
-    incoherent_prices = df[df["price_sale"] > df["price_mrp"]].shape[0]
-    if incoherent_prices > 0:
-        issues.append(f"{incoherent_prices} produits avec prix soldé > prix catalogue")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
 
-    if issues:
-        logger.warning("Problèmes de validation détectés :")
-        for issue in issues:
-            logger.warning(f"  - {issue}")
-        return False
-    else:
+    for col, decimals in COMPACT_FLOAT_DECIMALS.items():
+        if col in df.columns and df[col].dtype == np.float64:
+            compact = df[col].astype(np.float32)
+            restored = np.round(compact.astype(np.float64), decimals)
+            if ((restored == df[col]) | df[col].isna()).all():
+                df[col] = compact
+
+    int32_range = np.iinfo(np.int32)
+    for col in COMPACT_INT_COLUMNS:
+        if col in df.columns and df[col].dtype.kind in "if":
+            values = df[col].dropna()
+            if (values % 1 == 0).all() and values.between(int32_range.min, int32_range.max).all():
+                df[col] = df[col].astype("Int32")
+
+    if "is_on_sale" in df.columns:
+        df["is_on_sale"] = df["is_on_sale"].astype("boolean")
+
+    if log_memory:
+        log_memory_usage(before_usage, before_dtypes, df)
+
+    return df
+
+
+def restore_float64_columns(df):
+    for col, decimals in COMPACT_FLOAT_DECIMALS.items():
+        if col in df.columns and df[col].dtype == np.float32:
+            df[col] = np.round(df[col].astype(np.float64), decimals)
+
+    return df
+
+
+@instrumented
+def validate_data(df, quarantine=None, rules=VALIDATION_RULES):
+    masks, counts = evaluate_rules(df, rules)
+    invalid = masks != 0
+    invalid_count = int(np.count_nonzero(invalid))
+
+    if invalid_count == 0:
         logger.info("Validation des données réussie")
-        return True
+        return df
+
+    logger.warning("Problèmes de validation détectés :")
+    for name, count in counts.items():
+        if count > 0:
+            logger.warning(f"  - {rules[name]['message']} [{name}] : {count} lignes")
+
+    # Les lignes en échec restent dans le jeu nettoyé : une copie, avec les règles en échec, est
+    # mise en quarantaine pour analyse (une seule sélection par lot, quel que soit le nombre de règles)
+    if quarantine is not None:
+        quarantine.write(restore_float64_columns(df[invalid].copy()), masks[invalid], rules)
+        logger.warning(f"{invalid_count} lignes invalides copiées en quarantaine dans {quarantine.output_path}")
+    else:
+        logger.warning(f"{invalid_count} lignes invalides")
+
+    return df
 
 
-def export_data(df, output_path):
+class CleanDataWriter:
+
+    def __init__(self, output_path, output_format="csv", append=False):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        self.output_path = output_path
+        self.rows_written = 0
+        self._header_written = append
+        self._parquet_writer = None
+        self._parquet_path = output_path
+        if output_format == "parquet":
+            # Un fichier Parquet ne se complète pas sur place : le contenu existant est recopié
+            # dans un fichier temporaire qui remplace la sortie à la fermeture
+            if append:
+                self._parquet_path = output_path + ".tmp"
+            self._parquet_writer = pq.ParquetWriter(self._parquet_path, clean_data_schema())
+            if append:
+                for batch in pq.ParquetFile(output_path).iter_batches():
+                    self._parquet_writer.write_table(pa.Table.from_batches([batch]).cast(clean_data_schema()))
+
+    @instrumented(name="write_chunk", rows_arg="df")
+    def write(self, df):
+        df = restore_float64_columns(df)
+        if self._parquet_writer is not None:
+            self._parquet_writer.write_table(to_arrow_table(df))
+        else:
+            df.to_csv(
+                self.output_path, mode="a" if self._header_written else "w",
+                header=not self._header_written, index=False
+            )
+            self._header_written = True
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            if self._parquet_path != self.output_path:
+                os.replace(self._parquet_path, self.output_path)
+
+
+@instrumented
+def export_data(df, output_path, output_format="csv"):
     try:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_csv(output_path, index=False)
+        df = restore_float64_columns(df)
+        if output_format == "parquet":
+            pq.write_table(to_arrow_table(df), output_path)
+        else:
+            df.to_csv(output_path, index=False)
         logger.info(f"Données exportées avec succès vers {output_path}")
         logger.info(f"Fichier final : {len(df)} lignes, {len(df.columns)} colonnes")
     except Exception as e:
@@ -174,23 +523,465 @@ def export_data(df, output_path):
         raise
 
 
+@instrumented
+def export_data_lazy(df, input_path, output_path, output_format="csv", chunksize=LAZY_TEXT_CHUNKSIZE):
+    try:
+        output_columns = [COLUMN_MAPPING.get(col, col) for col in pd.read_csv(input_path, nrows=0).columns]
+        output_columns += [col for col in df.columns if col not in output_columns and col != TEXT_HASH_COLUMN]
+
+        # Les lignes conservées gardent leur position dans le fichier brut (index croissant) :
+        # chaque bloc de texte relu est joint à la tranche correspondante du DataFrame
+        positions = df.index.to_numpy()
+        writer = CleanDataWriter(output_path, output_format)
+        for text_chunk in read_text_columns(input_path, chunksize):
+            start, stop = np.searchsorted(positions, [text_chunk.index[0], text_chunk.index[-1] + 1])
+            part = df.iloc[start:stop]
+            text = text_chunk.loc[part.index].rename(columns=COLUMN_MAPPING)
+            writer.write(part.join(text)[output_columns])
+        writer.close()
+
+        logger.info(f"Données exportées avec succès vers {output_path}")
+        logger.info(f"Fichier final : {writer.rows_written} lignes, {len(output_columns)} colonnes")
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export : {str(e)}")
+        raise
+
+
+# DataFrame lu par les processus de travail : avec fork, il est hérité en copie sur écriture
+# et les partitions ne sont ni sérialisées ni copiées à l'envoi
+_shared_frame = None
+
+
+def _process_shared_partition(func, bounds):
+    start, stop = bounds
+    return func(_shared_frame.iloc[start:stop])
+
+
+def partition_bounds(rows, workers, partition_rows=PARALLEL_PARTITION_ROWS):
+    partition_rows = max(min(partition_rows, -(-rows // workers)), 1)
+    return [(start, min(start + partition_rows, rows)) for start in range(0, rows, partition_rows)] or [(0, 0)]
+
+
+def map_partitions(func, df, bounds, workers):
+    global _shared_frame
+
+    if workers <= 1:
+        return [func(df.iloc[start:stop]) for start, stop in bounds]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        _shared_frame = df
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("fork"), initializer=detach_run
+            ) as executor:
+                return list(executor.map(_process_shared_partition, [func] * len(bounds), bounds))
+        finally:
+            _shared_frame = None
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=detach_run) as executor:
+        return list(executor.map(func, [df.iloc[start:stop] for start, stop in bounds]))
+
+
+def clean_partition(df):
+    # Empreintes calculées sur les lignes brutes, avant toute transformation : le dédoublonnage
+    # global porte sur les mêmes valeurs que drop_duplicates en mode batch
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    df = clean_missing_values(df)
+    df = rename_columns(df)
+    df = convert_data_types(df)
+    df = add_calculated_fields(df)
+
+    # Les colonnes recopiées telles quelles restent dans le processus principal : seules les
+    # colonnes recalculées sont renvoyées
+    passthrough = [COLUMN_MAPPING.get(col, col) for col in PASSTHROUGH_COLUMNS]
+    return hashes, list(df.columns), df.drop(columns=passthrough)
+
+
+def write_csv_partition(df, directory):
+    fd, path = tempfile.mkstemp(suffix=".csv", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        df.to_csv(f, index=False, header=False)
+    return path
+
+
+@instrumented
+def clean_partitions(df, workers, partition_rows=PARALLEL_PARTITION_ROWS):
+    bounds = partition_bounds(len(df), workers, partition_rows)
+    logger.info(f"Nettoyage parallèle : {len(bounds)} partitions, {workers} processus")
+    return map_partitions(clean_partition, df, bounds, workers)
+
+
+@instrumented(rows_arg="df")
+def merge_partitions(df, results):
+    seen_hashes = RowHashSet()
+
+    # Les partitions sont parcourues dans l'ordre du fichier : la première occurrence de chaque
+    # ligne est conservée, comme avec drop_duplicates
+    is_new = np.concatenate([seen_hashes.filter_new(hashes) for hashes, _, _ in results])
+    computed = pd.concat([part[is_new[part.index.to_numpy()]] for _, _, part in results])
+
+    duplicates_removed = len(df) - len(seen_hashes)
+    if duplicates_removed > 0:
+        logger.warning(f"{duplicates_removed} doublons supprimés")
+    else:
+        logger.info("Aucun doublon détecté")
+
+    passthrough = df.loc[computed.index, PASSTHROUGH_COLUMNS].rename(columns=COLUMN_MAPPING)
+    return passthrough.join(computed)[results[0][1]]
+
+
+@instrumented
+def export_data_parallel(df, output_path, workers, output_format="csv", partition_rows=PARALLEL_PARTITION_ROWS):
+    if output_format != "csv":
+        export_data(df, output_path, output_format)
+        return
+
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        df = restore_float64_columns(df).reset_index(drop=True)
+        bounds = partition_bounds(len(df), workers, partition_rows)
+
+        # Chaque processus écrit sa partition dans un fichier temporaire, concaténés ensuite
+        # dans l'ordre : le texte CSV ne transite pas par le processus principal
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(output_path) or ".") as tmp_dir:
+            part_paths = map_partitions(functools.partial(write_csv_partition, directory=tmp_dir), df, bounds, workers)
+            with open(output_path, "wb") as output:
+                output.write(df.iloc[:0].to_csv(index=False).encode("utf-8"))
+                for part_path in part_paths:
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, output, EXPORT_COPY_BUFFER_SIZE)
+        logger.info(f"Données exportées avec succès vers {output_path}")
+        logger.info(f"Fichier final : {len(df)} lignes, {len(df.columns)} colonnes")
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export : {str(e)}")
+        raise
+
+
+def run_batch_pipeline(input_path, output_path, output_format="csv", compact=True, lazy_text=False,
+                       quarantine_path=QUARANTINE_PATH):
+    dtypes = LOAD_DTYPES if compact else None
+    if lazy_text:
+        df = load_data_lazy(input_path, dtypes)
+    else:
+        df = load_data(input_path, dtypes)
+    df = remove_duplicates(df)
+    df = clean_missing_values(df)
+    df = rename_columns(df)
+    df = convert_data_types(df)
+    df = add_calculated_fields(df)
+    if compact:
+        df = compact_dtypes(df)
+    df = validate_data(df, QuarantineWriter(quarantine_path))
+    if lazy_text:
+        export_data_lazy(df, input_path, output_path, output_format)
+    else:
+        export_data(df, output_path, output_format)
+
+
+def find_shards(source):
+    if os.path.isdir(source):
+        paths = [path for pattern in SHARD_PATTERNS for path in glob.glob(os.path.join(source, pattern))]
+    else:
+        paths = glob.glob(source)
+    return sorted(set(paths))
+
+
+def load_shard(path):
+    if path.endswith(".zst"):
+        require_zstandard()
+    df = pd.read_csv(path, dtype=LOAD_DTYPES, compression="infer")
+
+    # Les types sont déterminés shard par shard : une colonne numérique sans décimale est élargie
+    # en float64, pour que les empreintes de lignes ne dépendent pas du shard d'origine
+    for col in df.columns:
+        if df[col].dtype.kind in "iu":
+            df[col] = df[col].astype(np.float64)
+    return df
+
+
+def iter_loaded_shards(paths, threads=SHARD_READ_THREADS):
+    # Les shards suivants sont lus et décompressés par un pool de threads pendant le nettoyage
+    # du shard courant, avec au plus 2 × threads shards chargés d'avance
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        remaining = iter(paths)
+        pending = deque((path, executor.submit(load_shard, path)) for path in islice(remaining, 2 * threads))
+        while pending:
+            path, future = pending.popleft()
+            for next_path in islice(remaining, 1):
+                pending.append((next_path, executor.submit(load_shard, next_path)))
+            yield path, future.result()
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _manifest_hashes_path(manifest_path):
+    return os.path.splitext(manifest_path)[0] + ".hashes.npy"
+
+
+def new_shard_manifest(output_path, output_format):
+    manifest = {
+        'output': os.path.abspath(output_path),
+        'format': output_format,
+        'output_state': None,
+        'columns': None,
+        'shards': {}
+    }
+    return manifest, RowHashSet()
+
+
+def load_shard_manifest(manifest_path, output_path, output_format):
+    if not os.path.exists(manifest_path):
+        return new_shard_manifest(output_path, output_format)
+
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    # Le manifeste n'est valable que pour la sortie qu'il décrit, dans l'état où il l'a laissée :
+    # une sortie réécrite entre-temps ou une exécution interrompue imposent de tout réingérer
+    hashes_path = _manifest_hashes_path(manifest_path)
+    if (
+        manifest.get('output') != os.path.abspath(output_path)
+        or manifest.get('format') != output_format
+        or not os.path.exists(output_path)
+        or manifest.get('output_state') != _file_state(output_path)
+        or not os.path.exists(hashes_path)
+    ):
+        logger.warning(f"Manifeste {manifest_path} périmé pour {output_path} : tous les shards seront réingérés")
+        return new_shard_manifest(output_path, output_format)
+
+    return manifest, RowHashSet.from_array(np.load(hashes_path))
+
+
+def save_shard_manifest(manifest_path, manifest, seen_hashes, output_path):
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    manifest['output_state'] = _file_state(output_path)
+
+    hashes_path = _manifest_hashes_path(manifest_path)
+    with open(hashes_path + ".tmp", "wb") as f:
+        np.save(f, seen_hashes.to_array())
+    os.replace(hashes_path + ".tmp", hashes_path)
+
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def run_shard_pipeline(source, output_path, output_format="csv", manifest_path=SHARD_MANIFEST_PATH,
+                       threads=SHARD_READ_THREADS, reingest=False, quarantine_path=QUARANTINE_PATH):
+    paths = find_shards(source)
+    if not paths:
+        raise FileNotFoundError(f"Aucun shard trouvé pour {source} (motifs {', '.join(SHARD_PATTERNS)})")
+
+    if reingest:
+        manifest, seen_hashes = new_shard_manifest(output_path, output_format)
+    else:
+        manifest, seen_hashes = load_shard_manifest(manifest_path, output_path, output_format)
+
+    pending = []
+    for path in paths:
+        known = manifest['shards'].get(os.path.abspath(path))
+        if known is None:
+            pending.append(path)
+        elif {key: known[key] for key in ('size', 'mtime_ns')} != _file_state(path):
+            logger.warning(f"Shard {path} modifié depuis son ingestion : relu, seules les nouvelles lignes sont ajoutées")
+            pending.append(path)
+
+    logger.info(
+        f"{len(paths)} shards trouvés dans {source} : {len(paths) - len(pending)} déjà ingérés, "
+        f"{len(pending)} à traiter ({threads} threads de lecture)"
+    )
+    if not pending:
+        logger.info(f"Aucun nouveau shard : {output_path} est à jour")
+        return
+
+    writer = CleanDataWriter(output_path, output_format, append=bool(manifest['shards']))
+    quarantine = QuarantineWriter(quarantine_path, append=bool(manifest['shards']))
+    rows_read = 0
+    known_rows = len(seen_hashes)
+
+    for shard_number, (path, chunk) in enumerate(iter_loaded_shards(pending, threads), start=1):
+        if manifest['columns'] is None:
+            manifest['columns'] = chunk.columns.tolist()
+        elif chunk.columns.tolist() != manifest['columns']:
+            raise ValueError(f"Shard {path} : colonnes {chunk.columns.tolist()} différentes de {manifest['columns']}")
+
+        shard_rows = len(chunk)
+        rows_read += shard_rows
+        rows_before = writer.rows_written
+        quarantined_before = quarantine.rows_written
+
+        chunk = remove_duplicates_chunk(chunk, seen_hashes)
+        chunk = clean_missing_values(chunk)
+        chunk = rename_columns(chunk)
+        chunk = convert_data_types(chunk)
+        chunk = add_calculated_fields(chunk)
+        chunk = compact_dtypes(chunk, log_memory=shard_number == 1)
+        chunk = validate_data(chunk, quarantine)
+        writer.write(chunk)
+
+        manifest['shards'][os.path.abspath(path)] = {
+            **_file_state(path),
+            'rows_read': shard_rows,
+            'rows_written': writer.rows_written - rows_before,
+            'rows_quarantined': quarantine.rows_written - quarantined_before,
+            'ingested_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        }
+        logger.info(
+            f"Shard {shard_number}/{len(pending)} {os.path.basename(path)} : "
+            f"{writer.rows_written - rows_before} lignes écrites sur {shard_rows} lues"
+        )
+
+    writer.close()
+    save_shard_manifest(manifest_path, manifest, seen_hashes, output_path)
+
+    duplicates_removed = rows_read - (len(seen_hashes) - known_rows)
+    if duplicates_removed > 0:
+        logger.warning(f"{duplicates_removed} doublons supprimés (shards de cette exécution et déjà ingérés)")
+    else:
+        logger.info("Aucun doublon détecté")
+
+    logger.info(f"Données exportées avec succès vers {output_path}")
+    logger.info(f"{writer.rows_written} lignes ajoutées pour {rows_read} lues, manifeste : {manifest_path}")
+    if quarantine.rows_written > 0:
+        logger.warning(f"{quarantine.rows_written} lignes ajoutées à la quarantaine : {quarantine_path}")
+
+
+def run_streaming_pipeline(input_path, output_path, chunksize, output_format="csv", quarantine_path=QUARANTINE_PATH):
+    writer = CleanDataWriter(output_path, output_format)
+    quarantine = QuarantineWriter(quarantine_path)
+    seen_hashes = RowHashSet()
+    rows_read = 0
+
+    for chunk_number, chunk in enumerate(load_data_chunks(input_path, chunksize), start=1):
+        rows_read += len(chunk)
+        chunk = remove_duplicates_chunk(chunk, seen_hashes)
+        chunk = clean_missing_values(chunk)
+        chunk = rename_columns(chunk)
+        chunk = convert_data_types(chunk)
+        chunk = add_calculated_fields(chunk)
+        chunk = compact_dtypes(chunk, log_memory=chunk_number == 1)
+        chunk = validate_data(chunk, quarantine)
+
+        writer.write(chunk)
+        logger.info(f"Bloc {chunk_number} traité : {writer.rows_written} lignes écrites sur {rows_read} lues")
+
+    writer.close()
+
+    duplicates_removed = rows_read - len(seen_hashes)
+    if duplicates_removed > 0:
+        logger.warning(f"{duplicates_removed} doublons supprimés")
+    else:
+        logger.info("Aucun doublon détecté")
+
+    logger.info(f"Données exportées avec succès vers {output_path}")
+    logger.info(f"Fichier final : {writer.rows_written} lignes")
+    if quarantine.rows_written > 0:
+        logger.warning(f"{quarantine.rows_written} lignes en quarantaine au total : {quarantine_path}")
+
+
+def run_parallel_pipeline(input_path, output_path, workers, output_format="csv", partition_rows=PARALLEL_PARTITION_ROWS,
+                          quarantine_path=QUARANTINE_PATH):
+    df = load_data(input_path).reset_index(drop=True)
+    results = clean_partitions(df, workers, partition_rows)
+    df = merge_partitions(df, results)
+    del results
+    df = compact_dtypes(df)
+    df = validate_data(df, QuarantineWriter(quarantine_path))
+    export_data_parallel(df, output_path, workers, output_format, partition_rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Nettoyage et enrichissement des données Decathlon")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Active le mode streaming : nombre de lignes traitées par bloc"
+    )
+    mode.add_argument(
+        "--lazy-text",
+        action="store_true",
+        help="Laisse les colonnes information et description sur disque jusqu'à l'export"
+    )
+    mode.add_argument(
+        "--shards",
+        default=None,
+        help="Mode multi-fichiers : répertoire ou motif glob des shards (.csv, .csv.gz, .csv.zst)"
+    )
+    mode.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Active le mode parallèle : nombre de processus pour le nettoyage et l'export"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Format du jeu nettoyé : csv (products_clean.csv) ou parquet typé (products_clean.parquet)"
+    )
+    parser.add_argument(
+        "--read-threads",
+        type=int,
+        default=SHARD_READ_THREADS,
+        help="Mode multi-fichiers : threads de lecture et décompression des shards"
+    )
+    parser.add_argument(
+        "--manifest",
+        default=SHARD_MANIFEST_PATH,
+        help="Mode multi-fichiers : manifeste des shards déjà ingérés"
+    )
+    parser.add_argument(
+        "--reingest",
+        action="store_true",
+        help="Mode multi-fichiers : ignore le manifeste et réingère tous les shards"
+    )
+    parser.add_argument(
+        "--quarantine",
+        default=QUARANTINE_PATH,
+        help="Fichier CSV recevant une copie des lignes en échec de validation, avec les règles en échec"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Enregistre un profil cProfile de l'exécution dans ../outputs/profiles"
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     input_path = os.path.join("..", "data", "decathlon_webscrapped_raw.csv")
-    output_path = os.path.join("..", "outputs", "products_clean.csv")
+    output_path = os.path.join("..", "outputs", f"products_clean.{args.format}")
 
     logger.info("=" * 60)
     logger.info("DÉBUT DU TRAITEMENT")
     logger.info("=" * 60)
 
     try:
-        df = load_data(input_path)
-        df = remove_duplicates(df)
-        df = clean_missing_values(df)
-        df = rename_columns(df)
-        df = convert_data_types(df)
-        df = add_calculated_fields(df)
-        validate_data(df)
-        export_data(df, output_path)
+        if args.format == "parquet":
+            require_pyarrow()
+
+        with pipeline_run("01_load_and_clean", profile=args.profile):
+            if args.chunksize:
+                run_streaming_pipeline(input_path, output_path, args.chunksize, args.format, args.quarantine)
+            elif args.shards:
+                run_shard_pipeline(
+                    args.shards, output_path, args.format, args.manifest, args.read_threads, args.reingest,
+                    args.quarantine
+                )
+            elif args.workers:
+                run_parallel_pipeline(
+                    input_path, output_path, args.workers, args.format, quarantine_path=args.quarantine
+                )
+            else:
+                run_batch_pipeline(
+                    input_path, output_path, args.format, lazy_text=args.lazy_text, quarantine_path=args.quarantine
+                )
 
         logger.info("=" * 60)
         logger.info("TRAITEMENT TERMINÉ AVEC SUCCÈS")
@@ -1,9 +1,20 @@
 import pandas as pd
+import numpy as np
 import sqlite3
 import os
 import logging
 import json
 import ast
+import re
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import instrumented, pipeline_run
+from facet_search import build_postings
+from price_history import PRICE_HISTORY_PATH, open_price_history, record_price_snapshot
+from query_service import LEADERBOARD_TOP_K
+from variant_detection import NEAR_DUPLICATE_THRESHOLD, detect_variants
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,46 +26,118 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_clean_data(input_path):
-    
+INPUT_FORMATS = ('csv', 'parquet')
+
+# Colonnes du jeu nettoyé lues par ce script, dans l'ordre de products_clean : l'empreinte
+# de contenu (create_fingerprints_table) dépend de cet ordre
+CLEAN_DATA_COLUMNS = [
+    'url', 'name', 'brand', 'rating', 'review_count', 'price_mrp', 'price_sale', 'colour',
+    'information', 'description', 'discount_rate', 'is_on_sale', 'category', 'popularity_score'
+]
+
+@instrumented
+def load_clean_data(input_path, columns=None):
+
     try:
         logger.info(f"Chargement des données depuis {input_path}")
-        df = pd.read_csv(input_path)
-        logger.info(f"Données chargées : {len(df)} lignes")
+        if input_path.endswith('.parquet'):
+            df = pd.read_parquet(input_path, columns=columns)
+        else:
+            df = pd.read_csv(input_path, usecols=columns)
+            if columns is not None:
+                df = df[columns]
+        logger.info(f"Données chargées : {len(df)} lignes, {len(df.columns)} colonnes")
         return df
     except Exception as e:
         logger.error(f"Erreur lors du chargement : {str(e)}")
         raise
 
-def create_brands_table(df):
+@instrumented
+def load_existing_state(db_path):
+
+    state = {
+        'brands': pd.DataFrame(columns=['brand_id', 'brand']),
+        'categories': pd.DataFrame(columns=['category_id', 'category']),
+        'fingerprints': pd.DataFrame(columns=['product_id', 'url', 'content_hash']),
+        'schema_version': 0
+    }
+
+    if not os.path.exists(db_path):
+        return state
+
+    conn = sqlite3.connect(db_path)
+    try:
+        state['schema_version'] = conn.execute("PRAGMA user_version;").fetchone()[0]
+        existing_tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        }
+        queries = {
+            'brands': "SELECT brand_id, brand FROM brands;",
+            'categories': "SELECT category_id, category FROM categories;",
+            'fingerprints': "SELECT product_id, url, content_hash FROM product_fingerprints;"
+        }
+        for name, query in queries.items():
+            table_name = 'product_fingerprints' if name == 'fingerprints' else name
+            if table_name in existing_tables:
+                state[name] = pd.read_sql_query(query, conn)
+    finally:
+        conn.close()
+
+    logger.info(
+        f"État existant chargé : {len(state['brands'])} marques, "
+        f"{len(state['categories'])} catégories, {len(state['fingerprints'])} empreintes produits"
+    )
+
+    return state
+
+def assign_stable_ids(keys, existing, key_column, id_column):
+
+    if existing is None or len(existing) == 0:
+        return pd.Series(range(1, len(keys) + 1), index=keys.index, dtype='int64')
 
-    brands = df[['brand']].drop_duplicates().dropna()
+    known_ids = existing.drop_duplicates(key_column).set_index(key_column)[id_column]
+    ids = keys.map(known_ids)
+
+    new_keys = ids.isna()
+    next_id = int(existing[id_column].max()) + 1
+    ids[new_keys] = range(next_id, next_id + int(new_keys.sum()))
+
+    return ids.astype('int64')
+
+@instrumented
+def create_brands_table(df, existing_brands=None):
+
+    brands = df[['brand']].drop_duplicates().dropna().astype(object)
     brands = brands.reset_index(drop=True)
-    brands['brand_id'] = range(1, len(brands) + 1)
+    brands['brand_id'] = assign_stable_ids(brands['brand'], existing_brands, 'brand', 'brand_id')
     brands = brands[['brand_id', 'brand']]
 
     logger.info(f"Table brands créée : {len(brands)} marques uniques")
 
     return brands
 
-def create_categories_table(df):
+@instrumented
+def create_categories_table(df, existing_categories=None):
 
-    categories = df[['category']].drop_duplicates().dropna()
+    categories = df[['category']].drop_duplicates().dropna().astype(object)
     categories = categories.reset_index(drop=True)
-    categories['category_id'] = range(1, len(categories) + 1)
+    categories['category_id'] = assign_stable_ids(
+        categories['category'], existing_categories, 'category', 'category_id'
+    )
     categories = categories[['category_id', 'category']]
 
     logger.info(f"Table categories créée : {len(categories)} catégories uniques")
 
     return categories
 
-def create_products_table(df, brands_df, categories_df):
+@instrumented
+def create_products_table(df, brands_df, categories_df, existing_fingerprints=None):
 
     products = df.merge(brands_df, on='brand', how='left')
 
     products = products.merge(categories_df, on='category', how='left')
 
-    products['product_id'] = range(1, len(products) + 1)
+    products['product_id'] = assign_stable_ids(products['url'], existing_fingerprints, 'url', 'product_id')
 
     products_table = products[[
         'product_id',
@@ -75,6 +158,22 @@ def create_products_table(df, brands_df, categories_df):
 
     return products_table, products
 
+@instrumented
+def create_fingerprints_table(df, products_df):
+
+    content_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    fingerprints = pd.DataFrame({
+        'product_id': products_df['product_id'].to_numpy(),
+        'url': products_df['url'].to_numpy(),
+        'content_hash': [f"{value:016x}" for value in content_hashes]
+    })
+
+    logger.info(f"Empreintes calculées : {len(fingerprints)} produits")
+
+    return fingerprints
+
+@instrumented
 def create_reviews_table(products_df):
     
     reviews = products_df[[
@@ -90,6 +189,21 @@ def create_reviews_table(products_df):
 
     return reviews
 
+@instrumented
+def create_product_variants_table(products_df, near_duplicates=False, threshold=NEAR_DUPLICATE_THRESHOLD):
+
+    variants = detect_variants(products_df, near_duplicates=near_duplicates, threshold=threshold)
+
+    counts = variants['match_type'].value_counts()
+    grouped = len(variants) - int(counts.get('unique', 0))
+    logger.info(
+        f"Table product_variants créée : {variants['variant_group_id'].nunique()} groupes pour {len(variants)} produits, "
+        f"{grouped} déclinaisons regroupées (URL : {counts.get('url', 0)}, slug : {counts.get('slug', 0)}, "
+        f"description : {counts.get('description', 0)})"
+    )
+
+    return variants
+
 def parse_product_information(info_str):
     
     if pd.isna(info_str):
@@ -107,38 +221,342 @@ def parse_product_information(info_str):
         except Exception:
             return {}
 
-def create_product_attributes_table(products_df):
-    
-    attributes_list = []
+_QUOTED_STRING = r"""'[^'\\\n\r\x00]*(?:\\.[^'\\\n\r\x00]*)*'|"[^"\\\n\r\x00]*(?:\\.[^"\\\n\r\x00]*)*\""""
+_DICT_PAIR_PATTERN = re.compile(
+    rf"[ \t\n\r\f]*({_QUOTED_STRING})[ \t\n\r\f]*:[ \t\n\r\f]*({_QUOTED_STRING})[ \t\n\r\f]*(,?)"
+)
+_DICT_END_PATTERN = re.compile(r"[ \t\n\r\f]*\}[ \t\n\r\f]*\Z")
+
+ATTRIBUTE_SHARD_SIZE = 20_000
+
+def _decode_string_token(token):
+
+    if "\\" not in token:
+        return token[1:-1]
+    return ast.literal_eval(token)
+
+def tokenize_information_dict(info_str):
+
+    text = info_str.lstrip(" \t")
+    if not text.startswith("{"):
+        return None
+
+    pairs = []
+    position = 1
+    while True:
+        match = _DICT_PAIR_PATTERN.match(text, position)
+        if not match:
+            break
+        pairs.append((match.group(1), match.group(2)))
+        position = match.end()
+        if not match.group(3):
+            break
+
+    if not _DICT_END_PATTERN.match(text, position):
+        return None
+
+    try:
+        return {_decode_string_token(key): _decode_string_token(value) for key, value in pairs}
+    except Exception:
+        return None
 
-    for idx, row in products_df.iterrows():
-        product_id = row['product_id']
-        info = parse_product_information(row['information'])
+def parse_product_information_fast(info_str):
+
+    if isinstance(info_str, str):
+        info_dict = tokenize_information_dict(info_str)
+        if info_dict is not None:
+            return info_dict
+
+    return parse_product_information(info_str)
+
+def extract_attribute_shard(informations):
+
+    counts = np.zeros(len(informations), dtype=np.int64)
+    keys = []
+    values = []
+
+    for position, info_str in enumerate(informations):
+        info = parse_product_information_fast(info_str)
+        counts[position] = len(info)
 
         for key, value in info.items():
-            attributes_list.append({
-                'product_id': product_id,
-                'attribute_key': key.strip(),
-                'attribute_value': str(value).strip() if value else None
-            })
+            keys.append(key.strip())
+            values.append(str(value).strip() if value else None)
+
+    return counts, keys, values
+
+@instrumented
+def create_product_attributes_table(products_df, workers=None):
+
+    product_ids = products_df['product_id'].to_numpy()
+    informations = products_df['information'].to_numpy(dtype=object)
+    shards = [
+        informations[start:start + ATTRIBUTE_SHARD_SIZE]
+        for start in range(0, len(informations), ATTRIBUTE_SHARD_SIZE)
+    ]
 
-    attributes_df = pd.DataFrame(attributes_list)
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(extract_attribute_shard, shards))
+    else:
+        results = [extract_attribute_shard(shard) for shard in shards]
+
+    counts = np.concatenate([result[0] for result in results]) if results else np.zeros(0, dtype=np.int64)
+
+    attributes_df = pd.DataFrame({
+        'product_id': np.repeat(product_ids, counts),
+        'attribute_key': [key for result in results for key in result[1]],
+        'attribute_value': [value for result in results for value in result[2]]
+    })
 
     if len(attributes_df) > 0:
-        logger.info(f"Table product_attributes créée : {len(attributes_df)} attributs")
+        logger.info(f"Table product_attributes créée : {len(attributes_df)} attributs ({len(shards)} lots, {workers} processus)")
     else:
         logger.warning("Aucun attribut extrait du champ information")
 
     return attributes_df
 
+SCHEMA_VERSION = 6
+
+BULK_INSERT_BATCH_SIZE = 50_000
+
+TABLE_SCHEMAS = {
+    'brands': """
+    CREATE TABLE IF NOT EXISTS brands (
+        brand_id INTEGER PRIMARY KEY,
+        brand TEXT NOT NULL
+    );
+    """,
+    'categories': """
+    CREATE TABLE IF NOT EXISTS categories (
+        category_id INTEGER PRIMARY KEY,
+        category TEXT NOT NULL
+    );
+    """,
+    'products': """
+    CREATE TABLE IF NOT EXISTS products (
+        product_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        brand_id INTEGER REFERENCES brands(brand_id),
+        category_id INTEGER REFERENCES categories(category_id),
+        url TEXT,
+        colour TEXT,
+        price_mrp FLOAT,
+        price_sale FLOAT,
+        discount_rate FLOAT,
+        is_on_sale BOOLEAN,
+        information TEXT,
+        description TEXT,
+        effective_price FLOAT GENERATED ALWAYS AS (
+            CASE
+              WHEN price_sale IS NOT NULL AND price_sale > 0 THEN price_sale
+              ELSE price_mrp
+            END
+        ) STORED,
+        computed_discount_pct FLOAT GENERATED ALWAYS AS (
+            CASE
+              WHEN price_mrp IS NOT NULL AND price_mrp > 0
+                   AND price_sale IS NOT NULL AND price_sale >= 0
+              THEN ROUND(100.0 * (price_mrp - price_sale) / price_mrp, 2)
+              ELSE NULL
+            END
+        ) STORED
+    );
+    """,
+    'reviews': """
+    CREATE TABLE IF NOT EXISTS reviews (
+        product_id INTEGER PRIMARY KEY REFERENCES products(product_id),
+        rating FLOAT,
+        review_count INTEGER,
+        popularity_score FLOAT
+    );
+    """,
+    # Clés et valeurs d'attributs stockées une seule fois : product_attributes ne contient que des
+    # identifiants, la vue view_product_attributes restitue l'ancienne disposition textuelle
+    'attribute_keys': """
+    CREATE TABLE IF NOT EXISTS attribute_keys (
+        key_id INTEGER PRIMARY KEY,
+        attribute_key TEXT NOT NULL UNIQUE
+    );
+    """,
+    'attribute_values': """
+    CREATE TABLE IF NOT EXISTS attribute_values (
+        value_id INTEGER PRIMARY KEY,
+        attribute_value TEXT NOT NULL UNIQUE
+    );
+    """,
+    'product_attributes': """
+    CREATE TABLE IF NOT EXISTS product_attributes (
+        product_id INTEGER NOT NULL REFERENCES products(product_id),
+        key_id INTEGER NOT NULL REFERENCES attribute_keys(key_id),
+        value_id INTEGER REFERENCES attribute_values(value_id)
+    );
+    """,
+    # Index inversé par attribut : pour chaque couple (clé, valeur), les identifiants triés des
+    # produits concernés, sérialisés en entiers 32 bits (recherche à facettes, facet_search.py)
+    'attribute_postings': """
+    CREATE TABLE IF NOT EXISTS attribute_postings (
+        key_id INTEGER NOT NULL REFERENCES attribute_keys(key_id),
+        value_id INTEGER NOT NULL REFERENCES attribute_values(value_id),
+        product_count INTEGER NOT NULL,
+        product_ids BLOB NOT NULL,
+        PRIMARY KEY (key_id, value_id)
+    ) WITHOUT ROWID;
+    """,
+    'product_fingerprints': """
+    CREATE TABLE IF NOT EXISTS product_fingerprints (
+        product_id INTEGER PRIMARY KEY REFERENCES products(product_id),
+        url TEXT NOT NULL,
+        content_hash TEXT NOT NULL
+    );
+    """,
+    'product_variants': """
+    CREATE TABLE IF NOT EXISTS product_variants (
+        product_id INTEGER PRIMARY KEY REFERENCES products(product_id),
+        variant_group_id INTEGER NOT NULL REFERENCES products(product_id),
+        canonical_url TEXT NOT NULL,
+        canonical_slug TEXT,
+        match_type TEXT NOT NULL CHECK (match_type IN ('url', 'slug', 'description', 'unique'))
+    );
+    """,
+    # Table dérivée, sans clé étrangère (comme category_stats) : elle est reconstruite après les
+    # suppressions d'un chargement incrémental. La clé primaire d'une table WITHOUT ROWID sert
+    # d'index couvrant : un classement se lit par une seule recherche suivie d'un parcours contigu
+    'product_rankings': """
+    CREATE TABLE IF NOT EXISTS product_rankings (
+        scope TEXT NOT NULL CHECK (scope IN ('all', 'category', 'brand')),
+        scope_id INTEGER NOT NULL,
+        metric TEXT NOT NULL CHECK (metric IN ('rating', 'review_count', 'popularity_score')),
+        rank INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        name TEXT,
+        brand TEXT,
+        category TEXT,
+        rating FLOAT,
+        review_count INTEGER,
+        popularity_score FLOAT,
+        PRIMARY KEY (scope, scope_id, metric, rank)
+    ) WITHOUT ROWID;
+    """
+}
+
 def create_database_schema(conn):
     
     cursor = conn.cursor()
 
     cursor.execute("PRAGMA foreign_keys = ON;")
 
-    logger.info("Schéma de base de données initialisé avec contraintes")
+    for table_sql in TABLE_SCHEMAS.values():
+        cursor.execute(table_sql)
+
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+
+    logger.info(f"Schéma de base de données initialisé avec contraintes : {len(TABLE_SCHEMAS)} tables")
+
+def apply_load_pragmas(conn, in_place=False):
+
+    pragmas = [
+        "PRAGMA cache_size = -262144;",
+        "PRAGMA temp_store = MEMORY;"
+    ]
+
+    if in_place:
+        pragmas.append("PRAGMA journal_mode = WAL;")
+        pragmas.append("PRAGMA synchronous = NORMAL;")
+    else:
+        pragmas.append("PRAGMA journal_mode = MEMORY;")
+        pragmas.append("PRAGMA synchronous = OFF;")
+
+    for pragma_sql in pragmas:
+        conn.execute(pragma_sql)
+
+def _sqlite_values(series):
+
+    # SQLite stocke un NaN lié en paramètre comme NULL : seules les colonnes non flottantes
+    # contenant des valeurs manquantes (pd.NA, None, NaT) doivent être converties explicitement
+    if series.dtype.kind != 'f' and series.hasnans:
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.tolist()
+
+def encode_attribute_column(conn, values, table_name, id_column, value_column):
+
+    # Identifiants du dictionnaire déjà en base conservés, nouvelles entrées numérotées à la suite
+    # et insérées : un chargement incrémental réutilise le dictionnaire existant
+    existing = pd.read_sql_query(f"SELECT {id_column}, {value_column} FROM {table_name};", conn)
+    distinct = pd.Series(values.dropna().unique(), dtype=object)
+    ids = assign_stable_ids(distinct, existing, value_column, id_column)
+
+    new_entries = pd.DataFrame({id_column: ids, value_column: distinct})
+    new_entries = new_entries[~new_entries[value_column].isin(existing[value_column])]
+    bulk_insert(conn, table_name, new_entries)
+
+    return values.map(pd.Series(ids.to_numpy(), index=distinct)).astype('Int64')
+
+@instrumented(rows_arg='attributes')
+def load_product_attributes(conn, attributes):
+
+    if len(attributes) == 0:
+        return attributes
+
+    encoded = pd.DataFrame({
+        'product_id': attributes['product_id'],
+        'key_id': encode_attribute_column(conn, attributes['attribute_key'], "attribute_keys", "key_id", "attribute_key"),
+        'value_id': encode_attribute_column(
+            conn, attributes['attribute_value'], "attribute_values", "value_id", "attribute_value"
+        )
+    })
+    bulk_insert(conn, "product_attributes", encoded)
+
+    return encoded
+
+@instrumented
+def refresh_attribute_postings(conn, key_ids=None):
+
+    # Reconstruction complète, ou limitée aux clés touchées par un chargement incrémental
+    if key_ids is None:
+        conn.execute("DELETE FROM attribute_postings;")
+        where_sql = ""
+    else:
+        load_temp_ids(conn, "posting_keys", key_ids)
+        conn.execute("DELETE FROM attribute_postings WHERE key_id IN (SELECT id FROM temp.posting_keys);")
+        where_sql = "AND key_id IN (SELECT id FROM temp.posting_keys)"
+
+    pairs = pd.read_sql_query(
+        f"SELECT key_id, value_id, product_id FROM product_attributes WHERE value_id IS NOT NULL {where_sql};", conn
+    )
+    postings = conn.executemany(
+        "INSERT INTO attribute_postings VALUES (?, ?, ?, ?);",
+        build_postings(pairs['key_id'].to_numpy(), pairs['value_id'].to_numpy(), pairs['product_id'].to_numpy())
+    ).rowcount
+
+    if key_ids is not None:
+        conn.execute("DROP TABLE temp.posting_keys;")
+
+    scope = "complet" if key_ids is None else f"{len(key_ids)} clés"
+    logger.info(f"Index inversés attribute_postings rafraîchis ({scope}) : {postings} listes, {len(pairs)} entrées")
+
+def bulk_insert(conn, table_name, df, batch_size=BULK_INSERT_BATCH_SIZE):
 
+    if len(df) == 0:
+        return
+
+    columns = ", ".join(df.columns)
+    placeholders = ", ".join("?" * len(df.columns))
+    insert_sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders});"
+
+    start = time.perf_counter()
+    for offset in range(0, len(df), batch_size):
+        batch = df.iloc[offset:offset + batch_size]
+        conn.executemany(insert_sql, zip(*(_sqlite_values(batch[column]) for column in batch.columns)))
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"Table {table_name} chargée : {len(df)} lignes en {elapsed:.3f} s "
+        f"({len(df) / max(elapsed, 1e-9):,.0f} lignes/s)"
+    )
+
+@instrumented
 def create_indexes(conn):
     
     cursor = conn.cursor()
@@ -148,18 +566,237 @@ def create_indexes(conn):
         "CREATE INDEX IF NOT EXISTS idx_products_category ON products(category_id);",
         "CREATE INDEX IF NOT EXISTS idx_products_price ON products(price_sale);",
         "CREATE INDEX IF NOT EXISTS idx_products_discount ON products(discount_rate);",
+        "CREATE INDEX IF NOT EXISTS idx_products_effective_price ON products(effective_price);",
+        "CREATE INDEX IF NOT EXISTS idx_products_computed_discount ON products(computed_discount_pct);",
         "CREATE INDEX IF NOT EXISTS idx_reviews_rating ON reviews(rating);",
         "CREATE INDEX IF NOT EXISTS idx_reviews_popularity ON reviews(popularity_score);",
-        "CREATE INDEX IF NOT EXISTS idx_attributes_key ON product_attributes(attribute_key);"
+        "CREATE INDEX IF NOT EXISTS idx_attributes_product ON product_attributes(product_id);",
+        "CREATE INDEX IF NOT EXISTS idx_attributes_key_product ON product_attributes(key_id, product_id);",
+        "CREATE INDEX IF NOT EXISTS idx_variants_group ON product_variants(variant_group_id);"
     ]
 
     for index_sql in indexes:
         cursor.execute(index_sql)
 
-    conn.commit()
     logger.info(f"{len(indexes)} index créés")
 
-def create_business_views(conn):
+MATERIALIZED_STATS = {
+    'category_stats': ('categories', 'category_id', 'category'),
+    'brand_stats': ('brands', 'brand_id', 'brand')
+}
+
+STATS_COLUMNS = "product_count, avg_effective_price, avg_rating, total_reviews, min_price, max_price"
+
+def load_temp_ids(conn, table_name, ids):
+
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table_name} (id INTEGER PRIMARY KEY);")
+    conn.execute(f"DELETE FROM temp.{table_name};")
+    conn.executemany(f"INSERT OR IGNORE INTO temp.{table_name} VALUES (?);", [(int(i),) for i in ids])
+
+def has_materialized_stats(conn):
+
+    row = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='category_stats';").fetchone()
+    return row[0] > 0
+
+def create_materialized_stats(conn):
+
+    cursor = conn.cursor()
+
+    for table_name, (dimension_table, key_column, name_column) in MATERIALIZED_STATS.items():
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            {key_column} INTEGER PRIMARY KEY,
+            {name_column} TEXT NOT NULL,
+            product_count INTEGER,
+            avg_effective_price FLOAT,
+            avg_rating FLOAT,
+            total_reviews INTEGER,
+            min_price FLOAT,
+            max_price FLOAT
+        );
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_name ON {table_name}({name_column});")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_reviews ON {table_name}(total_reviews);")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_rating ON {table_name}(avg_rating, total_reviews);")
+
+    refresh_materialized_stats(conn)
+
+@instrumented
+def refresh_materialized_stats(conn, brand_ids=None, category_ids=None):
+
+    affected_ids = {'category_stats': category_ids, 'brand_stats': brand_ids}
+
+    for table_name, (dimension_table, key_column, name_column) in MATERIALIZED_STATS.items():
+        ids = affected_ids[table_name]
+        select_sql = f"""
+        SELECT
+            d.{key_column},
+            d.{name_column},
+            COUNT(p.product_id),
+            ROUND(AVG(p.effective_price), 2),
+            ROUND(AVG(r.rating), 2),
+            SUM(r.review_count),
+            MIN(p.effective_price),
+            MAX(p.effective_price)
+        FROM {dimension_table} d
+        LEFT JOIN products p ON p.{key_column} = d.{key_column}
+        LEFT JOIN reviews r  ON r.product_id = p.product_id
+        {{where}}
+        GROUP BY d.{key_column}
+        """
+
+        if ids is None:
+            conn.execute(f"DELETE FROM {table_name};")
+            conn.execute(f"INSERT INTO {table_name} {select_sql.format(where='')}")
+        else:
+            load_temp_ids(conn, "affected_ids", ids)
+            conn.execute(f"DELETE FROM {table_name} WHERE {key_column} IN (SELECT id FROM temp.affected_ids);")
+            where_sql = f"WHERE d.{key_column} IN (SELECT id FROM temp.affected_ids)"
+            conn.execute(f"INSERT INTO {table_name} {select_sql.format(where=where_sql)}")
+            conn.execute("DROP TABLE temp.affected_ids;")
+
+    scope = "complet" if brand_ids is None and category_ids is None else (
+        f"{len(category_ids or [])} catégories, {len(brand_ids or [])} marques"
+    )
+    logger.info(f"Statistiques matérialisées rafraîchies ({scope})")
+
+# Ordre de chaque classement (départage par product_id pour un résultat stable d'un chargement
+# à l'autre) ; LEADERBOARD_TOP_K produits conservés par classement, borne connue de QueryService
+LEADERBOARD_METRICS = {
+    'rating': "r.rating DESC, r.review_count DESC",
+    'review_count': "r.review_count DESC, r.rating DESC",
+    'popularity_score': "r.popularity_score DESC, r.review_count DESC"
+}
+
+# Portée d'un classement et colonne de partition ; le classement global a pour scope_id 0
+LEADERBOARD_SCOPES = {
+    'all': None,
+    'category': 'category_id',
+    'brand': 'brand_id'
+}
+
+@instrumented
+def refresh_leaderboards(conn, brand_ids=None, category_ids=None, top_k=LEADERBOARD_TOP_K):
+
+    # Le classement global est toujours recalculé ; ceux par catégorie et par marque ne le sont
+    # que pour les identifiants touchés par un chargement incrémental
+    affected_ids = {'category': category_ids, 'brand': brand_ids}
+    rows = 0
+
+    for scope, key_column in LEADERBOARD_SCOPES.items():
+        ids = affected_ids.get(scope)
+        where_sql = ""
+
+        if key_column is None:
+            conn.execute("DELETE FROM product_rankings WHERE scope = 'all';")
+        elif ids is None:
+            conn.execute("DELETE FROM product_rankings WHERE scope = ?;", (scope,))
+            where_sql = f"AND p.{key_column} IS NOT NULL"
+        else:
+            load_temp_ids(conn, "ranking_ids", ids)
+            conn.execute(
+                "DELETE FROM product_rankings WHERE scope = ? AND scope_id IN (SELECT id FROM temp.ranking_ids);",
+                (scope,)
+            )
+            where_sql = f"AND p.{key_column} IN (SELECT id FROM temp.ranking_ids)"
+
+        scope_id_sql = "0" if key_column is None else f"p.{key_column}"
+        partition_sql = "" if key_column is None else f"PARTITION BY p.{key_column} "
+
+        for metric, order_sql in LEADERBOARD_METRICS.items():
+            cursor = conn.execute(f"""
+            INSERT INTO product_rankings
+            SELECT * FROM (
+                SELECT
+                    '{scope}',
+                    {scope_id_sql},
+                    '{metric}',
+                    ROW_NUMBER() OVER ({partition_sql}ORDER BY {order_sql}, p.product_id) AS rank,
+                    p.product_id,
+                    p.name,
+                    b.brand,
+                    c.category,
+                    r.rating,
+                    r.review_count,
+                    r.popularity_score
+                FROM reviews r
+                JOIN products p ON p.product_id = r.product_id
+                LEFT JOIN brands b ON p.brand_id = b.brand_id
+                LEFT JOIN categories c ON p.category_id = c.category_id
+                WHERE r.{metric} IS NOT NULL {where_sql}
+            )
+            WHERE rank <= ?;
+            """, (top_k,))
+            rows += cursor.rowcount
+
+        if ids is not None and key_column is not None:
+            conn.execute("DROP TABLE temp.ranking_ids;")
+
+    scope = "complet" if brand_ids is None and category_ids is None else (
+        f"{len(category_ids or [])} catégories, {len(brand_ids or [])} marques"
+    )
+    logger.info(f"Classements product_rankings rafraîchis ({scope}) : {rows} lignes, top {top_k}")
+
+def has_search_index(conn):
+
+    row = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='products_fts';").fetchone()
+    return row[0] > 0
+
+@instrumented
+def create_search_index(conn):
+
+    try:
+        conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name,
+            description,
+            brand,
+            category,
+            attributes,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Index plein texte non créé (FTS5 indisponible) : {str(e)}")
+        return
+
+    refresh_search_index(conn)
+
+def refresh_search_index(conn, product_ids=None):
+
+    select_sql = """
+    INSERT INTO products_fts (rowid, name, description, brand, category, attributes)
+    SELECT
+        p.product_id,
+        p.name,
+        p.description,
+        b.brand,
+        c.category,
+        (
+            SELECT group_concat(v.attribute_value, ' ')
+            FROM product_attributes a
+            JOIN attribute_values v ON v.value_id = a.value_id
+            WHERE a.product_id = p.product_id
+        )
+    FROM products p
+    LEFT JOIN brands b ON p.brand_id = b.brand_id
+    LEFT JOIN categories c ON p.category_id = c.category_id
+    {where}
+    """
+
+    if product_ids is None:
+        conn.execute("DELETE FROM products_fts;")
+        conn.execute(select_sql.format(where=""))
+        conn.execute("INSERT INTO products_fts (products_fts) VALUES ('optimize');")
+        logger.info("Index plein texte products_fts construit")
+    else:
+        load_temp_ids(conn, "fts_ids", product_ids)
+        conn.execute("DELETE FROM products_fts WHERE rowid IN (SELECT id FROM temp.fts_ids);")
+        conn.execute(select_sql.format(where="WHERE p.product_id IN (SELECT id FROM temp.fts_ids)"))
+        conn.execute("DROP TABLE temp.fts_ids;")
+        logger.info(f"Index plein texte products_fts mis à jour : {len(product_ids)} produits")
+
+def create_business_views(conn, materialize_stats=False):
     cursor = conn.cursor()
 
     view_catalog = """
@@ -173,16 +810,8 @@ def create_business_views(conn):
         p.colour,
         p.price_mrp,
         p.price_sale,
-        CASE
-          WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale
-          ELSE p.price_mrp
-        END AS effective_price,
-        CASE
-          WHEN p.price_mrp IS NOT NULL AND p.price_mrp > 0
-               AND p.price_sale IS NOT NULL AND p.price_sale >= 0
-          THEN ROUND(100.0 * (p.price_mrp - p.price_sale) / p.price_mrp, 2)
-          ELSE NULL
-        END AS computed_discount_pct,
+        p.effective_price,
+        p.computed_discount_pct,
         p.discount_rate,
         p.is_on_sale
     FROM products p
@@ -221,16 +850,11 @@ def create_business_views(conn):
     SELECT
         c.category,
         COUNT(p.product_id) AS product_count,
-        ROUND(AVG(
-            CASE
-              WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale
-              ELSE p.price_mrp
-            END
-        ), 2) AS avg_effective_price,
+        ROUND(AVG(p.effective_price), 2) AS avg_effective_price,
         ROUND(AVG(r.rating), 2) AS avg_rating,
         SUM(r.review_count) AS total_reviews,
-        MIN(CASE WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale ELSE p.price_mrp END) AS min_price,
-        MAX(CASE WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale ELSE p.price_mrp END) AS max_price
+        MIN(p.effective_price) AS min_price,
+        MAX(p.effective_price) AS max_price
     FROM categories c
     LEFT JOIN products p ON p.category_id = c.category_id
     LEFT JOIN reviews r  ON r.product_id = p.product_id
@@ -242,76 +866,281 @@ def create_business_views(conn):
     SELECT
         b.brand,
         COUNT(p.product_id) AS product_count,
-        ROUND(AVG(
-            CASE
-              WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale
-              ELSE p.price_mrp
-            END
-        ), 2) AS avg_effective_price,
+        ROUND(AVG(p.effective_price), 2) AS avg_effective_price,
         ROUND(AVG(r.rating), 2) AS avg_rating,
         SUM(r.review_count) AS total_reviews,
-        MIN(CASE WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale ELSE p.price_mrp END) AS min_price,
-        MAX(CASE WHEN p.price_sale IS NOT NULL AND p.price_sale > 0 THEN p.price_sale ELSE p.price_mrp END) AS max_price
+        MIN(p.effective_price) AS min_price,
+        MAX(p.effective_price) AS max_price
     FROM brands b
     LEFT JOIN products p ON p.brand_id = b.brand_id
     LEFT JOIN reviews r  ON r.product_id = p.product_id
     GROUP BY b.brand;
     """
 
+    view_product_attributes = """
+    CREATE VIEW IF NOT EXISTS view_product_attributes AS
+    SELECT
+        a.product_id,
+        k.attribute_key,
+        v.attribute_value
+    FROM product_attributes a
+    JOIN attribute_keys k ON k.key_id = a.key_id
+    LEFT JOIN attribute_values v ON v.value_id = a.value_id;
+    """
+
+    if materialize_stats:
+        create_materialized_stats(conn)
+
+        view_category_stats = f"""
+        CREATE VIEW IF NOT EXISTS view_category_stats AS
+        SELECT category, {STATS_COLUMNS}
+        FROM category_stats;
+        """
+
+        view_brand_stats = f"""
+        CREATE VIEW IF NOT EXISTS view_brand_stats AS
+        SELECT brand, {STATS_COLUMNS}
+        FROM brand_stats;
+        """
+
     views = [
         view_catalog,
         view_top_products,
         view_promotions,
         view_category_stats,
-        view_brand_stats
+        view_brand_stats,
+        view_product_attributes
     ]
 
     for view_sql in views:
         cursor.execute(view_sql)
 
-    conn.commit()
     logger.info(f"{len(views)} vues métier créées")
 
-def export_to_database(brands, categories, products, reviews, attributes, db_path):
-    
-    try:
+@instrumented
+def check_foreign_keys(conn):
 
-        if os.path.exists(db_path):
-            os.remove(db_path)
-            logger.info("Ancienne base de données supprimée")
+    violations = conn.execute("PRAGMA foreign_key_check;").fetchall()
+    if violations:
+        tables = sorted({violation[0] for violation in violations})
+        raise sqlite3.IntegrityError(f"{len(violations)} violations de clés étrangères dans {tables}")
 
-        conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    logger.info("Contraintes de clés étrangères vérifiées")
 
-        create_database_schema(conn)
+def drop_database_objects(conn):
+
+    # Vues, puis tables virtuelles (leurs tables internes disparaissent avec elles), puis tables ;
+    # les index suivent leur table
+    for object_type, condition in [
+        ('view', "type = 'view'"),
+        ('table', "type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'"),
+        ('table', "type = 'table' AND name NOT LIKE 'sqlite_%'")
+    ]:
+        names = [row[0] for row in conn.execute(f"SELECT name FROM sqlite_master WHERE {condition};")]
+        for name in names:
+            conn.execute(f'DROP {object_type.upper()} IF EXISTS "{name}";')
 
-        brands.to_sql("brands", conn, if_exists="replace", index=False)
-        logger.info("Table brands exportée")
+@instrumented(rows_arg='products')
+def export_to_database(brands, categories, products, reviews, attributes, fingerprints, variants, db_path,
+                       materialize_stats=False):
 
-        categories.to_sql("categories", conn, if_exists="replace", index=False)
-        logger.info("Table categories exportée")
+    # Reconstruction sur place, en une seule transaction d'écriture : aucun fichier n'est
+    # substitué à la base, dont les lecteurs en mode WAL (-wal / -shm) gardent leur instantané
+    # jusqu'au COMMIT. Un échec annule la transaction et laisse la base précédente intacte
+    conn = sqlite3.connect(db_path, isolation_level=None)
 
-        products.to_sql("products", conn, if_exists="replace", index=False)
-        logger.info("Table products exportée")
+    try:
 
-        reviews.to_sql("reviews", conn, if_exists="replace", index=False)
-        logger.info("Table reviews exportée")
+        apply_load_pragmas(conn, in_place=True)
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        conn.execute("BEGIN IMMEDIATE;")
 
-        if len(attributes) > 0:
-            attributes.to_sql("product_attributes", conn, if_exists="replace", index=False)
-            logger.info("Table product_attributes exportée")
+        drop_database_objects(conn)
+        create_database_schema(conn)
+
+        bulk_insert(conn, "brands", brands)
+        bulk_insert(conn, "categories", categories)
+        bulk_insert(conn, "products", products)
+        bulk_insert(conn, "reviews", reviews)
+        load_product_attributes(conn, attributes)
+        bulk_insert(conn, "product_fingerprints", fingerprints)
+        bulk_insert(conn, "product_variants", variants)
+        check_foreign_keys(conn)
 
         create_indexes(conn)
 
-        create_business_views(conn)
+        refresh_leaderboards(conn)
 
-        conn.close()
+        refresh_attribute_postings(conn)
+
+        create_business_views(conn, materialize_stats=materialize_stats)
+
+        create_search_index(conn)
+
+        conn.execute("COMMIT;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+        # Le WAL contient toute la base reconstruite : il est reporté dans le fichier principal
+        # dès que les lecteurs en cours le permettent
+        busy, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+        if busy or checkpointed < wal_pages:
+            logger.warning(
+                f"WAL reporté partiellement ({checkpointed}/{wal_pages} pages, lecteurs actifs) : "
+                f"la base reste cohérente, le fichier principal seul ne l'est qu'après le prochain checkpoint"
+            )
 
         logger.info(f"Base de données créée avec succès : {db_path}")
 
     except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
         logger.error(f"Erreur lors de la création de la base : {str(e)}")
         raise
+    finally:
+        conn.close()
+
+def detect_product_changes(fingerprints, existing_fingerprints):
+
+    merged = fingerprints.merge(
+        existing_fingerprints[['product_id', 'content_hash']],
+        on='product_id',
+        how='outer',
+        suffixes=('', '_old'),
+        indicator=True
+    )
+
+    in_both = merged['_merge'] == 'both'
+    changes = {
+        'new': merged.loc[merged['_merge'] == 'left_only', 'product_id'],
+        'changed': merged.loc[in_both & (merged['content_hash'] != merged['content_hash_old']), 'product_id'],
+        'removed': merged.loc[merged['_merge'] == 'right_only', 'product_id']
+    }
+    changes = {name: ids.astype('int64').tolist() for name, ids in changes.items()}
+    changes['unchanged'] = int(in_both.sum()) - len(changes['changed'])
+
+    logger.info(
+        f"Delta détecté : {len(changes['new'])} nouveaux, {len(changes['changed'])} modifiés, "
+        f"{len(changes['removed'])} supprimés, {changes['unchanged']} inchangés"
+    )
+
+    return changes
 
+@instrumented(rows_arg='products')
+def export_incremental(brands, categories, products, reviews, attributes, fingerprints, variants, existing_fingerprints,
+                       db_path):
+
+    changes = detect_product_changes(fingerprints, existing_fingerprints)
+    stale_ids = changes['changed'] + changes['removed']
+    upserted_ids = changes['new'] + changes['changed']
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    apply_load_pragmas(conn, in_place=True)
+
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+
+        load_temp_ids(conn, "stale_products", stale_ids)
+
+        affected_brands = set()
+        affected_categories = set()
+        for brand_id, category_id in conn.execute(
+            "SELECT brand_id, category_id FROM products WHERE product_id IN (SELECT id FROM temp.stale_products);"
+        ):
+            affected_brands.add(brand_id)
+            affected_categories.add(category_id)
+
+        # Index inversés des clés portées par les produits supprimés ou modifiés, avant suppression
+        affected_keys = {
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT key_id FROM product_attributes WHERE product_id IN (SELECT id FROM temp.stale_products);"
+            )
+        }
+
+        # Un nouveau produit peut rejoindre un groupe existant : la table des déclinaisons,
+        # compacte, est entièrement réécrite
+        conn.execute("DELETE FROM product_variants;")
+
+        for table_name in ["product_attributes", "reviews", "product_fingerprints", "products"]:
+            conn.execute(
+                f"DELETE FROM {table_name} WHERE product_id IN (SELECT id FROM temp.stale_products);"
+            )
+
+        known_brands = {row[0] for row in conn.execute("SELECT brand_id FROM brands;")}
+        bulk_insert(conn, "brands", brands[~brands['brand_id'].isin(known_brands)])
+
+        known_categories = {row[0] for row in conn.execute("SELECT category_id FROM categories;")}
+        bulk_insert(conn, "categories", categories[~categories['category_id'].isin(known_categories)])
+
+        upserted_products = products[products['product_id'].isin(upserted_ids)]
+        affected_brands.update(upserted_products['brand_id'].dropna().astype('int64'))
+        affected_categories.update(upserted_products['category_id'].dropna().astype('int64'))
+
+        bulk_insert(conn, "products", upserted_products)
+        bulk_insert(conn, "reviews", reviews[reviews['product_id'].isin(upserted_ids)])
+        if len(attributes) > 0:
+            encoded = load_product_attributes(conn, attributes[attributes['product_id'].isin(upserted_ids)])
+            if len(encoded) > 0:
+                affected_keys.update(encoded['key_id'].unique().tolist())
+        bulk_insert(conn, "product_fingerprints", fingerprints[fingerprints['product_id'].isin(upserted_ids)])
+        bulk_insert(conn, "product_variants", variants)
+
+        conn.execute("DELETE FROM brands WHERE brand_id NOT IN (SELECT brand_id FROM products WHERE brand_id IS NOT NULL);")
+        conn.execute("DELETE FROM categories WHERE category_id NOT IN (SELECT category_id FROM products WHERE category_id IS NOT NULL);")
+        refresh_attribute_postings(conn, sorted(affected_keys))
+        conn.execute("DELETE FROM attribute_keys WHERE key_id NOT IN (SELECT key_id FROM product_attributes);")
+        conn.execute(
+            "DELETE FROM attribute_values WHERE value_id NOT IN "
+            "(SELECT value_id FROM product_attributes WHERE value_id IS NOT NULL);"
+        )
+
+        if has_materialized_stats(conn):
+            refresh_materialized_stats(
+                conn,
+                brand_ids=sorted(i for i in affected_brands if i is not None),
+                category_ids=sorted(i for i in affected_categories if i is not None)
+            )
+
+        refresh_leaderboards(
+            conn,
+            brand_ids=sorted(i for i in affected_brands if i is not None),
+            category_ids=sorted(i for i in affected_categories if i is not None)
+        )
+
+        if has_search_index(conn):
+            refresh_search_index(conn, stale_ids + upserted_ids)
+
+        conn.execute("DROP TABLE temp.stale_products;")
+        conn.execute("COMMIT;")
+
+        logger.info(f"Base de données mise à jour de façon incrémentale : {db_path}")
+
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        logger.error(f"Erreur lors de la mise à jour incrémentale : {str(e)}")
+        raise
+    finally:
+        conn.close()
+
+    return changes
+
+@instrumented(rows_arg='products')
+def record_price_history(products, history_path=PRICE_HISTORY_PATH, observed_at=None):
+
+    # Relevé ajouté à l'historique, qui survit à la reconstruction de data_market.db : seuls les
+    # produits nouveaux ou dont le prix a changé depuis le relevé précédent y ajoutent une ligne
+    conn = open_price_history(history_path)
+    try:
+        return record_price_snapshot(conn, products, observed_at)
+    except ValueError as e:
+        logger.warning(f"Historique des prix non mis à jour : {str(e)}")
+        return None
+    finally:
+        conn.close()
+
+@instrumented
 def generate_database_stats(db_path):
     
     conn = sqlite3.connect(db_path)
@@ -337,9 +1166,62 @@ def generate_database_stats(db_path):
 
     conn.close()
 
+def parse_args():
+
+    parser = argparse.ArgumentParser(description="Création de la base de données normalisée")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Nombre de processus pour l'extraction des attributs (défaut : nombre de cœurs)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Met à jour la base existante (nouveaux, modifiés, supprimés) au lieu de la reconstruire"
+    )
+    parser.add_argument(
+        "--materialize-stats",
+        action="store_true",
+        help="Matérialise view_category_stats et view_brand_stats en tables agrégées indexées"
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Regroupe aussi les déclinaisons aux descriptions quasi identiques (MinHash / LSH, même marque)"
+    )
+    parser.add_argument(
+        "--price-history",
+        default=PRICE_HISTORY_PATH,
+        help="Base SQLite de l'historique des prix, complétée à chaque chargement"
+    )
+    parser.add_argument(
+        "--no-price-history",
+        action="store_true",
+        help="N'ajoute pas ce chargement à l'historique des prix"
+    )
+    parser.add_argument(
+        "--observed-at",
+        default=None,
+        help="Date du relevé pour l'historique des prix (ISO 8601, défaut : maintenant)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=INPUT_FORMATS,
+        default="csv",
+        help="Format du jeu nettoyé produit par 01_load_and_clean.py (csv ou parquet)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Enregistre un profil cProfile de l'exécution dans ../outputs/profiles"
+    )
+    return parser.parse_args()
+
 def main():
 
-    input_path = os.path.join("..", "outputs", "products_clean.csv")
+    args = parse_args()
+    input_path = os.path.join("..", "outputs", f"products_clean.{args.format}")
     db_path = os.path.join("..", "outputs", "data_market.db")
 
     logger.info("=" * 60)
@@ -348,17 +1230,41 @@ def main():
 
     try:
 
-        df = load_clean_data(input_path)
-
-        brands = create_brands_table(df)
-        categories = create_categories_table(df)
-        products, products_full = create_products_table(df, brands, categories)
-        reviews = create_reviews_table(products_full)
-        attributes = create_product_attributes_table(products_full)
-
-        export_to_database(brands, categories, products, reviews, attributes, db_path)
-
-        generate_database_stats(db_path)
+        with pipeline_run("02_split_tables", profile=args.profile):
+            df = load_clean_data(input_path, columns=CLEAN_DATA_COLUMNS)
+            state = load_existing_state(db_path)
+
+            if df['url'].duplicated().any():
+                logger.warning("URLs dupliquées dans les données : identifiants produits renumérotés, reconstruction complète")
+                state['fingerprints'] = state['fingerprints'].iloc[0:0]
+
+            brands = create_brands_table(df, state['brands'])
+            categories = create_categories_table(df, state['categories'])
+            products, products_full = create_products_table(df, brands, categories, state['fingerprints'])
+            fingerprints = create_fingerprints_table(df, products_full)
+            reviews = create_reviews_table(products_full)
+            attributes = create_product_attributes_table(products_full, workers=args.workers)
+            variants = create_product_variants_table(products_full, near_duplicates=args.near_duplicates)
+
+            incremental_possible = len(state['fingerprints']) > 0 and state['schema_version'] == SCHEMA_VERSION
+
+            if args.incremental and incremental_possible:
+                export_incremental(
+                    brands, categories, products, reviews, attributes, fingerprints, variants, state['fingerprints'],
+                    db_path
+                )
+            else:
+                if args.incremental:
+                    logger.warning("Base existante sans empreintes ou de schéma différent : reconstruction complète")
+                export_to_database(
+                    brands, categories, products, reviews, attributes, fingerprints, variants, db_path,
+                    materialize_stats=args.materialize_stats
+                )
+
+            if not args.no_price_history:
+                record_price_history(products, args.price_history, args.observed_at)
+
+            generate_database_stats(db_path)
 
         logger.info("=" * 60)
         logger.info("BASE DE DONNÉES CRÉÉE AVEC SUCCÈS")
@@ -1,114 +1,101 @@
-import sqlite3
+import argparse
+
 import pandas as pd
-import os
 
-def connect_to_db():
-    db_path = os.path.join("..", "outputs", "data_market.db")
-    if not os.path.exists(db_path):
-        raise FileNotFoundError(f"Base de données introuvable : {db_path}")
-    return sqlite3.connect(db_path)
+from query_service import QueryService, DB_PATH
+from export_results import EXPORT_FORMATS, EXPORT_PATH, export_query_results
+from instrumentation import format_summary, pipeline_run, step
+
+# Lignes affichées par requête : le résultat complet n'est lu qu'une fois, par l'export
+CONSOLE_PREVIEW_ROWS = 20
 
-def execute_query(conn, query, title):
+def print_query_result(service, name, columns, rows, row_count, params, explain=False):
     print("\n" + "=" * 80)
-    print(f"{title}")
+    print(f"{service.title(name, **params)}")
     print("=" * 80)
-    print(f"\nRequête SQL :\n{query}\n")
-
-    df = pd.read_sql_query(query, conn)
-    print(f"Résultats ({len(df)} lignes) :\n")
-    print(df.to_string(index=False))
+    resolved = service.resolve_params(name, params)
+    print(f"\nRequête SQL :\n{service.sql(name, resolved)}\n")
+    print(f"Paramètres : {resolved}\n")
+
+    if explain:
+        print("Plan d'exécution :")
+        for detail in service.explain(name, **params):
+            print(f"  - {detail}")
+        print()
+
+    print(f"Résultats ({row_count} lignes) :\n")
+    print(pd.DataFrame(rows, columns=columns).to_string(index=False))
+    if row_count > len(rows):
+        print(f"... {row_count - len(rows)} lignes supplémentaires dans l'export")
     print("\n")
 
-    return df
+def parse_args():
+    parser = argparse.ArgumentParser(description="Exemples de requêtes SQL métier sur data_market.db")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Affiche le plan d'exécution (EXPLAIN QUERY PLAN) de chaque requête"
+    )
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Exécute les requêtes en parallèle sur des connexions en lecture seule distinctes (export csv ou parquet)"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Nombre de lignes renvoyées par chaque requête (défaut : 10)"
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=EXPORT_FORMATS,
+        default='xlsx',
+        help="Format d'export des résultats : classeur Excel, ou un fichier CSV / Parquet par requête"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Enregistre un profil cProfile de l'exécution dans ../outputs/profiles"
+    )
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     print("\n" + "=" * 80)
     print("  DATA MARKET - EXEMPLES DE REQUÊTES SQL")
     print("=" * 80)
 
     try:
-        conn = connect_to_db()
-        results = {}
-
-        query_top = """
-        SELECT
-            name,
-            brand,
-            category,
-            rating,
-            review_count,
-            popularity_score
-        FROM view_top_products
-        WHERE rating IS NOT NULL
-        ORDER BY rating DESC, review_count DESC
-        LIMIT 10;
-        """
-        results['Top_Produits'] = execute_query(conn, query_top, "Top 10 produits les plus populaires")
-
-        query_promos = """
-        SELECT
-            name,
-            brand,
-            category,
-            price_mrp,
-            price_sale,
-            computed_discount_pct
-        FROM view_promotions
-        WHERE computed_discount_pct IS NOT NULL
-        ORDER BY computed_discount_pct DESC
-        LIMIT 10;
-        """
-        results['Top_Promotions'] = execute_query(conn, query_promos, "Top 10 meilleures promotions")
-
-        query_cat = """
-        SELECT
-            category,
-            product_count,
-            avg_rating,
-            total_reviews
-        FROM view_category_stats
-        ORDER BY total_reviews DESC
-        LIMIT 10;
-        """
-        results['Top_Categories'] = execute_query(conn, query_cat, "Top 10 catégories par engagement")
-
-        query_brand = """
-        SELECT
-            brand,
-            product_count,
-            avg_rating,
-            total_reviews
-        FROM view_brand_stats
-        WHERE avg_rating IS NOT NULL
-        ORDER BY avg_rating DESC, total_reviews DESC
-        LIMIT 10;
-        """
-        results['Top_Marques'] = execute_query(conn, query_brand, "Top 10 marques par satisfaction")
-
-        query_gems = """
-        SELECT
-            name,
-            brand,
-            category,
-            rating,
-            review_count
-        FROM view_top_products
-        WHERE rating >= 4.5 AND review_count BETWEEN 1 AND 20
-        ORDER BY rating DESC, review_count ASC
-        LIMIT 10;
-        """
-        results['Produits_A_Mettre_En_Avant'] = execute_query(conn, query_gems, "Produits à mettre en avant (haute note, peu connus)")
-
-        conn.close()
-
-        excel_path = os.path.join("..", "outputs", "resultats_requetes_metier.xlsx")
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            for sheet_name, df in results.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        with pipeline_run("03_business_queries", profile=args.profile) as run:
+            service = QueryService(DB_PATH)
+            params = {} if args.limit is None else {'limit': args.limit}
+
+            # Chaque requête est exécutée une seule fois : son curseur alimente l'export en flux,
+            # qui garde au passage les premières lignes pour l'affichage
+            export_path = EXPORT_PATH + ".xlsx" if args.export_format == 'xlsx' else EXPORT_PATH
+            previews = {}
+            with step("run_queries") as metrics:
+                row_counts = export_query_results(
+                    service, None, export_path, args.export_format, previews=previews,
+                    preview_rows=CONSOLE_PREVIEW_ROWS, concurrent=args.concurrent, **params
+                )
+                metrics.rows_out = sum(row_counts.values())
+
+            for name, row_count in row_counts.items():
+                query_params = {key: value for key, value in params.items() if key in service.registry[name]['params']}
+                columns, rows = previews[name]
+                print_query_result(service, name, columns, rows, row_count, query_params, explain=args.explain)
+
+            service.close()
+
+        print()
+        for line in format_summary(run.records):
+            print(line)
 
         print("\n" + "=" * 80)
         print("  TOUTES LES REQUÊTES EXÉCUTÉES AVEC SUCCÈS")
-        print(f"  Résultats exportés vers : {excel_path}")
+        print(f"  Résultats exportés vers : {export_path}")
         print("=" * 80 + "\n")
 
     except FileNotFoundError as e:
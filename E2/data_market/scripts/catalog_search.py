@@ -0,0 +1,91 @@
+import sqlite3
+import pandas as pd
+import os
+import re
+import argparse
+
+DB_PATH = os.path.join("..", "outputs", "data_market.db")
+
+BM25_WEIGHTS = {
+    'name': 10.0,
+    'description': 1.0,
+    'brand': 5.0,
+    'category': 5.0,
+    'attributes': 2.0
+}
+
+def build_match_expression(query):
+    terms = re.findall(r"\w+\*?", query)
+    if not terms:
+        raise ValueError(f"Aucun mot-clé exploitable dans la recherche : {query!r}")
+
+    return " ".join(
+        f'"{term[:-1]}"*' if term.endswith("*") else f'"{term}"'
+        for term in terms
+    )
+
+def search_products(conn, query, brand=None, category=None, min_price=None, max_price=None, limit=20):
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS.values())
+    conditions = ["products_fts MATCH ?"]
+    params = [build_match_expression(query)]
+
+    filters = [
+        ("v.brand = ?", brand),
+        ("v.category = ?", category),
+        ("v.effective_price >= ?", min_price),
+        ("v.effective_price <= ?", max_price)
+    ]
+    for condition, value in filters:
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+
+    sql = f"""
+    SELECT
+        v.*,
+        bm25(products_fts, {weights}) AS score
+    FROM products_fts
+    JOIN view_catalog v ON v.product_id = products_fts.rowid
+    WHERE {" AND ".join(conditions)}
+    ORDER BY score
+    LIMIT ?;
+    """
+    params.append(limit)
+
+    return pd.read_sql_query(sql, conn, params=params)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recherche plein texte dans le catalogue (FTS5, classement bm25)")
+    parser.add_argument("query", help="Mots-clés recherchés (suffixe * pour une recherche par préfixe)")
+    parser.add_argument("--brand", default=None)
+    parser.add_argument("--category", default=None)
+    parser.add_argument("--min-price", type=float, default=None)
+    parser.add_argument("--max-price", type=float, default=None)
+    parser.add_argument("--limit", type=int, default=20)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if not os.path.exists(DB_PATH):
+        raise FileNotFoundError(f"Base de données introuvable : {DB_PATH}")
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        results = search_products(
+            conn,
+            args.query,
+            brand=args.brand,
+            category=args.category,
+            min_price=args.min_price,
+            max_price=args.max_price,
+            limit=args.limit
+        )
+    finally:
+        conn.close()
+
+    print(f"\n{len(results)} résultats pour « {args.query} » :\n")
+    print(results[['product_id', 'name', 'brand', 'category', 'effective_price', 'score']].to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+# Règles déclarées une seule fois, dans l'ordre des bits du masque de violations :
+# - range : valeur hors de [min, max] (bornes facultatives)
+# - not_null : valeur manquante
+# - column_le : column > other (prix soldé supérieur au prix catalogue)
+# - pattern : texte non conforme à l'expression régulière (syntaxe commune à re et RE2)
+# Une valeur manquante ne viole que les règles not_null
+VALIDATION_RULES = {
+    'url_missing': {'kind': 'not_null', 'column': 'url', 'message': "URL produit manquante"},
+    'url_format': {
+        'kind': 'pattern',
+        'column': 'url',
+        'pattern': r"^https?://[^/\s]+/products/[^/?#\s]+(?:[?#]\S*)?$",
+        'message': "URL produit mal formée (attendu : https://<boutique>/products/<slug>)"
+    },
+    'name_missing': {'kind': 'not_null', 'column': 'name', 'message': "Nom de produit manquant"},
+    'price_sale_missing': {
+        'kind': 'not_null', 'column': 'price_sale', 'message': "Prix de vente manquant ou non numérique"
+    },
+    'price_sale_negative': {'kind': 'range', 'column': 'price_sale', 'min': 0, 'message': "Prix de vente négatif"},
+    'price_mrp_negative': {'kind': 'range', 'column': 'price_mrp', 'min': 0, 'message': "Prix catalogue négatif"},
+    'price_sale_above_mrp': {
+        'kind': 'column_le', 'column': 'price_sale', 'other': 'price_mrp',
+        'message': "Prix soldé > prix catalogue"
+    },
+    'rating_range': {
+        'kind': 'range', 'column': 'rating', 'min': 0, 'max': 5, 'message': "Rating invalide (< 0 ou > 5)"
+    },
+    'review_count_negative': {
+        'kind': 'range', 'column': 'review_count', 'min': 0, 'message': "Nombre d'avis négatif"
+    }
+}
+
+RULE_KINDS = ('range', 'not_null', 'column_le', 'pattern')
+
+# Lignes évaluées par bloc : les colonnes et les booléens intermédiaires d'un bloc restent
+# en cache pendant que toutes les règles y sont appliquées
+VALIDATION_BLOCK_ROWS = 65_536
+
+VIOLATIONS_COLUMN = "violations"
+VIOLATIONS_SEPARATOR = "|"
+
+def mask_dtype(rule_count):
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if rule_count <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"Au plus 64 règles de validation par masque : {rule_count}")
+
+def _column_reader(series, numeric):
+    # Accès par tranche aux valeurs d'une colonne sans copie de la colonne entière : les
+    # colonnes NumPy sont lues en vue, les colonnes nullables (Int32, boolean, category) ne
+    # sont converties que bloc par bloc
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        if numeric and values.dtype == object:
+            return lambda start, stop: pd.to_numeric(values[start:stop], errors="coerce")
+        return lambda start, stop: values[start:stop]
+
+    values = series.array
+    if numeric:
+        return lambda start, stop: values[start:stop].to_numpy(dtype=np.float64, na_value=np.nan)
+    return lambda start, stop: values[start:stop].to_numpy(dtype=object, na_value=None)
+
+def _pattern_failures(values, pattern):
+    # Expression évaluée en C++ (RE2) par pyarrow quand il est disponible, sans boucle Python
+    # par ligne ; les valeurs manquantes ou non textuelles ne violent pas la règle
+    if pc is not None:
+        try:
+            matched = pc.match_substring_regex(pa.array(values, type=pa.string(), from_pandas=True), pattern)
+            return ~pc.fill_null(matched, True).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    return ~pd.Series(values, dtype=object).str.match(pattern, na=True).to_numpy(dtype=bool)
+
+def _rule_checker(df, rule):
+    kind = rule['kind']
+    if kind not in RULE_KINDS:
+        raise ValueError(f"Type de règle inconnu : {kind} (types : {list(RULE_KINDS)})")
+
+    if kind == 'not_null':
+        read = _column_reader(df[rule['column']], numeric=False)
+        return lambda start, stop: pd.isna(read(start, stop))
+
+    if kind == 'pattern':
+        read = _column_reader(df[rule['column']], numeric=False)
+        pattern = rule['pattern']
+        return lambda start, stop: _pattern_failures(read(start, stop), pattern)
+
+    read = _column_reader(df[rule['column']], numeric=True)
+    if kind == 'column_le':
+        read_other = _column_reader(df[rule['other']], numeric=True)
+        return lambda start, stop: np.greater(read(start, stop), read_other(start, stop))
+
+    low, high = rule.get('min'), rule.get('max')
+
+    def out_of_range(start, stop):
+        values = read(start, stop)
+        failed = np.less(values, low) if low is not None else np.zeros(len(values), dtype=bool)
+        if high is not None:
+            failed |= np.greater(values, high)
+        return failed
+
+    return out_of_range
+
+def evaluate_rules(df, rules=VALIDATION_RULES, block_rows=VALIDATION_BLOCK_ROWS):
+    # Une seule passe sur les lignes : pour chaque bloc, toutes les règles sont évaluées et
+    # leurs échecs accumulés dans le masque (bit i : i-ème règle de rules). Aucune copie du
+    # DataFrame n'est faite, seuls des booléens de la taille d'un bloc sont alloués
+    names = list(rules)
+    checkers = [_rule_checker(df, rules[name]) for name in names]
+    masks = np.zeros(len(df), dtype=mask_dtype(len(names)))
+    counts = np.zeros(len(names), dtype=np.int64)
+    bits = [masks.dtype.type(1 << bit) for bit in range(len(names))]
+
+    for start in range(0, len(df), block_rows):
+        stop = min(start + block_rows, len(df))
+        block = masks[start:stop]
+        for index, check in enumerate(checkers):
+            failed = check(start, stop)
+            failed_count = np.count_nonzero(failed)
+            if failed_count:
+                counts[index] += failed_count
+                block[failed] |= bits[index]
+
+    return masks, dict(zip(names, counts.tolist()))
+
+def violation_names(masks, rules=VALIDATION_RULES):
+    # Libellé par combinaison de règles distincte plutôt que par ligne
+    names = list(rules)
+    combinations, inverse = np.unique(masks, return_inverse=True)
+    labels = np.array([
+        VIOLATIONS_SEPARATOR.join(name for bit, name in enumerate(names) if int(combination) >> bit & 1)
+        for combination in combinations
+    ], dtype=object)
+    return labels[inverse]
+
+class QuarantineWriter:
+
+    def __init__(self, output_path, append=False):
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        self.output_path = output_path
+        self.rows_written = 0
+        self._header_written = append and os.path.exists(output_path)
+
+        # Le fichier n'est créé qu'à la première ligne en quarantaine : celui d'une exécution
+        # précédente ne doit pas laisser croire que les données courantes sont invalides
+        if not append and os.path.exists(output_path):
+            os.remove(output_path)
+
+    def write(self, df, masks, rules=VALIDATION_RULES):
+        df.assign(**{VIOLATIONS_COLUMN: violation_names(masks, rules)}).to_csv(
+            self.output_path, mode="a" if self._header_written else "w",
+            header=not self._header_written, index=False
+        )
+        self._header_written = True
+        self.rows_written += len(df)
@@ -0,0 +1,138 @@
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = os.path.join("..", "outputs", "data_market.db")
+
+POOL_SIZE = 8
+POOL_TIMEOUT_S = 30
+
+# Par connexion : fichier projeté en mémoire (les pages sont lues sans copie dans le cache
+# SQLite) et cache de pages en Kio ; la base actuelle tient entièrement dans les deux
+MMAP_SIZE = 256 * 1024 ** 2
+CACHE_SIZE_KIB = 64 * 1024
+
+# Requêtes préparées conservées par connexion (cache LRU du module sqlite3, 128 par défaut) :
+# un même texte SQL n'est compilé qu'une fois par connexion, seuls les paramètres changent
+CACHED_STATEMENTS = 256
+
+def database_identity(db_path):
+    stat = os.stat(db_path)
+    return stat.st_dev, stat.st_ino
+
+def connect_read_only(db_path, mmap_size=MMAP_SIZE, cache_size_kib=CACHE_SIZE_KIB,
+                      cached_statements=CACHED_STATEMENTS):
+    # mode=ro : une connexion en lecture seule ne peut ni écrire ni faire de checkpoint du WAL ;
+    # le mode WAL lui-même est fixé par 02_split_tables.py à l'écriture de la base
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=cached_statements)
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)};")
+    conn.execute(f"PRAGMA cache_size = {-int(cache_size_kib)};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    return conn
+
+class ConnectionPool:
+
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE, timeout=POOL_TIMEOUT_S, mmap_size=MMAP_SIZE,
+                 cache_size_kib=CACHE_SIZE_KIB, cached_statements=CACHED_STATEMENTS):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Base de données introuvable : {db_path}")
+        if size < 1:
+            raise ValueError(f"Taille de pool invalide : {size}")
+
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.connections_opened = 0
+
+        self._connect_options = {
+            'mmap_size': mmap_size,
+            'cache_size_kib': cache_size_kib,
+            'cached_statements': cached_statements
+        }
+        # Pile LIFO : la connexion rendue en dernier, dont le cache de pages est le plus chaud,
+        # est prêtée en premier
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._identity = database_identity(db_path)
+        self._closed = False
+
+    def _drain_idle(self):
+        connections = []
+        while True:
+            try:
+                connections.append(self._idle.get_nowait()[0])
+            except queue.Empty:
+                return connections
+
+    def _current_identity(self):
+        # 02 reconstruit la base sur place (les connexions ouvertes voient le nouveau contenu) ;
+        # si le fichier est malgré tout remplacé, par exemple restauré depuis une sauvegarde, les
+        # connexions ouvertes lisent encore l'ancien et sont fermées dès le premier emprunt suivant
+        identity = database_identity(self.db_path)
+        stale = []
+        with self._lock:
+            if identity != self._identity:
+                self._identity = identity
+                stale = self._drain_idle()
+        for conn in stale:
+            conn.close()
+        return identity
+
+    def _acquire(self):
+        if self._closed:
+            raise RuntimeError("Pool de connexions fermé")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Aucune connexion disponible après {self.timeout} s ({self.size} connexions)")
+
+        try:
+            identity = self._current_identity()
+            try:
+                conn, conn_identity = self._idle.get_nowait()
+                if conn_identity == identity:
+                    return conn, identity
+                conn.close()
+            except queue.Empty:
+                pass
+
+            conn = connect_read_only(self.db_path, **self._connect_options)
+            with self._lock:
+                self.connections_opened += 1
+            return conn, identity
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, identity):
+        try:
+            with self._lock:
+                reusable = not self._closed and identity == self._identity
+                if reusable:
+                    self._idle.put((conn, identity))
+            if not reusable:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn, identity = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn, identity)
+
+    def journal_mode(self):
+        with self.connection() as conn:
+            return conn.execute("PRAGMA journal_mode;").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle = self._drain_idle()
+        for conn in idle:
+            conn.close()
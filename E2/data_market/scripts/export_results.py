@@ -0,0 +1,405 @@
+import argparse
+import csv
+import logging
+import math
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain, islice
+from xml.sax.saxutils import quoteattr
+
+from query_service import QueryService, DB_PATH
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+EXPORT_PATH = os.path.join("..", "outputs", "resultats_requetes_metier")
+EXPORT_BATCH_ROWS = 10_000
+PREVIEW_ROWS = 20
+
+# Limite d'une feuille Excel, ligne d'en-tête comprise : au-delà, le résultat se poursuit
+# sur une feuille suivante
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_SHEET_NAME_LENGTH = 31
+EXCEL_RESERVED_SHEET_NAME = "history"
+XLSX_COMPRESS_LEVEL = 1
+
+# Le schéma Parquet est fixé à l'ouverture du fichier : les premiers lots sont gardés en
+# mémoire tant qu'une colonne n'a que des NULL, dans la limite de ce nombre de lignes
+PARQUET_SCHEMA_LOOKAHEAD_ROWS = 100_000
+
+_XML_ESCAPES = str.maketrans({
+    '&': "&amp;",
+    '<': "&lt;",
+    '>': "&gt;",
+    **{chr(code): None for code in range(32) if code not in (9, 10, 13)}
+})
+_SHEET_NAME_INVALID = re.compile(r"[\[\]:*?/\\\x00-\x1f]")
+_FILE_NAME_INVALID = re.compile(r"[^\w.-]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{number}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}<Relationship Id="rId{styles_id}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_SHEET_RELATIONSHIP = (
+    '<Relationship Id="rId{number}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{number}.xml"/>'
+)
+# Deux styles : normal et gras (en-têtes), comme l'export pandas précédent
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_FOOTER = '</sheetData></worksheet>'
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("L'export parquet nécessite pyarrow (pip install -r requirements.txt)")
+
+def iter_batches(cursor, batch_rows=EXPORT_BATCH_ROWS):
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            return
+        yield rows
+
+def preview_batches(batches, preview, max_rows=PREVIEW_ROWS):
+    # Les premières lignes sont copiées au passage : l'aperçu affiché et le fichier exporté
+    # proviennent du même curseur, lu une seule fois
+    for rows in batches:
+        if len(preview) < max_rows:
+            preview.extend(rows[:max_rows - len(preview)])
+        yield rows
+
+def column_letters(count):
+    letters = []
+    for index in range(count):
+        name = ""
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            name = chr(65 + remainder) + name
+        letters.append(name)
+    return letters
+
+def _xml_cell(reference, value, style=""):
+    # Chaînes en ligne (inlineStr) : pas de table de chaînes partagées à garder en mémoire
+    kind = type(value)
+    if kind is str:
+        text = value.translate(_XML_ESCAPES)
+        return f'<c r="{reference}"{style} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    if kind is int:
+        return f'<c r="{reference}"{style}><v>{value}</v></c>'
+    if kind is float:
+        return f'<c r="{reference}"{style}><v>{value!r}</v></c>' if math.isfinite(value) else ""
+    if value is None:
+        return ""
+    return _xml_cell(reference, str(value), style)
+
+class StreamingXlsxWriter:
+
+    def __init__(self, path, compresslevel=XLSX_COMPRESS_LEVEL):
+        self.path = path
+        self.sheet_names = []
+
+        # Écriture dans un fichier temporaire renommé à la fermeture : un export interrompu
+        # ne laisse pas de classeur tronqué à la place du précédent
+        self._tmp_path = path + ".tmp"
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+
+    def _sheet_name(self, name):
+        # Règles d'Excel : 31 caractères au plus, sans : \ / ? * [ ] ni caractère de contrôle,
+        # sans apostrophe en début ou en fin, « History » réservé, unicité sans tenir compte de la casse
+        base = _SHEET_NAME_INVALID.sub("_", name)[:EXCEL_SHEET_NAME_LENGTH].strip("'")
+        if not base.strip():
+            base = "Feuille"
+        elif base.lower() == EXCEL_RESERVED_SHEET_NAME:
+            base += "_"
+        candidate, suffix = base, 2
+        while candidate.lower() in {existing.lower() for existing in self.sheet_names}:
+            candidate = f"{base[:EXCEL_SHEET_NAME_LENGTH - len(str(suffix)) - 1]}_{suffix}"
+            suffix += 1
+        self.sheet_names.append(candidate)
+        return candidate
+
+    def _write_worksheet(self, name, letters, header, rows):
+        self._sheet_name(name)
+        row_number = 1
+        with self._zip.open(f"xl/worksheets/sheet{len(self.sheet_names)}.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEADER + f'<row r="1">{header}</row>').encode("utf-8"))
+            while True:
+                chunk = list(islice(rows, EXPORT_BATCH_ROWS))
+                if not chunk:
+                    break
+                xml = []
+                for row in chunk:
+                    row_number += 1
+                    cells = "".join(_xml_cell(f"{letter}{row_number}", value) for letter, value in zip(letters, row))
+                    xml.append(f'<row r="{row_number}">{cells}</row>')
+                sheet.write("".join(xml).encode("utf-8"))
+            sheet.write(_SHEET_FOOTER.encode("utf-8"))
+        return row_number - 1
+
+    def write_sheet(self, name, columns, batches):
+        letters = column_letters(len(columns))
+        header = "".join(_xml_cell(f"{letter}1", column, ' s="1"') for letter, column in zip(letters, columns))
+        rows = chain.from_iterable(batches)
+        total = 0
+
+        while True:
+            written = self._write_worksheet(name, letters, header, islice(rows, EXCEL_MAX_ROWS - 1))
+            total += written
+            if written < EXCEL_MAX_ROWS - 1:
+                return total
+
+            # Feuille pleine : le résultat se poursuit sur une nouvelle feuille s'il reste des lignes
+            next_row = next(rows, None)
+            if next_row is None:
+                return total
+            rows = chain([next_row], rows)
+            logger.info(f"{name} : limite de {EXCEL_MAX_ROWS:,} lignes atteinte, suite sur une nouvelle feuille")
+
+    def close(self):
+        sheets = range(1, len(self.sheet_names) + 1)
+        self._zip.writestr(
+            "[Content_Types].xml",
+            _CONTENT_TYPES.format(sheets="".join(_SHEET_CONTENT_TYPE.format(number=number) for number in sheets))
+        )
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            f'<sheet name={quoteattr(name)} sheetId="{number}" r:id="rId{number}"/>'
+            for number, name in zip(sheets, self.sheet_names)
+        )))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(
+            sheets="".join(_SHEET_RELATIONSHIP.format(number=number) for number in sheets),
+            styles_id=len(self.sheet_names) + 1
+        ))
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._zip.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def write_csv(path, columns, batches):
+    total = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in batches:
+            writer.writerows(rows)
+            total += len(rows)
+    return total
+
+def _arrow_table(columns, rows, schema=None):
+    arrays = []
+    for position, values in enumerate(zip(*rows)):
+        field_type = None if schema is None else schema.field(position).type
+        try:
+            arrays.append(pa.array(values, type=field_type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            raise ValueError(
+                f"Colonne {columns[position]} : valeurs incompatibles avec le type {field_type} "
+                f"déduit des {PARQUET_SCHEMA_LOOKAHEAD_ROWS:,} premières lignes"
+            )
+    return pa.Table.from_arrays(arrays, names=columns)
+
+def write_parquet(path, columns, batches):
+    # Les types sont déduits des valeurs renvoyées par SQLite : une colonne encore entièrement
+    # NULL après la lecture anticipée reste de type null
+    require_pyarrow()
+    pending, pending_rows = [], 0
+    writer = None
+    total = 0
+    tmp_path = path + ".tmp"
+
+    def open_writer():
+        if pending:
+            schema = pa.unify_schemas([table.schema for table in pending], promote_options="permissive")
+        else:
+            schema = pa.schema([(column, pa.null()) for column in columns])
+        parquet_writer = pq.ParquetWriter(tmp_path, schema)
+        for table in pending:
+            parquet_writer.write_table(table.cast(schema))
+        pending.clear()
+        return parquet_writer
+
+    try:
+        for rows in batches:
+            total += len(rows)
+            if writer is not None:
+                writer.write_table(_arrow_table(columns, rows, writer.schema))
+                continue
+
+            pending.append(_arrow_table(columns, rows))
+            pending_rows += len(rows)
+            schema = pa.unify_schemas([table.schema for table in pending], promote_options="permissive")
+            types_known = not any(pa.types.is_null(field.type) for field in schema)
+            if types_known or pending_rows >= PARQUET_SCHEMA_LOOKAHEAD_ROWS:
+                writer = open_writer()
+
+        if writer is None:
+            writer = open_writer()
+        writer.close()
+        os.replace(tmp_path, path)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return total
+
+def _export_query(service, name, write, batch_rows, previews, preview_rows, params):
+    applicable = {key: value for key, value in params.items() if key in service.registry[name]['params']}
+    with service.cursor(name, **applicable) as cursor:
+        columns = [description[0] for description in cursor.description]
+        batches = iter_batches(cursor, batch_rows)
+        if previews is not None:
+            preview = []
+            previews[name] = (columns, preview)
+            batches = preview_batches(batches, preview, preview_rows)
+        return write(columns, batches)
+
+def export_query_results(service, names=None, output_path=EXPORT_PATH, output_format='xlsx',
+                         batch_rows=EXPORT_BATCH_ROWS, previews=None, preview_rows=PREVIEW_ROWS,
+                         concurrent=False, **params):
+    # xlsx : un classeur, une feuille par requête ; csv et parquet : un fichier par requête
+    # dans le répertoire output_path. Les lignes passent du curseur SQLite au fichier par lots,
+    # sans DataFrame : la mémoire ne dépend pas du nombre de lignes exportées. previews (dict)
+    # reçoit par requête les colonnes et les preview_rows premières lignes exportées
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export non supporté : {output_format} (formats : {EXPORT_FORMATS})")
+
+    names = list(names or service.registry)
+    export = partial(
+        _export_query, service, batch_rows=batch_rows, previews=previews, preview_rows=preview_rows, params=params
+    )
+
+    if output_format == 'xlsx':
+        # Un seul classeur : les feuilles sont écrites l'une après l'autre, même avec concurrent
+        path = output_path if output_path.endswith(".xlsx") else output_path + ".xlsx"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with StreamingXlsxWriter(path) as writer:
+            row_counts = {name: export(name, partial(writer.write_sheet, name)) for name in names}
+        logger.info(f"Export xlsx : {sum(row_counts.values()):,} lignes dans {path}")
+        return row_counts
+
+    if output_format == 'parquet':
+        require_pyarrow()
+    os.makedirs(output_path, exist_ok=True)
+    write = write_csv if output_format == 'csv' else write_parquet
+
+    def export_file(name):
+        path = os.path.join(output_path, f"{_FILE_NAME_INVALID.sub('_', name)}.{output_format}")
+        return export(name, partial(write, path))
+
+    if concurrent:
+        # Un fichier par requête, chacune sur sa connexion du pool
+        with ThreadPoolExecutor(max_workers=min(len(names), service.pool.size) or 1) as executor:
+            row_counts = dict(zip(names, executor.map(export_file, names)))
+    else:
+        row_counts = {name: export_file(name) for name in names}
+    logger.info(f"Export {output_format} : {sum(row_counts.values()):,} lignes dans {output_path}")
+    return row_counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export en flux des résultats des requêtes métier")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default='xlsx', help="Format d'export")
+    parser.add_argument(
+        "--output", default=EXPORT_PATH,
+        help="Classeur (xlsx, extension ajoutée si absente) ou répertoire (csv, parquet)"
+    )
+    parser.add_argument(
+        "--queries", nargs="+", default=None, help="Requêtes du registre exportées (défaut : toutes)"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Nombre de lignes par requête (défaut : 10)")
+    parser.add_argument("--batch-rows", type=int, default=EXPORT_BATCH_ROWS, help="Lignes lues par lot")
+    parser.add_argument("--db", default=DB_PATH, help="Base SQLite interrogée")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    service = QueryService(args.db)
+    params = {} if args.limit is None else {'limit': args.limit}
+
+    try:
+        row_counts = export_query_results(
+            service, args.queries, args.output, args.format, batch_rows=args.batch_rows, **params
+        )
+    finally:
+        service.close()
+
+    for name, rows in row_counts.items():
+        print(f"{name:<32}{rows:>12,} lignes")
+    print(f"Export {args.format} terminé : {args.output}")
+
+if __name__ == "__main__":
+    main()
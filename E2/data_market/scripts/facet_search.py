@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+import os
+import threading
+import argparse
+
+from db_pool import DB_PATH, connect_read_only
+from query_service import get_data_version
+
+# Listes de produits des index inversés (table attribute_postings) : identifiants triés,
+# sans doublon, sérialisés en entiers 32 bits little-endian
+POSTING_DTYPE = np.dtype('<u4')
+
+# Opérateurs d'un filtre : valeur exacte, une valeur parmi plusieurs, sous-chaîne (sans casse)
+FACET_OPERATORS = ('=', 'IN', 'CONTAINS')
+
+FACET_DEFAULT_KEYS = 10
+FACET_DEFAULT_LIMIT = 20
+
+def build_postings(key_ids, value_ids, product_ids):
+    # Une liste triée par couple (clé, valeur) : un seul tri lexicographique, puis découpage
+    # aux changements de couple
+    if len(key_ids) == 0:
+        return
+    order = np.lexsort((product_ids, value_ids, key_ids))
+    keys, values, products = key_ids[order], value_ids[order], product_ids[order]
+
+    distinct = np.ones(len(order), dtype=bool)
+    distinct[1:] = (keys[1:] != keys[:-1]) | (values[1:] != values[:-1]) | (products[1:] != products[:-1])
+    keys, values, products = keys[distinct], values[distinct], products[distinct]
+
+    starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]) | (values[1:] != values[:-1])])
+    stops = np.r_[starts[1:], len(keys)]
+    products = products.astype(POSTING_DTYPE)
+
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        yield int(keys[start]), int(values[start]), stop - start, products[start:stop].tobytes()
+
+# Au-delà de ce rapport de tailles, l'intersection cherche les éléments de la liste courte dans
+# la longue par dichotomie ; en deçà, un masque indexé par product_id est plus rapide (linéaire)
+SEARCH_INTERSECT_RATIO = 16
+
+def intersect_sorted(left, right):
+    # Intersection de deux listes triées sans doublon, dans l'ordre croissant
+    if len(left) > len(right):
+        left, right = right, left
+    if len(left) == 0:
+        return left
+
+    if len(left) * SEARCH_INTERSECT_RATIO < len(right):
+        positions = np.searchsorted(right, left)
+        positions[positions == len(right)] = 0
+        return left[right[positions] == left]
+
+    left = left[left <= right[-1]]
+    members = np.zeros(int(right[-1]) + 1, dtype=bool)
+    members[right] = True
+    return left[members[left]]
+
+class KeyPostings:
+
+    # Index inversé d'une clé en mémoire : listes concaténées dans l'ordre des valeurs, bornes
+    # de chaque liste et, pour chaque produit listé, la position de sa valeur (comptage des facettes)
+    def __init__(self, value_ids, values, counts, product_ids):
+        self.value_ids = value_ids
+        self.values = values
+        self.offsets = np.r_[0, np.cumsum(counts)]
+        self.product_ids = product_ids
+        self.codes = np.repeat(np.arange(len(values)), counts)
+        self.max_product_id = int(product_ids.max()) if len(product_ids) else 0
+
+    def posting(self, position):
+        return self.product_ids[self.offsets[position]:self.offsets[position + 1]]
+
+    def match(self, operator, value):
+        operator = operator.upper()
+        if operator not in FACET_OPERATORS:
+            raise ValueError(f"Opérateur de facette non supporté : {operator} (opérateurs : {list(FACET_OPERATORS)})")
+
+        if operator == 'CONTAINS':
+            positions = np.flatnonzero(
+                pd.Series(self.values, dtype=object).str.contains(str(value), case=False, regex=False).to_numpy()
+            )
+        else:
+            wanted = [value] if operator == '=' else list(value)
+            positions = np.flatnonzero(np.isin(self.values, np.array(wanted, dtype=object)))
+
+        if len(positions) == 1:
+            return self.posting(positions[0])
+        if len(positions) == 0:
+            return np.zeros(0, dtype=POSTING_DTYPE)
+
+        # Union de plusieurs listes par un masque indexé par product_id : linéaire, sans tri
+        union = np.zeros(self.max_product_id + 1, dtype=bool)
+        for position in positions:
+            union[self.posting(position)] = True
+        return np.flatnonzero(union).astype(POSTING_DTYPE)
+
+class FacetIndex:
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._conn = None
+        self._version = None
+        self._keys = {}
+        self._postings = {}
+        self._all_products = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        # Index relus après toute modification de la base (même repère de version que le cache
+        # de QueryService) ; à l'intérieur d'une version, chaque clé n'est chargée qu'une fois
+        version = get_data_version(self.db_path)
+        if version == self._version:
+            return
+
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = connect_read_only(self.db_path)
+        self._keys = dict(self._conn.execute("SELECT attribute_key, key_id FROM attribute_keys;").fetchall())
+        self._postings = {}
+        self._all_products = None
+        self._version = version
+
+    def key_postings(self, key):
+        with self._lock:
+            self._refresh()
+            if key not in self._keys:
+                raise KeyError(f"Attribut inconnu : {key}")
+
+            key_id = self._keys[key]
+            if key_id not in self._postings:
+                rows = self._conn.execute("""
+                SELECT p.value_id, v.attribute_value, p.product_count, p.product_ids
+                FROM attribute_postings p
+                JOIN attribute_values v ON v.value_id = p.value_id
+                WHERE p.key_id = ?
+                ORDER BY p.value_id;
+                """, (key_id,)).fetchall()
+
+                self._postings[key_id] = KeyPostings(
+                    np.array([row[0] for row in rows], dtype=np.int64),
+                    np.array([row[1] for row in rows], dtype=object),
+                    np.array([row[2] for row in rows], dtype=np.int64),
+                    np.frombuffer(b"".join(row[3] for row in rows), dtype=POSTING_DTYPE)
+                )
+            return self._postings[key_id]
+
+    def all_products(self):
+        with self._lock:
+            self._refresh()
+            if self._all_products is None:
+                self._all_products = np.array(
+                    [row[0] for row in self._conn.execute("SELECT product_id FROM products ORDER BY product_id;")],
+                    dtype=POSTING_DTYPE
+                )
+            return self._all_products
+
+    def filter(self, filters=None):
+        # filters : {clé: valeur} ou {clé: (opérateur, valeur)} ; les filtres se combinent en ET,
+        # en commençant par la liste la plus courte
+        if not filters:
+            return self.all_products()
+
+        postings = []
+        for key, condition in filters.items():
+            operator, value = condition if isinstance(condition, tuple) else ('=', condition)
+            postings.append(self.key_postings(key).match(operator, value))
+
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) == 0:
+                break
+            result = intersect_sorted(result, posting)
+        return result
+
+    def facet_keys(self, limit=FACET_DEFAULT_KEYS):
+        with self._lock:
+            self._refresh()
+            rows = self._conn.execute("""
+            SELECT k.attribute_key
+            FROM attribute_postings p
+            JOIN attribute_keys k ON k.key_id = p.key_id
+            GROUP BY p.key_id
+            ORDER BY SUM(p.product_count) DESC
+            LIMIT ?;
+            """, (limit,)).fetchall()
+        return [row[0] for row in rows]
+
+    def facet_counts(self, filters=None, keys=None, limit=FACET_DEFAULT_LIMIT):
+        # Nombre de produits par valeur, parmi les produits retenus par les filtres : un masque
+        # indexé par product_id sélectionne les entrées de chaque index, comptées par valeur
+        # (les listes ne contiennent que des produits de la table products, clé étrangère)
+        keys = list(keys) if keys is not None else self.facet_keys()
+        selected = None
+        if filters:
+            all_products = self.all_products()
+            selected = np.zeros(int(all_products[-1]) + 1 if len(all_products) else 0, dtype=bool)
+            selected[self.filter(filters)] = True
+
+        facets = {}
+        for key in keys:
+            postings = self.key_postings(key)
+            if selected is None:
+                counts = np.diff(postings.offsets)
+            else:
+                mask = selected[postings.product_ids]
+                counts = np.bincount(postings.codes[mask], minlength=len(postings.values))
+
+            top = np.flatnonzero(counts)
+            top = top[np.argsort(-counts[top], kind='stable')][:limit]
+            facets[key] = pd.DataFrame({
+                'attribute_value': postings.values[top],
+                'product_count': counts[top]
+            })
+        return facets
+
+    def search(self, filters=None, limit=FACET_DEFAULT_LIMIT):
+        product_ids = self.filter(filters)[:limit].tolist()
+        if not product_ids:
+            return pd.DataFrame()
+
+        with self._lock:
+            self._refresh()
+            placeholders = ", ".join("?" * len(product_ids))
+            return pd.read_sql_query(
+                f"SELECT * FROM view_catalog WHERE product_id IN ({placeholders}) ORDER BY product_id;",
+                self._conn, params=product_ids
+            )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._version = None
+
+def parse_filter(text):
+    # « clé=valeur » (égalité) ou « clé~texte » (sous-chaîne) ; le premier séparateur l'emporte
+    positions = [(text.find(separator), separator) for separator in ("=", "~") if separator in text]
+    if not positions:
+        raise ValueError(f"Filtre invalide : {text!r} (attendu : clé=valeur ou clé~texte)")
+
+    position, separator = min(positions)
+    key, value = text[:position].strip(), text[position + 1:].strip()
+    return key, ('=' if separator == "=" else 'CONTAINS', value)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recherche à facettes sur les attributs produits")
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help="Filtre clé=valeur ou clé~texte (répétable, combinés en ET), ex. --filter 'Origin=Imported'"
+    )
+    parser.add_argument("--facet", action="append", default=None, help="Attribut dont afficher les facettes (répétable)")
+    parser.add_argument("--limit", type=int, default=FACET_DEFAULT_LIMIT)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if not os.path.exists(DB_PATH):
+        raise FileNotFoundError(f"Base de données introuvable : {DB_PATH}")
+
+    filters = dict(parse_filter(text) for text in args.filter)
+    index = FacetIndex(DB_PATH)
+    try:
+        product_ids = index.filter(filters)
+        results = index.search(filters, limit=args.limit)
+        facets = index.facet_counts(filters, keys=args.facet, limit=args.limit)
+    finally:
+        index.close()
+
+    print(f"\n{len(product_ids)} produits correspondent aux filtres :\n")
+    if len(results) > 0:
+        print(results[['product_id', 'name', 'brand', 'effective_price']].to_string(index=False))
+
+    for key, counts in facets.items():
+        print(f"\nFacette « {key} » :")
+        print(counts.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from db_pool import DB_PATH, POOL_SIZE
+from query_service import QueryService, get_data_version
+
+logger = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+PORT = 8765
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+# Vues exposées et leur colonne clé : unique et non nulle, elle départage les lignes de même
+# valeur de tri et rend la pagination par curseur stable
+VIEW_KEYS = {
+    'view_catalog': 'product_id',
+    'view_top_products': 'product_id',
+    'view_promotions': 'product_id',
+    'view_category_stats': 'category',
+    'view_brand_stats': 'brand'
+}
+
+PAGE_DEFAULT_LIMIT = 50
+PAGE_MAX_LIMIT = 1000
+
+RESPONSE_CACHE_TTL_S = 60
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+# Filtres en paramètres d'URL : ?brand=Quechua&rating__gte=4.5&name__like=%25veste%25
+FILTER_SUFFIXES = {'eq': '=', 'ne': '!=', 'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>=', 'like': 'LIKE'}
+NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?")
+
+def parse_value(text):
+    if NUMBER_PATTERN.fullmatch(text):
+        return float(text) if "." in text else int(text)
+    return text
+
+def _json_value(value):
+    if value is None or value != value:
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def encode_cursor(order_by, descending, value, key):
+    payload = json.dumps([order_by, descending, _json_value(value), _json_value(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor, order_by, descending):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order, cursor_descending, value, key = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError(f"Curseur invalide : {cursor}")
+
+    if (cursor_order, cursor_descending) != (order_by, descending):
+        raise ValueError("Curseur émis pour un autre tri (order_by / desc)")
+
+    return value, key
+
+def format_response(status, headers, body, head=False):
+    status = HTTPStatus(status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Length: {len(body)}"]
+    if body:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (b"" if head else body)
+
+def error_body(message):
+    return json.dumps({'error': message}, ensure_ascii=False).encode("utf-8")
+
+class ViewHttpService:
+
+    def __init__(self, service, cache_ttl=RESPONSE_CACHE_TTL_S, cache_max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.service = service
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.requests_served = 0
+        self.cache_hits = 0
+        self.not_modified = 0
+
+        # Le cache de réponses n'est lu et écrit que depuis la boucle asyncio : pas de verrou.
+        # Les requêtes SQLite, bloquantes, tournent dans un pool de threads de la taille du pool
+        # de connexions
+        self._cache = OrderedDict()
+        self._cache_version = None
+        self._executor = ThreadPoolExecutor(max_workers=service.pool.size)
+
+    def list_views(self):
+        views = self.service.views()
+        return {
+            'views': {
+                view: {'key': key, 'columns': views[view]} for view, key in VIEW_KEYS.items() if view in views
+            }
+        }
+
+    def fetch_page(self, view, query):
+        if view not in VIEW_KEYS:
+            raise KeyError(f"Vue non exposée : {view}")
+
+        params = dict(query)
+        key = VIEW_KEYS[view]
+        limit = parse_value(params.pop('limit', str(PAGE_DEFAULT_LIMIT)))
+        if not isinstance(limit, int) or not 1 <= limit <= PAGE_MAX_LIMIT:
+            raise ValueError(f"limit doit être compris entre 1 et {PAGE_MAX_LIMIT} : {limit}")
+        order_by = params.pop('order_by', None) or key
+        descending = params.pop('desc', "0").lower() in ("1", "true", "yes")
+        fields = [field for field in params.pop('fields', "").split(",") if field] or None
+        cursor = params.pop('cursor', None)
+        after = decode_cursor(cursor, order_by, descending) if cursor else None
+
+        filters = {}
+        for name, value in params.items():
+            column, _, suffix = name.partition("__")
+            if suffix and suffix not in FILTER_SUFFIXES:
+                raise ValueError(f"Filtre inconnu : {name} (suffixes : {list(FILTER_SUFFIXES)})")
+            filters.setdefault(column, []).append((FILTER_SUFFIXES[suffix or 'eq'], parse_value(value)))
+
+        # Une ligne de plus que la page : sa présence indique qu'une page suivante existe.
+        # La colonne de tri et la clé sont toujours lues, pour construire le curseur
+        columns = None if fields is None else list(dict.fromkeys(fields + [order_by, key]))
+        df = self.service.run_view(
+            view, columns, filters, order_by, descending, limit + 1, key=key, after=after, use_cache=False
+        )
+        page = df.iloc[:limit]
+        next_cursor = None
+        if len(df) > limit:
+            last = page.iloc[-1]
+            next_cursor = encode_cursor(order_by, descending, last[order_by], last[key])
+
+        if fields is not None:
+            page = page[fields]
+
+        envelope = json.dumps({'view': view, 'count': len(page), 'next_cursor': next_cursor}, ensure_ascii=False)
+        data = page.to_json(orient='records', force_ascii=False)
+        return (envelope[:-1] + ', "data": ' + data + "}").encode("utf-8")
+
+    def build_body(self, path, query):
+        if path in ("/", "/views"):
+            return json.dumps(self.list_views(), ensure_ascii=False).encode("utf-8")
+        if path.startswith("/views/"):
+            return self.fetch_page(path[len("/views/"):], query)
+        raise KeyError(f"Ressource inconnue : {path}")
+
+    async def respond(self, target, headers):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qsl(url.query, keep_blank_values=True)
+
+        # Toute reconstruction ou mise à jour de la base change sa version : le cache est vidé
+        # et les ETag précédents ne correspondent plus
+        version = get_data_version(self.service.db_path)
+        if version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = version
+
+        # La réponse ne dépend que de la requête et de la version des données : l'ETag s'en
+        # déduit sans exécuter la requête, un client à jour reçoit un 304 immédiatement
+        request_key = (path, tuple(sorted(query)))
+        etag = '"' + hashlib.sha256(repr((version, request_key)).encode("utf-8")).hexdigest()[:32] + '"'
+        cache_headers = {'ETag': etag, 'Cache-Control': f"max-age={self.cache_ttl}"}
+        if etag in headers.get('if-none-match', ""):
+            self.not_modified += 1
+            return HTTPStatus.NOT_MODIFIED, cache_headers, b""
+
+        cached = self._cache.get(request_key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._cache.move_to_end(request_key)
+            self.cache_hits += 1
+            return HTTPStatus.OK, cache_headers, cached[1]
+
+        loop = asyncio.get_running_loop()
+        try:
+            body = await loop.run_in_executor(self._executor, self.build_body, path, query)
+        except KeyError as e:
+            return HTTPStatus.NOT_FOUND, {}, error_body(e.args[0])
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {}, error_body(str(e))
+
+        if self.cache_ttl > 0 and version == self._cache_version:
+            self._cache[request_key] = (time.monotonic() + self.cache_ttl, body)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+        return HTTPStatus.OK, cache_headers, body
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, http_version = request_line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    body = error_body("Requête HTTP invalide")
+                    writer.write(format_response(HTTPStatus.BAD_REQUEST, {'Connection': "close"}, body))
+                    break
+
+                if method not in ("GET", "HEAD"):
+                    status, response_headers, body = HTTPStatus.METHOD_NOT_ALLOWED, {'Allow': "GET, HEAD"}, b""
+                else:
+                    try:
+                        status, response_headers, body = await self.respond(target, headers)
+                    except Exception:
+                        logger.exception(f"Erreur lors du traitement de {target}")
+                        status, response_headers = HTTPStatus.INTERNAL_SERVER_ERROR, {}
+                        body = error_body("Erreur interne")
+
+                self.requests_served += 1
+                keep_alive = http_version == "HTTP/1.1" and headers.get('connection', "").lower() != "close"
+                if not keep_alive:
+                    response_headers = {**response_headers, 'Connection': "close"}
+                writer.write(format_response(status, response_headers, body, head=method == "HEAD"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=HOST, port=PORT):
+        if host not in LOCAL_HOSTS:
+            raise ValueError(f"Le service n'écoute que sur la boucle locale ({', '.join(LOCAL_HOSTS)}) : {host}")
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+async def serve(db_path, host, port, pool_size, cache_ttl):
+    service = QueryService(db_path, pool_size=pool_size)
+    http_service = ViewHttpService(service, cache_ttl=cache_ttl)
+    server = await http_service.start(host, port)
+    logger.info(f"Service HTTP démarré sur http://{host}:{port}/views ({pool_size} connexions, cache {cache_ttl} s)")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        http_service.close()
+        service.close()
+        logger.info(
+            f"Service arrêté : {http_service.requests_served} requêtes, "
+            f"{http_service.cache_hits} réponses en cache, "
+            f"{http_service.not_modified} réponses 304"
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Service HTTP local (JSON) sur les vues métier de data_market.db")
+    parser.add_argument("--db", default=DB_PATH, help="Base SQLite interrogée")
+    parser.add_argument(
+        "--host", default=HOST, choices=LOCAL_HOSTS, help="Adresse d'écoute (boucle locale uniquement)"
+    )
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="Connexions en lecture seule")
+    parser.add_argument(
+        "--cache-ttl", type=int, default=RESPONSE_CACHE_TTL_S,
+        help="Durée de vie des réponses en cache, en secondes (0 : sans cache)"
+    )
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(os.path.join("..", "outputs", "http_service.log")),
+            logging.StreamHandler()
+        ]
+    )
+    args = parse_args()
+
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.pool_size, args.cache_ttl))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import argparse
+import cProfile
+import functools
+import inspect
+import json
+import logging
+import os
+import pstats
+import resource
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+METRICS_PATH = os.path.join("..", "outputs", "metrics.jsonl")
+PROFILE_DIR = os.path.join("..", "outputs", "profiles")
+PROFILE_TOP_FUNCTIONS = 15
+
+_PROC_STATUS = "/proc/self/status"
+_PROC_CLEAR_REFS = "/proc/self/clear_refs"
+
+_current_run = None
+
+def _read_proc_memory():
+    values = {}
+    with open(_PROC_STATUS) as status:
+        for line in status:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                key, value = line.split()[:2]
+                values[key[:-1]] = int(value) * 1024
+    return values['VmRSS'], values['VmHWM']
+
+def _reset_peak():
+    # Écrire 5 dans clear_refs remet VmHWM au niveau du RSS courant (Linux ≥ 4.0)
+    try:
+        with open(_PROC_CLEAR_REFS, "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+def _cpu_seconds():
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+def _count_rows(value):
+    if hasattr(value, 'shape'):
+        return int(value.shape[0])
+    if isinstance(value, tuple):
+        for item in value:
+            if hasattr(item, 'shape'):
+                return int(item.shape[0])
+    return None
+
+class StepMetrics:
+
+    def __init__(self, name, rows_in=None, seq=None):
+        self.name = name
+        self.seq = seq
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.child_peak = 0
+
+class PipelineRun:
+
+    def __init__(self, script, metrics_path=METRICS_PATH, profile=False):
+        self.script = script
+        self.metrics_path = metrics_path
+        self.profile = profile
+        self.run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}"
+        self.records = []
+        self.profiler = None
+
+        self._stack = []
+        self._seq = 0
+        self._proc_memory = os.path.exists(_PROC_STATUS) and _reset_peak()
+
+    def _memory(self):
+        if self._proc_memory:
+            return _read_proc_memory()
+        # Repli hors Linux : ru_maxrss ne fait que croître, le pic d'une étape n'est visible
+        # que s'il dépasse les pics précédents
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return peak, peak
+
+    @contextmanager
+    def step(self, name, rows_in=None):
+        metrics = StepMetrics(name, rows_in, self._seq)
+        self._seq += 1
+
+        rss_before, peak_so_far = self._memory()
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_peak = max(parent.child_peak, peak_so_far)
+        if self._proc_memory:
+            _reset_peak()
+        self._stack.append(metrics)
+
+        started_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        status = "ok"
+        try:
+            yield metrics
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = _cpu_seconds() - cpu_start
+            self._stack.pop()
+            peak = max(self._memory()[1], metrics.child_peak)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+
+            rows = metrics.rows_in if metrics.rows_in is not None else metrics.rows_out
+            self._record({
+                'run_id': self.run_id,
+                'script': self.script,
+                'step': name,
+                'seq': metrics.seq,
+                'depth': len(self._stack),
+                'started_at': started_at,
+                'status': status,
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'rss_before_mb': round(rss_before / 1024 ** 2, 2),
+                'peak_mb': round(peak / 1024 ** 2, 2),
+                'peak_delta_mb': round(max(peak - rss_before, 0) / 1024 ** 2, 2),
+                'rows_in': metrics.rows_in,
+                'rows_out': metrics.rows_out,
+                'rows_per_s': round(rows / wall, 1) if rows is not None and wall > 0 else None
+            })
+
+    def _record(self, record):
+        self.records.append(record)
+        os.makedirs(os.path.dirname(self.metrics_path) or ".", exist_ok=True)
+        with open(self.metrics_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def start(self):
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def finish(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profile_path = os.path.join(PROFILE_DIR, f"{self.script}_{self.run_id}.prof")
+            self.profiler.dump_stats(profile_path)
+            logger.info(f"Profil cProfile enregistré : {profile_path} (lecture : python -m pstats {profile_path})")
+
+            log_profile_top(pstats.Stats(self.profiler).sort_stats("cumulative"))
+
+        log_summary(self.records, f"Métriques {self.script} (run {self.run_id})")
+
+def log_profile_top(stats, limit=PROFILE_TOP_FUNCTIONS):
+    logger.info(f"Fonctions les plus coûteuses (temps cumulé, top {limit}) :")
+    for (filename, line, function) in stats.fcn_list[:limit]:
+        calls, _, own_time, cumulative_time, _ = stats.stats[(filename, line, function)]
+        logger.info(
+            f"  {cumulative_time:>9.3f} s cumulé {own_time:>9.3f} s propre {calls:>9} appels  "
+            f"{os.path.basename(filename)}:{line} {function}"
+        )
+
+def summarize(records):
+    summary = {}
+    for record in sorted(records, key=lambda record: record['seq']):
+        step = summary.setdefault(record['step'], {
+            'depth': record['depth'], 'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_mb': 0.0,
+            'peak_delta_mb': 0.0, 'rows_in': None, 'rows_out': None, 'errors': 0
+        })
+        step['calls'] += 1
+        step['wall_s'] += record['wall_s']
+        step['cpu_s'] += record['cpu_s']
+        step['peak_mb'] = max(step['peak_mb'], record['peak_mb'])
+        step['peak_delta_mb'] = max(step['peak_delta_mb'], record['peak_delta_mb'])
+        step['errors'] += record['status'] != "ok"
+        for key in ('rows_in', 'rows_out'):
+            if record[key] is not None:
+                step[key] = (step[key] or 0) + record[key]
+
+    for step in summary.values():
+        rows = step['rows_in'] if step['rows_in'] is not None else step['rows_out']
+        step['rows_per_s'] = rows / step['wall_s'] if rows is not None and step['wall_s'] > 0 else None
+
+    return summary
+
+def format_summary(records):
+    def number(value, fmt):
+        return "-" if value is None else format(value, fmt)
+
+    lines = [
+        f"{'Étape':<36}{'Appels':>7}{'Mur (s)':>10}{'CPU (s)':>10}{'Pic (Mo)':>10}{'+Pic (Mo)':>10}"
+        f"{'Lignes in':>12}{'Lignes out':>12}{'Lignes/s':>13}"
+    ]
+    for name, step in summarize(records).items():
+        label = ("  " * step['depth'] + name)[:35]
+        lines.append(
+            f"{label:<36}{step['calls']:>7}{step['wall_s']:>10.3f}{step['cpu_s']:>10.3f}"
+            f"{step['peak_mb']:>10.1f}{step['peak_delta_mb']:>10.1f}"
+            f"{number(step['rows_in'], ','):>12}{number(step['rows_out'], ','):>12}"
+            f"{number(step['rows_per_s'], ',.0f'):>13}"
+        )
+    return lines
+
+def log_summary(records, title):
+    logger.info(title)
+    for line in format_summary(records):
+        logger.info(line)
+
+@contextmanager
+def pipeline_run(script, profile=False, metrics_path=METRICS_PATH):
+    global _current_run
+
+    run = PipelineRun(script, metrics_path=metrics_path, profile=profile)
+    previous_run, _current_run = _current_run, run
+    run.start()
+    try:
+        with run.step("total"):
+            yield run
+    finally:
+        _current_run = previous_run
+        run.finish()
+
+def detach_run():
+    # Un processus de travail créé par fork hérite du run courant : ses étapes sont mesurées
+    # globalement par l'étape du parent qui l'attend
+    global _current_run
+    _current_run = None
+
+@contextmanager
+def step(name, rows_in=None):
+    if _current_run is None:
+        yield StepMetrics(name, rows_in)
+        return
+
+    with _current_run.step(name, rows_in) as metrics:
+        yield metrics
+
+def instrumented(func=None, name=None, rows_arg=None):
+    if func is None:
+        return functools.partial(instrumented, name=name, rows_arg=rows_arg)
+
+    step_name = name or func.__name__
+    signature = inspect.signature(func) if rows_arg else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_run is None:
+            return func(*args, **kwargs)
+
+        if rows_arg:
+            rows_in = _count_rows(signature.bind_partial(*args, **kwargs).arguments.get(rows_arg))
+        else:
+            rows_in = _count_rows(args[0]) if args else None
+        with _current_run.step(step_name, rows_in) as metrics:
+            result = func(*args, **kwargs)
+            metrics.rows_out = _count_rows(result)
+        return result
+
+    return wrapper
+
+def read_metrics(metrics_path=METRICS_PATH):
+    if not os.path.exists(metrics_path):
+        return []
+    with open(metrics_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Résumé des métriques d'exécution (metrics.jsonl)")
+    parser.add_argument("--script", default=None, help="Filtre sur un script (ex. 02_split_tables)")
+    parser.add_argument("--runs", type=int, default=1, help="Nombre de dernières exécutions affichées par script")
+    parser.add_argument("--metrics", default=METRICS_PATH, help="Fichier JSON lines des métriques")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    records = read_metrics(args.metrics)
+
+    runs = {}
+    for record in records:
+        if args.script is None or record['script'] == args.script:
+            runs.setdefault(record['script'], {}).setdefault(record['run_id'], []).append(record)
+
+    if not runs:
+        print(f"Aucune métrique dans {args.metrics}")
+        return
+
+    for script, script_runs in runs.items():
+        for run_id in list(script_runs)[-args.runs:]:
+            print(f"\n{script} - run {run_id}")
+            for line in format_summary(script_runs[run_id]):
+                print(line)
+
+if __name__ == "__main__":
+    main()
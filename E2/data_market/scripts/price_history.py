@@ -0,0 +1,402 @@
+import sqlite3
+import pandas as pd
+import os
+import logging
+import argparse
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Base distincte de data_market.db : celle-ci est reconstruite à chaque exécution du pipeline,
+# l'historique des prix doit lui survivre
+PRICE_HISTORY_PATH = os.path.join("..", "outputs", "price_history.db")
+
+SNAPSHOT_COLUMNS = ['url', 'name', 'price_mrp', 'price_sale', 'discount_rate']
+
+# Prix retenu pour mesurer une baisse, comme la colonne générée products.effective_price
+EFFECTIVE_PRICE_SQL = "CASE WHEN price_sale IS NOT NULL AND price_sale > 0 THEN price_sale ELSE price_mrp END"
+
+# Début de la période d'agrégation d'une observation (semaines commençant le lundi)
+COMPACTION_PERIODS = {
+    'day': "date(observed_at)",
+    'week': "date(observed_at, 'weekday 0', '-6 days')"
+}
+
+COMPACTION_KEEP_DAYS = 90
+
+# Lignes brutes compactables : antérieures à la limite, hormis la dernière de chaque produit,
+# conservée comme prix en vigueur à la limite
+COMPACTABLE_ROWS_SQL = """
+observed_at < :cutoff AND observed_at < (
+    SELECT MAX(h.observed_at)
+    FROM price_history h
+    WHERE h.product_id = price_history.product_id AND h.observed_at < :cutoff
+)
+"""
+
+# Les identifiants produits de l'historique lui sont propres (clé métier : l'URL), pour ne pas
+# dépendre de la numérotation de data_market.db
+PRICE_HISTORY_SCHEMAS = {
+    'price_products': """
+    CREATE TABLE IF NOT EXISTS price_products (
+        product_id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL UNIQUE,
+        name TEXT
+    );
+    """,
+    # Dernier prix connu de chaque produit : c'est la référence de la détection de changements,
+    # et il reste disponible une fois les lignes brutes compactées
+    'price_current': """
+    CREATE TABLE IF NOT EXISTS price_current (
+        product_id INTEGER PRIMARY KEY REFERENCES price_products(product_id),
+        observed_at TEXT NOT NULL,
+        price_mrp FLOAT,
+        price_sale FLOAT,
+        discount_rate FLOAT
+    );
+    """,
+    # Une ligne par changement de prix (et à la première observation d'un produit), regroupées
+    # par produit dans l'ordre chronologique
+    'price_history': """
+    CREATE TABLE IF NOT EXISTS price_history (
+        product_id INTEGER NOT NULL REFERENCES price_products(product_id),
+        observed_at TEXT NOT NULL,
+        price_mrp FLOAT,
+        price_sale FLOAT,
+        discount_rate FLOAT,
+        PRIMARY KEY (product_id, observed_at)
+    ) WITHOUT ROWID;
+    """,
+    'price_summaries': """
+    CREATE TABLE IF NOT EXISTS price_summaries (
+        product_id INTEGER NOT NULL REFERENCES price_products(product_id),
+        period TEXT NOT NULL CHECK (period IN ('day', 'week')),
+        period_start TEXT NOT NULL,
+        observations INTEGER NOT NULL,
+        min_effective_price FLOAT,
+        max_effective_price FLOAT,
+        avg_effective_price FLOAT,
+        min_price_mrp FLOAT,
+        max_price_mrp FLOAT,
+        avg_price_mrp FLOAT,
+        avg_discount_rate FLOAT,
+        PRIMARY KEY (product_id, period, period_start)
+    ) WITHOUT ROWID;
+    """,
+    'price_snapshots': """
+    CREATE TABLE IF NOT EXISTS price_snapshots (
+        observed_at TEXT PRIMARY KEY,
+        products INTEGER NOT NULL,
+        new_products INTEGER NOT NULL,
+        price_changes INTEGER NOT NULL
+    );
+    """
+}
+
+PRICE_HISTORY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_price_history_observed ON price_history(observed_at, product_id);",
+    "CREATE INDEX IF NOT EXISTS idx_price_summaries_start ON price_summaries(period_start, product_id);"
+]
+
+def format_timestamp(value=None):
+    # Horodatages ISO 8601 en UTC, à la seconde : l'ordre lexicographique est l'ordre chronologique
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec='seconds')
+
+def open_price_history(db_path=PRICE_HISTORY_PATH):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA foreign_keys = ON;")
+
+    for table_sql in PRICE_HISTORY_SCHEMAS.values():
+        conn.execute(table_sql)
+    for index_sql in PRICE_HISTORY_INDEXES:
+        conn.execute(index_sql)
+
+    return conn
+
+def latest_snapshot(conn):
+    return conn.execute("SELECT MAX(observed_at) FROM price_snapshots;").fetchone()[0]
+
+def record_price_snapshot(conn, products, observed_at=None):
+    observed_at = format_timestamp(observed_at)
+    rows = products[SNAPSHOT_COLUMNS].drop_duplicates('url').itertuples(index=False, name=None)
+    return record_price_rows(conn, rows, observed_at)
+
+def record_price_rows(conn, rows, observed_at):
+
+    # Capture des changements : seuls les produits nouveaux ou dont un prix diffère du dernier
+    # connu ajoutent une ligne à price_history (IS NOT compare aussi les NULL)
+    last_observed = latest_snapshot(conn)
+    if last_observed is not None and observed_at <= last_observed:
+        raise ValueError(f"Relevé du {observed_at} antérieur ou égal au dernier enregistré ({last_observed})")
+
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS price_snapshot (
+            url TEXT PRIMARY KEY,
+            name TEXT,
+            price_mrp FLOAT,
+            price_sale FLOAT,
+            discount_rate FLOAT
+        );
+        """)
+        conn.execute("DELETE FROM temp.price_snapshot;")
+        conn.executemany("INSERT OR IGNORE INTO temp.price_snapshot VALUES (?, ?, ?, ?, ?);", rows)
+
+        products_count = conn.execute("SELECT COUNT(*) FROM temp.price_snapshot;").fetchone()[0]
+        new_products = conn.execute("""
+        INSERT INTO price_products (url, name)
+        SELECT s.url, s.name
+        FROM temp.price_snapshot s
+        WHERE NOT EXISTS (SELECT 1 FROM price_products p WHERE p.url = s.url);
+        """).rowcount
+        conn.execute("""
+        UPDATE price_products
+        SET name = (SELECT s.name FROM temp.price_snapshot s WHERE s.url = price_products.url)
+        WHERE url IN (SELECT url FROM temp.price_snapshot);
+        """)
+
+        price_changes = conn.execute("""
+        INSERT INTO price_history (product_id, observed_at, price_mrp, price_sale, discount_rate)
+        SELECT p.product_id, :observed_at, s.price_mrp, s.price_sale, s.discount_rate
+        FROM temp.price_snapshot s
+        JOIN price_products p ON p.url = s.url
+        LEFT JOIN price_current c ON c.product_id = p.product_id
+        WHERE c.product_id IS NULL
+           OR c.price_mrp IS NOT s.price_mrp
+           OR c.price_sale IS NOT s.price_sale
+           OR c.discount_rate IS NOT s.discount_rate;
+        """, {'observed_at': observed_at}).rowcount
+
+        conn.execute("""
+        INSERT INTO price_current (product_id, observed_at, price_mrp, price_sale, discount_rate)
+        SELECT product_id, observed_at, price_mrp, price_sale, discount_rate
+        FROM price_history
+        WHERE observed_at = :observed_at
+        ON CONFLICT (product_id) DO UPDATE SET
+            observed_at = excluded.observed_at,
+            price_mrp = excluded.price_mrp,
+            price_sale = excluded.price_sale,
+            discount_rate = excluded.discount_rate;
+        """, {'observed_at': observed_at})
+
+        conn.execute(
+            "INSERT INTO price_snapshots VALUES (?, ?, ?, ?);",
+            (observed_at, products_count, new_products, price_changes - new_products)
+        )
+        conn.execute("DROP TABLE temp.price_snapshot;")
+        conn.execute("COMMIT;")
+
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        raise
+
+    stats = {
+        'observed_at': observed_at,
+        'products': products_count,
+        'new_products': new_products,
+        'price_changes': price_changes - new_products
+    }
+    logger.info(
+        f"Relevé de prix du {observed_at} : {products_count} produits, {new_products} nouveaux, "
+        f"{stats['price_changes']} changements de prix"
+    )
+    return stats
+
+def compact_price_history(conn, keep_days=COMPACTION_KEEP_DAYS, period='week', as_of=None):
+    if period not in COMPACTION_PERIODS:
+        raise ValueError(f"Période de compaction inconnue : {period} (périodes : {list(COMPACTION_PERIODS)})")
+
+    as_of = format_timestamp(as_of) if as_of is not None else latest_snapshot(conn)
+    if as_of is None:
+        return 0
+
+    # Limite alignée sur le début d'une période : seules des périodes complètes sont agrégées, et
+    # une période déjà résumée ne reçoit plus de lignes brutes (les relevés sont chronologiques)
+    period_start_sql = COMPACTION_PERIODS[period]
+    cutoff = conn.execute(
+        f"SELECT {period_start_sql} FROM (SELECT datetime(:as_of, :offset) AS observed_at);",
+        {'as_of': as_of, 'offset': f"-{int(keep_days)} days"}
+    ).fetchone()[0]
+
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        # Une période résumée lors d'une compaction précédente est fusionnée (moyennes pondérées
+        # par le nombre d'observations)
+        conn.execute(f"""
+        INSERT INTO price_summaries
+        SELECT
+            product_id,
+            :period,
+            {period_start_sql} AS period_start,
+            COUNT(*),
+            MIN({EFFECTIVE_PRICE_SQL}),
+            MAX({EFFECTIVE_PRICE_SQL}),
+            AVG({EFFECTIVE_PRICE_SQL}),
+            MIN(price_mrp),
+            MAX(price_mrp),
+            AVG(price_mrp),
+            AVG(discount_rate)
+        FROM price_history
+        WHERE {COMPACTABLE_ROWS_SQL}
+        GROUP BY product_id, period_start
+        ON CONFLICT (product_id, period, period_start) DO UPDATE SET
+            min_effective_price = MIN(min_effective_price, excluded.min_effective_price),
+            max_effective_price = MAX(max_effective_price, excluded.max_effective_price),
+            avg_effective_price = (avg_effective_price * observations
+                                   + excluded.avg_effective_price * excluded.observations)
+                                  / (observations + excluded.observations),
+            min_price_mrp = MIN(min_price_mrp, excluded.min_price_mrp),
+            max_price_mrp = MAX(max_price_mrp, excluded.max_price_mrp),
+            avg_price_mrp = (avg_price_mrp * observations + excluded.avg_price_mrp * excluded.observations)
+                            / (observations + excluded.observations),
+            avg_discount_rate = (avg_discount_rate * observations
+                                 + excluded.avg_discount_rate * excluded.observations)
+                                / (observations + excluded.observations),
+            observations = observations + excluded.observations;
+        """, {'period': period, 'cutoff': cutoff})
+        compacted = conn.execute(f"DELETE FROM price_history WHERE {COMPACTABLE_ROWS_SQL};", {'cutoff': cutoff}).rowcount
+        conn.execute("COMMIT;")
+
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        raise
+
+    logger.info(f"Historique des prix compacté : {compacted} lignes antérieures au {cutoff} résumées par {period}")
+    return compacted
+
+def biggest_price_drops(conn, days=30, limit=20, as_of=None, min_drop_pct=0):
+
+    # Seuls les produits dont le prix a changé dans la fenêtre peuvent avoir baissé : la recherche
+    # part de l'index sur observed_at, puis lit le prix en vigueur au début de la fenêtre par
+    # produit via la clé primaire (product_id, observed_at). Les périodes compactées de la fenêtre
+    # comptent par leur prix maximum
+    as_of = format_timestamp(as_of) if as_of is not None else latest_snapshot(conn)
+    if as_of is None:
+        return pd.DataFrame()
+
+    sql = f"""
+    WITH window_prices AS (
+        SELECT product_id, {EFFECTIVE_PRICE_SQL} AS effective_price
+        FROM price_history
+        WHERE observed_at >= :since AND observed_at <= :as_of
+        UNION ALL
+        SELECT product_id, max_effective_price
+        FROM price_summaries
+        WHERE period_start >= date(:since) AND period_start <= :as_of
+    ),
+    changed AS (
+        SELECT
+            product_id,
+            MAX(effective_price) AS window_high,
+            (
+                SELECT {EFFECTIVE_PRICE_SQL}
+                FROM price_history h
+                WHERE h.product_id = w.product_id AND h.observed_at < :since
+                ORDER BY h.observed_at DESC
+                LIMIT 1
+            ) AS start_price
+        FROM window_prices w
+        GROUP BY product_id
+    ),
+    drops AS (
+        SELECT
+            c.product_id,
+            MAX(c.window_high, COALESCE(c.start_price, c.window_high)) AS reference_price,
+            (
+                SELECT {EFFECTIVE_PRICE_SQL}
+                FROM price_history h
+                WHERE h.product_id = c.product_id AND h.observed_at <= :as_of
+                ORDER BY h.observed_at DESC
+                LIMIT 1
+            ) AS current_price
+        FROM changed c
+    )
+    SELECT
+        d.product_id,
+        p.url,
+        p.name,
+        d.reference_price,
+        d.current_price,
+        ROUND(d.reference_price - d.current_price, 2) AS price_drop,
+        ROUND(100.0 * (d.reference_price - d.current_price) / d.reference_price, 2) AS drop_pct
+    FROM drops d
+    JOIN price_products p ON p.product_id = d.product_id
+    WHERE d.reference_price > 0
+      AND d.current_price < d.reference_price
+      AND 100.0 * (d.reference_price - d.current_price) / d.reference_price >= :min_drop_pct
+    ORDER BY drop_pct DESC, price_drop DESC, d.product_id
+    LIMIT :limit;
+    """
+    params = {
+        'since': conn.execute("SELECT datetime(?, ?);", (as_of, f"-{int(days)} days")).fetchone()[0].replace(" ", "T"),
+        'as_of': as_of,
+        'min_drop_pct': min_drop_pct,
+        'limit': limit
+    }
+
+    return pd.read_sql_query(sql, conn, params=params)
+
+def load_snapshot(input_path):
+    # Relevé lu dans le jeu nettoyé produit par 01_load_and_clean.py (csv ou parquet)
+    if input_path.endswith('.parquet'):
+        return pd.read_parquet(input_path, columns=SNAPSHOT_COLUMNS)
+    return pd.read_csv(input_path, usecols=SNAPSHOT_COLUMNS)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Historique des prix : relevé, plus fortes baisses et compaction")
+    parser.add_argument("--db", default=PRICE_HISTORY_PATH, help="Base de l'historique des prix")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Ajoute un relevé des prix du jeu nettoyé à l'historique")
+    record.add_argument(
+        "--input", default=os.path.join("..", "outputs", "products_clean.csv"), help="Jeu nettoyé (csv ou parquet)"
+    )
+    record.add_argument("--observed-at", default=None, help="Date du relevé (ISO 8601, défaut : maintenant)")
+
+    drops = subparsers.add_parser("drops", help="Plus fortes baisses de prix sur les N derniers jours")
+    drops.add_argument("--days", type=int, default=30)
+    drops.add_argument("--limit", type=int, default=20)
+    drops.add_argument("--min-drop-pct", type=float, default=0)
+
+    compact = subparsers.add_parser("compact", help="Résume les relevés anciens par jour ou par semaine")
+    compact.add_argument("--keep-days", type=int, default=COMPACTION_KEEP_DAYS)
+    compact.add_argument("--period", choices=list(COMPACTION_PERIODS), default='week')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command != "record" and not os.path.exists(args.db):
+        raise FileNotFoundError(f"Historique des prix introuvable : {args.db}")
+
+    conn = open_price_history(args.db)
+    try:
+        if args.command == "record":
+            try:
+                record_price_snapshot(conn, load_snapshot(args.input), args.observed_at)
+            except ValueError as e:
+                logger.warning(f"Historique des prix non mis à jour : {str(e)}")
+        elif args.command == "compact":
+            compact_price_history(conn, keep_days=args.keep_days, period=args.period)
+        else:
+            results = biggest_price_drops(conn, days=args.days, limit=args.limit, min_drop_pct=args.min_drop_pct)
+            print(f"\n{len(results)} plus fortes baisses sur {args.days} jours :\n")
+            print(results.to_string(index=False))
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
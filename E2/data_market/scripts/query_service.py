@@ -0,0 +1,398 @@
+import pandas as pd
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from db_pool import ConnectionPool, DB_PATH, POOL_SIZE
+
+CACHE_MAX_ENTRIES = 256
+VIEW_DEFAULT_LIMIT = 100
+
+# Opérateurs acceptés dans les filtres des requêtes ad hoc sur les vues
+VIEW_FILTER_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE')
+
+# Classements précalculés par 02_split_tables.py (table product_rankings, LEADERBOARD_TOP_K premiers
+# produits par portée et par métrique) : une lecture est une recherche sur la clé primaire, sans tri
+LEADERBOARD_TOP_K = 100
+LEADERBOARD_METRICS = ('rating', 'review_count', 'popularity_score')
+
+LEADERBOARD_SCOPE_IDS = {
+    'all': "0",
+    'category': "(SELECT category_id FROM categories WHERE category = :scope_name)",
+    'brand': "(SELECT brand_id FROM brands WHERE brand = :scope_name)"
+}
+
+LEADERBOARD_SQL = """
+SELECT
+    rank,
+    name,
+    brand,
+    category,
+    rating,
+    review_count,
+    popularity_score
+FROM product_rankings
+WHERE scope = :scope AND scope_id = {scope_id} AND metric = :metric AND rank <= :limit
+ORDER BY rank;
+"""
+
+QUERY_REGISTRY = {
+    'Top_Produits': {
+        'title': "Top {limit} produits les plus populaires",
+        'sql': """
+        SELECT
+            name,
+            brand,
+            category,
+            rating,
+            review_count,
+            popularity_score
+        FROM product_rankings
+        WHERE scope = 'all' AND scope_id = 0 AND metric = 'rating' AND rank <= :limit
+        ORDER BY rank;
+        """,
+        # Au-delà du classement précalculé (ou limit négatif : tout le catalogue), ou sur une base
+        # antérieure à la table product_rankings, même ordre calculé sur la vue
+        'fallback_sql': """
+        SELECT
+            name,
+            brand,
+            category,
+            rating,
+            review_count,
+            popularity_score
+        FROM view_top_products
+        WHERE rating IS NOT NULL
+        ORDER BY rating DESC, review_count DESC, product_id
+        LIMIT :limit;
+        """,
+        'max_limit': LEADERBOARD_TOP_K,
+        'table': 'product_rankings',
+        'params': {'limit': 10}
+    },
+    'Top_Promotions': {
+        'title': "Top {limit} meilleures promotions",
+        'sql': """
+        SELECT
+            name,
+            brand,
+            category,
+            price_mrp,
+            price_sale,
+            computed_discount_pct
+        FROM view_promotions
+        WHERE computed_discount_pct IS NOT NULL
+        ORDER BY computed_discount_pct DESC
+        LIMIT :limit;
+        """,
+        'params': {'limit': 10}
+    },
+    'Top_Categories': {
+        'title': "Top {limit} catégories par engagement",
+        'sql': """
+        SELECT
+            category,
+            product_count,
+            avg_rating,
+            total_reviews
+        FROM view_category_stats
+        ORDER BY total_reviews DESC
+        LIMIT :limit;
+        """,
+        'params': {'limit': 10}
+    },
+    'Top_Marques': {
+        'title': "Top {limit} marques par satisfaction",
+        'sql': """
+        SELECT
+            brand,
+            product_count,
+            avg_rating,
+            total_reviews
+        FROM view_brand_stats
+        WHERE avg_rating IS NOT NULL
+        ORDER BY avg_rating DESC, total_reviews DESC
+        LIMIT :limit;
+        """,
+        'params': {'limit': 10}
+    },
+    'Produits_A_Mettre_En_Avant': {
+        'title': "Produits à mettre en avant (haute note, peu connus)",
+        'sql': """
+        SELECT
+            name,
+            brand,
+            category,
+            rating,
+            review_count
+        FROM view_top_products
+        WHERE rating >= :min_rating AND review_count BETWEEN :min_reviews AND :max_reviews
+        ORDER BY rating DESC, review_count ASC
+        LIMIT :limit;
+        """,
+        'params': {'min_rating': 4.5, 'min_reviews': 1, 'max_reviews': 20, 'limit': 10}
+    }
+}
+
+def get_data_version(db_path):
+    # Le premier lecteur d'une base en mode WAL crée un fichier -wal vide : tant qu'il est vide,
+    # les données sont celles du fichier principal
+    version = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            stat = os.stat(path)
+            version.append((stat.st_ino, stat.st_size, stat.st_mtime_ns) if stat.st_size else None)
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class QueryService:
+
+    def __init__(self, db_path=DB_PATH, registry=None, cache_max_entries=CACHE_MAX_ENTRIES, pool=None,
+                 pool_size=POOL_SIZE):
+        self._owns_pool = pool is None
+        self.pool = ConnectionPool(db_path, size=pool_size) if pool is None else pool
+        self.db_path = self.pool.db_path
+        self.registry = dict(QUERY_REGISTRY if registry is None else registry)
+        self.cache_max_entries = cache_max_entries
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self._cache = OrderedDict()
+        self._cache_version = None
+        self._schema = None
+        self._schema_version = None
+        self._lock = threading.Lock()
+
+    def register(self, name, sql, title=None, **default_params):
+        self.registry[name] = {'title': title or name, 'sql': sql, 'params': default_params}
+
+    def resolve_params(self, name, params):
+        if name not in self.registry:
+            raise KeyError(f"Requête inconnue : {name}")
+
+        defaults = self.registry[name]['params']
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"Paramètres inconnus pour {name} : {sorted(unknown)}")
+
+        return {**defaults, **params}
+
+    def title(self, name, **params):
+        return self.registry[name]['title'].format(**self.resolve_params(name, params))
+
+    def sql(self, name, params=None):
+        # Une requête servie par une table précalculée bornée (max_limit lignes) passe par sa
+        # requête de repli pour un limit hors de [0, max_limit] ou si la table n'existe pas encore
+        entry = self.registry[name]
+        if 'fallback_sql' in entry:
+            if entry['table'] not in self.tables():
+                return entry['fallback_sql']
+            if params is not None and not 0 <= params['limit'] <= entry['max_limit']:
+                return entry['fallback_sql']
+        return entry['sql']
+
+    def _execute(self, key, sql, params, use_cache):
+        version = get_data_version(self.db_path)
+        key = key + (version,)
+
+        if use_cache:
+            with self._lock:
+                if version != self._cache_version:
+                    self._cache.clear()
+                    self._cache_version = version
+                elif key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return self._cache[key]
+                self.cache_misses += 1
+
+        with self.pool.connection() as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+
+        if use_cache:
+            with self._lock:
+                if version == self._cache_version:
+                    self._cache[key] = df
+                    while len(self._cache) > self.cache_max_entries:
+                        self._cache.popitem(last=False)
+
+        return df
+
+    def run(self, name, use_cache=True, **params):
+        params = self.resolve_params(name, params)
+        return self._execute((name, tuple(sorted(params.items()))), self.sql(name, params), params, use_cache)
+
+    @contextmanager
+    def cursor(self, name, **params):
+        # Curseur SQLite brut, sans cache ni DataFrame : les lignes sont lues par lots par
+        # l'appelant (export en flux d'un résultat volumineux)
+        params = self.resolve_params(name, params)
+        with self.pool.connection() as conn:
+            cursor = conn.execute(self.sql(name, params), params)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def _read_schema(self):
+        # Tables, vues et colonnes relues à chaque changement de la base : les identifiants ne
+        # pouvant pas être liés en paramètre, seuls ceux présents dans le schéma sont acceptés
+        version = get_data_version(self.db_path)
+        with self._lock:
+            if self._schema_version == version:
+                return self._schema
+
+        with self.pool.connection() as conn:
+            tables = frozenset(
+                row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")
+            )
+            names = [
+                row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view' ORDER BY name;")
+            ]
+            views = {
+                name: [row[1] for row in conn.execute(f"PRAGMA table_info({_quote_identifier(name)});")]
+                for name in names
+            }
+
+        with self._lock:
+            self._schema, self._schema_version = (tables, views), version
+        return tables, views
+
+    def tables(self):
+        return self._read_schema()[0]
+
+    def views(self):
+        return self._read_schema()[1]
+
+    def view_sql(self, view, columns=None, filters=None, order_by=None, descending=False, limit=VIEW_DEFAULT_LIMIT,
+                 key=None, after=None):
+        views = self.views()
+        if view not in views:
+            raise KeyError(f"Vue inconnue : {view} (vues disponibles : {list(views)})")
+
+        available = views[view]
+        columns = list(columns or available)
+        filters = dict(filters or {})
+        requested = columns + list(filters) + [column for column in (order_by, key) if column]
+        unknown = sorted(set(requested) - set(available))
+        if unknown:
+            raise ValueError(f"Colonnes inconnues pour {view} : {unknown}")
+
+        # Filtres triés par colonne : une même forme de requête produit le même texte SQL et
+        # réutilise la requête préparée de la connexion
+        conditions = []
+        params = {}
+        for column in sorted(filters):
+            column_filters = filters[column] if isinstance(filters[column], list) else [filters[column]]
+            for position, column_filter in enumerate(column_filters):
+                operator, value = column_filter if isinstance(column_filter, tuple) else ('=', column_filter)
+                if operator.upper() not in VIEW_FILTER_OPERATORS:
+                    raise ValueError(f"Opérateur non supporté pour {column} : {operator}")
+                name = column if len(column_filters) == 1 else f"{column}_{position}"
+                conditions.append(f"{_quote_identifier(column)} {operator.upper()} :{name}")
+                params[name] = value
+
+        order_columns = [column for column in dict.fromkeys((order_by, key)) if column]
+        if after is not None:
+            if key is None:
+                raise ValueError("Une pagination par curseur nécessite une colonne clé (key)")
+            conditions.append(self._keyset_condition(order_by, key, descending, after, params))
+
+        sql = f"SELECT {', '.join(_quote_identifier(column) for column in columns)} FROM {_quote_identifier(view)}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(f"({condition})" for condition in conditions)
+        if order_columns:
+            direction = 'DESC' if descending else 'ASC'
+            sql += " ORDER BY " + ", ".join(f"{_quote_identifier(column)} {direction}" for column in order_columns)
+        sql += " LIMIT :limit;"
+        params['limit'] = limit
+
+        return sql, params
+
+    @staticmethod
+    def _keyset_condition(order_by, key, descending, after, params):
+        # Page suivante : lignes strictement après (valeur de tri, clé) de la dernière ligne lue.
+        # SQLite place les NULL en tête d'un tri croissant et en fin d'un tri décroissant
+        after_value, after_key = after
+        comparison = '<' if descending else '>'
+        key_sql = _quote_identifier(key)
+        params['after_key'] = after_key
+        if order_by is None or order_by == key:
+            return f"{key_sql} {comparison} :after_key"
+
+        column_sql = _quote_identifier(order_by)
+        if after_value is None:
+            condition = f"{column_sql} IS NULL AND {key_sql} {comparison} :after_key"
+            return condition if descending else f"{condition} OR {column_sql} IS NOT NULL"
+
+        params['after_value'] = after_value
+        condition = (
+            f"{column_sql} {comparison} :after_value "
+            f"OR ({column_sql} = :after_value AND {key_sql} {comparison} :after_key)"
+        )
+        return f"{condition} OR {column_sql} IS NULL" if descending else condition
+
+    def run_view(self, view, columns=None, filters=None, order_by=None, descending=False, limit=VIEW_DEFAULT_LIMIT,
+                 key=None, after=None, use_cache=True):
+        sql, params = self.view_sql(view, columns, filters, order_by, descending, limit, key, after)
+        return self._execute((sql, tuple(sorted(params.items()))), sql, params, use_cache)
+
+    def register_view(self, name, view, columns=None, filters=None, order_by=None, descending=False,
+                      limit=VIEW_DEFAULT_LIMIT, title=None):
+        sql, params = self.view_sql(view, columns, filters, order_by, descending, limit)
+        self.register(name, sql, title=title or f"{view} (requête ad hoc)", **params)
+
+    def leaderboard(self, metric='rating', category=None, brand=None, limit=10, use_cache=True):
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Métrique de classement inconnue : {metric} (métriques : {list(LEADERBOARD_METRICS)})")
+        if category is not None and brand is not None:
+            raise ValueError("Un classement porte sur une catégorie ou une marque, pas les deux")
+        if not 0 <= limit <= LEADERBOARD_TOP_K:
+            raise ValueError(f"Limite de classement hors de [0, {LEADERBOARD_TOP_K}] : {limit}")
+
+        scope, scope_name = ('category', category) if category is not None else (
+            ('brand', brand) if brand is not None else ('all', None)
+        )
+        sql = LEADERBOARD_SQL.format(scope_id=LEADERBOARD_SCOPE_IDS[scope])
+        params = {'scope': scope, 'metric': metric, 'limit': limit}
+        if scope_name is not None:
+            params['scope_name'] = scope_name
+
+        return self._execute(('leaderboard', tuple(sorted(params.items()))), sql, params, use_cache)
+
+    def run_all(self, names=None, concurrent=False, max_workers=None, use_cache=True, **params):
+        names = list(names or self.registry)
+
+        def run_one(name):
+            applicable = {key: value for key, value in params.items() if key in self.registry[name]['params']}
+            return self.run(name, use_cache=use_cache, **applicable)
+
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=max_workers or min(len(names), self.pool.size)) as executor:
+                frames = list(executor.map(run_one, names))
+        else:
+            frames = [run_one(name) for name in names]
+
+        return dict(zip(names, frames))
+
+    def explain(self, name, **params):
+        params = self.resolve_params(name, params)
+        with self.pool.connection() as conn:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {self.sql(name, params)}", params).fetchall()
+        return [detail for _, _, _, detail in plan]
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_version = None
+
+    def close(self):
+        self.clear_cache()
+        if self._owns_pool:
+            self.pool.close()
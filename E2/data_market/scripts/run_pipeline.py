@@ -0,0 +1,382 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from instrumentation import pipeline_run, step
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join("..", "outputs", "pipeline.log")),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join("..", ".cache", "stages")
+CACHE_MAX_MB = 2048
+CACHE_FORMAT_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+
+RAW_DATA_PATH = os.path.join("..", "data", "decathlon_webscrapped_raw.csv")
+DB_PATH = os.path.join("..", "outputs", "data_market.db")
+EXCEL_PATH = os.path.join("..", "outputs", "resultats_requetes_metier.xlsx")
+
+def build_stages(args):
+    clean_path = os.path.join("..", "outputs", f"products_clean.{args.format}")
+
+    clean_args = ["--format", args.format]
+    if args.chunksize:
+        clean_args += ["--chunksize", str(args.chunksize)]
+    if args.lazy_text:
+        clean_args.append("--lazy-text")
+
+    split_args = ["--format", args.format]
+    if args.workers:
+        clean_args += ["--workers", str(args.workers)]
+        split_args += ["--workers", str(args.workers)]
+    if args.materialize_stats:
+        split_args.append("--materialize-stats")
+    if args.near_duplicates:
+        split_args.append("--near-duplicates")
+    # Relevé des prix fait par l'étape price_history, hors cache : 02 ne l'enregistre pas
+    split_args.append("--no-price-history")
+
+    query_args = ["--limit", str(args.limit)] if args.limit else []
+
+    stages = [
+        {
+            'name': 'load_and_clean',
+            'script': '01_load_and_clean.py',
+            'code': ['01_load_and_clean.py', 'data_validation.py', 'instrumentation.py'],
+            'inputs': [RAW_DATA_PATH],
+            'outputs': [clean_path],
+            'args': clean_args
+        },
+        {
+            'name': 'split_tables',
+            'script': '02_split_tables.py',
+            'code': [
+                '02_split_tables.py', 'variant_detection.py', 'facet_search.py', 'price_history.py',
+                'query_service.py', 'db_pool.py', 'instrumentation.py'
+            ],
+            'inputs': [clean_path],
+            'outputs': [DB_PATH],
+            'args': split_args
+        },
+        {
+            'name': 'business_queries',
+            'script': '03_business_queries.py',
+            'code': ['03_business_queries.py', 'query_service.py', 'db_pool.py', 'export_results.py', 'instrumentation.py'],
+            'inputs': [DB_PATH],
+            'outputs': [EXCEL_PATH],
+            'args': query_args
+        }
+    ]
+
+    # Chaque exécution est un relevé de prix, même si le jeu nettoyé n'a pas changé : l'étape
+    # complète l'historique (effet de bord hors du cache) et s'exécute à chaque lancement
+    if not args.no_price_history:
+        stages.insert(2, {
+            'name': 'price_history',
+            'script': 'price_history.py',
+            'args': ["record", "--input", clean_path],
+            'cached': False
+        })
+
+    return stages
+
+def _stat_key(stat):
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+def _write_json_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _link_or_copy(source, destination):
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+class StageCache:
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.max_bytes = max_bytes
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.index = {'version': CACHE_FORMAT_VERSION, 'files': {}, 'objects': {}, 'stages': {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get('version') == CACHE_FORMAT_VERSION:
+                self.index = index
+
+    def file_hash(self, path):
+        # Les empreintes sont mémorisées par (inode, taille, mtime) : un fichier inchangé n'est
+        # relu que lorsque son stat change
+        path = os.path.abspath(path)
+        stat_key = _stat_key(os.stat(path))
+        known = self.index['files'].get(path)
+        if known is not None and known[:3] == stat_key:
+            return known[3]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+
+        self.index['files'][path] = stat_key + [content_hash]
+        return content_hash
+
+    def fingerprint(self, stage):
+        description = {
+            'cache_version': CACHE_FORMAT_VERSION,
+            'stage': stage['name'],
+            'args': stage['args'],
+            'code': {name: self.file_hash(os.path.join(SCRIPTS_DIR, name)) for name in stage['code']},
+            'inputs': {path: self.file_hash(path) for path in stage['inputs']}
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.objects_dir, content_hash[:2], content_hash)
+
+    def _object_is_valid(self, content_hash):
+        known = self.index['objects'].get(content_hash)
+        try:
+            return known is not None and _stat_key(os.stat(self._object_path(content_hash))) == known
+        except FileNotFoundError:
+            return False
+
+    def lookup(self, fingerprint):
+        entry = self.index['stages'].get(fingerprint)
+        if entry is None:
+            return None
+
+        # Un objet modifié sur place (par exemple via un lien physique) invalide l'entrée
+        if not all(self._object_is_valid(content_hash) for content_hash in entry['outputs'].values()):
+            logger.warning(f"Entrée de cache {fingerprint[:12]} altérée : étape relancée")
+            del self.index['stages'][fingerprint]
+            return None
+
+        entry['last_used'] = time.time()
+        return entry
+
+    def restore(self, entry):
+        for path, content_hash in entry['outputs'].items():
+            if os.path.exists(path) and self.file_hash(path) == content_hash:
+                continue
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".restore"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            _link_or_copy(self._object_path(content_hash), tmp_path)
+            os.replace(tmp_path, path)
+
+    def release_outputs(self, stage):
+        # Une sortie restaurée partage son inode avec l'objet en cache : elle est retirée avant
+        # que l'étape ne la réécrive sur place
+        for path in stage['outputs']:
+            if os.path.exists(path) and os.stat(path).st_nlink > 1:
+                os.remove(path)
+
+    def store(self, fingerprint, stage):
+        outputs = {}
+        for path in stage['outputs']:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Sortie attendue absente après l'étape {stage['name']} : {path}")
+
+            content_hash = self.file_hash(path)
+            object_path = self._object_path(content_hash)
+            if not self._object_is_valid(content_hash):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                if os.path.exists(object_path):
+                    os.remove(object_path)
+                _link_or_copy(path, object_path)
+                self.index['objects'][content_hash] = _stat_key(os.stat(object_path))
+            outputs[path] = content_hash
+
+        self.index['stages'][fingerprint] = {'stage': stage['name'], 'outputs': outputs, 'last_used': time.time()}
+
+    def evict(self):
+        def referenced_objects():
+            return {h for entry in self.index['stages'].values() for h in entry['outputs'].values()}
+
+        def total_size(hashes):
+            return sum(self.index['objects'][h][1] for h in hashes if h in self.index['objects'])
+
+        by_age = sorted(self.index['stages'], key=lambda fp: self.index['stages'][fp]['last_used'])
+        evicted = 0
+        while by_age and total_size(referenced_objects()) > self.max_bytes:
+            del self.index['stages'][by_age.pop(0)]
+            evicted += 1
+
+        referenced = referenced_objects()
+        for content_hash in list(self.index['objects']):
+            if content_hash not in referenced:
+                object_path = self._object_path(content_hash)
+                if os.path.exists(object_path):
+                    os.remove(object_path)
+                del self.index['objects'][content_hash]
+
+        self.index['files'] = {
+            path: known for path, known in self.index['files'].items() if os.path.exists(path)
+        }
+
+        if evicted:
+            logger.info(f"Cache : {evicted} entrées les moins récemment utilisées évincées")
+
+        return total_size(referenced)
+
+    def save(self):
+        _write_json_atomic(self.index_path, self.index)
+
+def run_stage(stage):
+    command = [sys.executable, stage['script'], *stage['args']]
+    logger.info(f"Lancement de {' '.join(command[1:])}")
+    subprocess.run(command, cwd=SCRIPTS_DIR, check=True)
+
+def run_pipeline(stages, cache, force=False):
+    start = time.perf_counter()
+    executed = []
+
+    try:
+        for stage in stages:
+            stage_start = time.perf_counter()
+            if not stage.get('cached', True):
+                with step(stage['name']):
+                    run_stage(stage)
+                executed.append(stage['name'])
+                logger.info(f"Étape {stage['name']} (hors cache) exécutée en {time.perf_counter() - stage_start:.1f} s")
+                continue
+
+            fingerprint = cache.fingerprint(stage)
+            entry = None if force else cache.lookup(fingerprint)
+
+            if entry is not None:
+                cache.restore(entry)
+                logger.info(
+                    f"Étape {stage['name']} inchangée : sorties restaurées depuis le cache "
+                    f"({time.perf_counter() - stage_start:.3f} s)"
+                )
+                continue
+
+            cache.release_outputs(stage)
+            with step(stage['name']):
+                run_stage(stage)
+            cache.store(fingerprint, stage)
+            executed.append(stage['name'])
+            logger.info(f"Étape {stage['name']} exécutée en {time.perf_counter() - stage_start:.1f} s")
+    finally:
+        cache_size = cache.evict()
+        cache.save()
+
+    logger.info(f"Taille du cache : {cache_size / 1024 ** 2:.1f} Mo (limite {cache.max_bytes / 1024 ** 2:.0f} Mo)")
+    logger.info(f"Pipeline terminé en {time.perf_counter() - start:.2f} s, étapes exécutées : {executed or 'aucune'}")
+
+    return executed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pipeline complet 01 -> 02 -> 03 avec cache des étapes")
+    parser.add_argument(
+        "--format",
+        choices=("csv", "parquet"),
+        default="csv",
+        help="Format du jeu nettoyé transmis de 01 à 02"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Mode streaming de 01_load_and_clean.py"
+    )
+    parser.add_argument(
+        "--lazy-text",
+        action="store_true",
+        help="Mode lazy-text de 01_load_and_clean.py"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Mode parallèle de 01_load_and_clean.py et processus d'extraction des attributs de 02_split_tables.py"
+    )
+    parser.add_argument(
+        "--materialize-stats",
+        action="store_true",
+        help="Statistiques matérialisées dans 02_split_tables.py"
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Détection des déclinaisons par MinHash dans 02_split_tables.py"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Nombre de lignes de chaque requête de 03_business_queries.py"
+    )
+    parser.add_argument(
+        "--no-price-history",
+        action="store_true",
+        help="N'ajoute pas cette exécution à l'historique des prix"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Relance toutes les étapes sans consulter le cache (les sorties sont tout de même mises en cache)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help="Répertoire du cache d'artefacts (défaut : ../.cache/stages)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=CACHE_MAX_MB,
+        help="Taille maximale du cache, éviction LRU au-delà"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    logger.info("=" * 60)
+    logger.info("DÉBUT DU PIPELINE")
+    logger.info("=" * 60)
+
+    try:
+        cache = StageCache(args.cache_dir, args.cache_max_mb * 1024 ** 2)
+        with pipeline_run("run_pipeline"):
+            run_pipeline(build_stages(args), cache, force=args.force)
+
+        logger.info("=" * 60)
+        logger.info("PIPELINE TERMINÉ AVEC SUCCÈS")
+        logger.info("=" * 60)
+
+    except Exception as e:
+        logger.error("=" * 60)
+        logger.error(f"ÉCHEC DU PIPELINE : {str(e)}")
+        logger.error("=" * 60)
+        raise
+
+if __name__ == "__main__":
+    main()
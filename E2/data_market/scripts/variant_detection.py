@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+# Suffixes de slug propres à une déclinaison : code article Decathlon (4 chiffres et plus)
+# ou numéro de doublon de handle Shopify (-1, -2…). Les numéros de gamme (100, 500) sont conservés
+SLUG_VARIANT_SUFFIX = r"(?:-(?:\d{4,}|\d{1,2}))+$"
+SLUG_CODE_SUFFIX = r"(?:-\d{4,})+$"
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 8
+SHINGLE_SIZE = 3
+NEAR_DUPLICATE_THRESHOLD = 0.8
+MINHASH_BATCH_ROWS = 20_000
+
+MATCH_TYPES = ('url', 'slug', 'description', 'unique')
+
+_SHINGLE_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+_EMPTY_SIGNATURE = np.iinfo(np.uint64).max
+
+def canonical_urls(urls):
+    return urls.astype(object).str.replace(r"[?#].*\Z", "", regex=True).str.rstrip("/")
+
+def canonical_slugs(urls, names=None):
+    # Le code article est toujours retiré ; un numéro court (-1, -2…) peut aussi être une taille
+    # ou un modèle, il n'est retiré que si un autre produit de même slug de base porte le même nom
+    slugs = urls.str.extract(r"/products/([^/?#]+)", expand=False).str.lower()
+    base_slugs = slugs.str.replace(SLUG_VARIANT_SUFFIX, "", regex=True)
+    if names is None:
+        return slugs.str.replace(SLUG_CODE_SUFFIX, "", regex=True)
+
+    names = pd.Series(names, index=slugs.index, dtype=object).str.strip().str.lower()
+    same_name = pd.Series(0, index=slugs.index).groupby([base_slugs, names]).transform('size') > 1
+    return base_slugs.where(same_name, slugs.str.replace(SLUG_CODE_SUFFIX, "", regex=True))
+
+def _permutation_parameters(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    seeds = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    multipliers = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) | 1
+    return seeds, multipliers
+
+def shingle_hashes(texts, shingle_size=SHINGLE_SIZE):
+    # Shingles de mots hachés en uint64, renvoyés avec la position du texte d'origine ; un texte
+    # plus court qu'un shingle n'en produit aucun
+    tokens = texts.fillna("").str.lower().str.findall(r"[a-z0-9]+").explode().dropna()
+    if len(tokens) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64)
+
+    positions = tokens.index.to_numpy()
+    token_hashes = pd.util.hash_array(tokens.to_numpy(dtype=object))
+
+    count = len(token_hashes) - shingle_size + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64)
+
+    with np.errstate(over='ignore'):
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(shingle_size):
+            hashes += token_hashes[offset:offset + count] * _SHINGLE_MULTIPLIERS[offset % len(_SHINGLE_MULTIPLIERS)]
+
+    same_text = positions[:count] == positions[shingle_size - 1:]
+    return positions[:count][same_text], hashes[same_text]
+
+def minhash_signatures(texts, num_perm=MINHASH_PERMUTATIONS, shingle_size=SHINGLE_SIZE, seed=0,
+                       batch_rows=MINHASH_BATCH_ROWS):
+    texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+    seeds, multipliers = _permutation_parameters(num_perm, seed)
+    signatures = np.full((len(texts), num_perm), _EMPTY_SIGNATURE, dtype=np.uint64)
+
+    # Traitement par lots de textes : la mémoire reste bornée par le nombre de shingles d'un lot
+    for start in range(0, len(texts), batch_rows):
+        positions, hashes = shingle_hashes(texts.iloc[start:start + batch_rows], shingle_size)
+        if len(hashes) == 0:
+            continue
+
+        starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+        rows = positions[starts]
+        with np.errstate(over='ignore'):
+            for perm in range(num_perm):
+                permuted = (hashes ^ seeds[perm]) * multipliers[perm]
+                signatures[rows, perm] = np.minimum.reduceat(permuted, starts)
+
+    return signatures
+
+def lsh_candidate_pairs(signatures, keys=None, bands=LSH_BANDS):
+    # Les textes dont une bande de signature (et la clé de blocage) coïncide tombent dans le même
+    # seau : chaque membre est relié au premier du seau, sans comparaison deux à deux
+    has_shingles = (signatures != _EMPTY_SIGNATURE).any(axis=1)
+    rows_per_band = signatures.shape[1] // bands
+    candidates = np.flatnonzero(has_shingles)
+    left, right = [], []
+
+    for band in range(bands):
+        band_columns = signatures[candidates, band * rows_per_band:(band + 1) * rows_per_band]
+        bucket_frame = pd.DataFrame(band_columns)
+        if keys is not None:
+            bucket_frame['key'] = np.asarray(keys)[candidates]
+        bucket_codes = pd.factorize(pd.util.hash_pandas_object(bucket_frame, index=False))[0]
+
+        first = pd.Series(candidates).groupby(bucket_codes).transform('first').to_numpy()
+        linked = first != candidates
+        left.append(candidates[linked])
+        right.append(first[linked])
+
+    if not left:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    pairs = np.unique(np.column_stack([np.concatenate(left), np.concatenate(right)]), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+def connected_components(count, left, right):
+    # Propagation du plus petit libellé le long des arêtes, puis saut de pointeurs : chaque
+    # passe est linéaire et le nombre de passes croît avec le diamètre des groupes
+    labels = np.arange(count)
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, left, labels[right])
+        np.minimum.at(labels, right, labels[left])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+def detect_variants(products_df, near_duplicates=False, threshold=NEAR_DUPLICATE_THRESHOLD,
+                    num_perm=MINHASH_PERMUTATIONS, bands=LSH_BANDS):
+    products_df = products_df.reset_index(drop=True)
+    urls = canonical_urls(products_df['url'])
+    slugs = canonical_slugs(urls, products_df['name'])
+
+    # Un produit sans slug exploitable forme son propre groupe
+    slug_codes, _ = pd.factorize(slugs)
+    missing = slug_codes < 0
+    slug_codes[missing] = slug_codes.max(initial=-1) + 1 + np.arange(missing.sum())
+
+    group_codes = slug_codes
+    if near_duplicates and len(products_df) > 0:
+        texts = products_df['description'].fillna(products_df['name'])
+        signatures = minhash_signatures(texts, num_perm=num_perm)
+        left, right = lsh_candidate_pairs(signatures, keys=products_df['brand_id'].fillna(-1), bands=bands)
+
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        left, right = left[similarity >= threshold], right[similarity >= threshold]
+        group_codes = connected_components(slug_codes.max(initial=-1) + 1, slug_codes[left], slug_codes[right])[slug_codes]
+
+    product_ids = products_df['product_id'].to_numpy()
+    group_ids = pd.Series(product_ids).groupby(group_codes).transform('min').to_numpy()
+    group_sizes = pd.Series(group_codes).map(pd.Series(group_codes).value_counts()).to_numpy()
+
+    match_type = np.select(
+        [
+            urls.duplicated(keep=False).to_numpy(),
+            pd.Series(slug_codes).duplicated(keep=False).to_numpy(),
+            group_sizes > 1
+        ],
+        ['url', 'slug', 'description'],
+        default='unique'
+    )
+
+    return pd.DataFrame({
+        'product_id': product_ids,
+        'variant_group_id': group_ids,
+        'canonical_url': urls.to_numpy(dtype=object),
+        'canonical_slug': slugs.to_numpy(dtype=object),
+        'match_type': match_type
+    })
@@ -0,0 +1,65 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+def load_script(filename):
+    # Les scripts journalisent dans ../outputs relativement au répertoire courant : ils sont
+    # chargés depuis scripts/, comme en exécution normale
+    module_name = "script_" + os.path.splitext(filename)[0]
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    previous_dir = os.getcwd()
+    os.chdir(SCRIPTS_DIR)
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(previous_dir)
+    return module
+
+
+@pytest.fixture(scope="session")
+def variant_detection():
+    return load_script("variant_detection.py")
+
+
+@pytest.fixture(scope="session")
+def split_tables():
+    module = load_script("02_split_tables.py")
+    module.logger.setLevel("WARNING")
+    return module
+
+
+@pytest.fixture(scope="session")
+def query_service():
+    return load_script("query_service.py")
+
+
+@pytest.fixture(scope="session")
+def facet_search():
+    return load_script("facet_search.py")
+
+
+@pytest.fixture(scope="session")
+def export_results():
+    return load_script("export_results.py")
+
+
+@pytest.fixture(scope="session")
+def market_db(split_tables, tmp_path_factory):
+    from market_data import clean_products, export_full
+
+    db_path = str(tmp_path_factory.mktemp("market") / "data_market.db")
+    export_full(split_tables, clean_products(count=250), db_path)
+    return db_path
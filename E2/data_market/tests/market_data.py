@@ -0,0 +1,42 @@
+import pandas as pd
+
+
+def clean_products(count=300, price_offset=0.0, description="Description"):
+    ids = range(count)
+    return pd.DataFrame({
+        'url': [f"https://shop.example/products/item-{i}" for i in ids],
+        'name': [f"Produit {i}" for i in ids],
+        'brand': [f"Marque {i % 7}" for i in ids],
+        'rating': [3.0 + (i % 20) / 10 for i in ids],
+        'review_count': [i % 50 for i in ids],
+        'price_mrp': [20.0 + i + price_offset for i in ids],
+        'price_sale': [15.0 + i + price_offset for i in ids],
+        'colour': ["Bleu"] * count,
+        'information': [f"{{'Origin': 'Imported', 'Size range': 'S-{i % 5}'}}" for i in ids],
+        'description': [f"{description} {i}" for i in ids],
+        'discount_rate': [25.0] * count,
+        'is_on_sale': [True] * count,
+        'category': [f"Catégorie {i % 5}" for i in ids],
+        'popularity_score': [float(i % 9) for i in ids]
+    })
+
+
+def build_tables(split_tables, df, state=None):
+    state = state or split_tables.load_existing_state("")
+    brands = split_tables.create_brands_table(df, state['brands'])
+    categories = split_tables.create_categories_table(df, state['categories'])
+    products, products_full = split_tables.create_products_table(df, brands, categories, state['fingerprints'])
+    fingerprints = split_tables.create_fingerprints_table(df, products_full)
+    reviews = split_tables.create_reviews_table(products_full)
+    attributes = split_tables.create_product_attributes_table(products_full, workers=1)
+    variants = split_tables.create_product_variants_table(products_full)
+    return brands, categories, products, reviews, attributes, fingerprints, variants
+
+
+def export_full(split_tables, df, db_path):
+    split_tables.export_to_database(*build_tables(split_tables, df), db_path)
+
+
+def export_incremental(split_tables, df, db_path):
+    state = split_tables.load_existing_state(db_path)
+    split_tables.export_incremental(*build_tables(split_tables, df, state), state['fingerprints'], db_path)
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from db_pool import connect_read_only
+from market_data import build_tables, clean_products, export_full, export_incremental
+
+
+def product_summary(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*), SUM(price_mrp), group_concat(description, '|') FROM products;").fetchone()
+    finally:
+        conn.close()
+
+
+def test_full_rebuild_with_a_reader_open(split_tables, tmp_path):
+    original = clean_products()
+    expected_path = str(tmp_path / "expected.db")
+    export_full(split_tables, original, expected_path)
+
+    db_path = str(tmp_path / "data_market.db")
+    export_full(split_tables, original, db_path)
+
+    # Lecteur ouvert pendant tout le scénario : il garde -wal et -shm ouverts à côté de la base
+    reader = connect_read_only(db_path)
+    try:
+        assert reader.execute("SELECT COUNT(*) FROM products;").fetchone()[0] == len(original)
+
+        export_incremental(split_tables, clean_products(price_offset=1.0, description="Modifiée"), db_path)
+        assert reader.execute("SELECT SUM(price_mrp) FROM products;").fetchone()[0] == pytest.approx(
+            (original['price_mrp'] + 1.0).sum()
+        )
+
+        export_full(split_tables, original, db_path)
+        assert reader.execute("SELECT SUM(price_mrp) FROM products;").fetchone()[0] == pytest.approx(
+            original['price_mrp'].sum()
+        )
+    finally:
+        reader.close()
+
+    assert product_summary(db_path) == product_summary(expected_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("PRAGMA integrity_check;").fetchone()[0] == "ok"
+        assert conn.execute("PRAGMA foreign_key_check;").fetchall() == []
+    finally:
+        conn.close()
+
+
+def test_failed_rebuild_keeps_the_previous_database(split_tables, tmp_path):
+    original = clean_products()
+    db_path = str(tmp_path / "data_market.db")
+    export_full(split_tables, original, db_path)
+    before = product_summary(db_path)
+
+    brands, categories, products, reviews, attributes, fingerprints, variants = build_tables(
+        split_tables, clean_products(price_offset=1.0)
+    )
+    reviews = reviews.assign(product_id=reviews['product_id'] + 10_000)
+    with pytest.raises(sqlite3.IntegrityError):
+        split_tables.export_to_database(brands, categories, products, reviews, attributes, fingerprints, variants, db_path)
+
+    assert product_summary(db_path) == before
@@ -0,0 +1,39 @@
+import xml.etree.ElementTree as ET
+import zipfile
+
+import pandas as pd
+
+SPREADSHEET_NS = {'main': "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def workbook_sheet_names(path):
+    with zipfile.ZipFile(path) as archive:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    return [sheet.get('name') for sheet in workbook.iterfind("main:sheets/main:sheet", SPREADSHEET_NS)]
+
+
+def test_sheet_names_are_escaped_and_follow_excel_rules(export_results, tmp_path):
+    path = str(tmp_path / "export.xlsx")
+    titles = [
+        'Top "promos" & <soldes>',
+        "'Ventes: 2024/2025'",
+        "History",
+        "Produits à mettre en avant par catégorie et par marque",
+        "Produits à mettre en avant par catégorie et par rayon"
+    ]
+    with export_results.StreamingXlsxWriter(path) as writer:
+        for title in titles:
+            writer.write_sheet(title, ["name", "rating"], [[("Sac \"trek\"", 4.5)]])
+
+    names = workbook_sheet_names(path)
+    assert names == [
+        'Top "promos" & <soldes>',
+        "Ventes_ 2024_2025",
+        "History_",
+        "Produits à mettre en avant par ",
+        "Produits à mettre en avant pa_2"
+    ]
+    assert all(len(name) <= export_results.EXCEL_SHEET_NAME_LENGTH for name in names)
+
+    sheet = pd.read_excel(path, sheet_name=names[0])
+    assert sheet.to_dict('records') == [{'name': 'Sac "trek"', 'rating': 4.5}]
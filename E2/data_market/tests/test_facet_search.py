@@ -0,0 +1,15 @@
+import numpy as np
+
+
+def test_build_postings_groups_sorted_products(facet_search):
+    postings = list(facet_search.build_postings(
+        np.array([2, 1, 1, 1, 2]), np.array([5, 3, 3, 4, 5]), np.array([9, 7, 1, 7, 9])
+    ))
+
+    assert [(key_id, value_id, count) for key_id, value_id, count, _ in postings] == [(1, 3, 2), (1, 4, 1), (2, 5, 1)]
+    assert np.frombuffer(postings[0][3], dtype=facet_search.POSTING_DTYPE).tolist() == [1, 7]
+
+
+def test_build_postings_without_attributes(facet_search):
+    empty = np.zeros(0, dtype=np.int64)
+    assert list(facet_search.build_postings(empty, empty, empty)) == []
@@ -0,0 +1,70 @@
+import shutil
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def service(query_service, market_db):
+    service = query_service.QueryService(market_db)
+    yield service
+    service.close()
+
+
+def test_top_products_reads_the_precomputed_ranking(service):
+    df = service.run('Top_Produits', use_cache=False, limit=10)
+
+    assert len(df) == 10
+    assert "product_rankings" in service.sql('Top_Produits', service.resolve_params('Top_Produits', {'limit': 10}))
+
+
+def test_top_products_exports_everything_with_a_negative_limit(service, market_db):
+    conn = sqlite3.connect(market_db)
+    rated = conn.execute("SELECT COUNT(*) FROM reviews WHERE rating IS NOT NULL;").fetchone()[0]
+    conn.close()
+
+    df = service.run('Top_Produits', use_cache=False, limit=-1)
+
+    assert rated > 100
+    assert len(df) == rated
+    assert df['name'].head(100).tolist() == service.run('Top_Produits', use_cache=False, limit=100)['name'].tolist()
+
+
+def test_top_products_beyond_the_precomputed_ranking(service, query_service):
+    limit = query_service.LEADERBOARD_TOP_K + 50
+    df = service.run('Top_Produits', use_cache=False, limit=limit)
+
+    assert len(df) == limit
+    with service.cursor('Top_Produits', limit=limit) as cursor:
+        assert len(cursor.fetchall()) == limit
+
+
+def test_leaderboard_rejects_limits_outside_the_precomputed_ranking(service, query_service):
+    with pytest.raises(ValueError):
+        service.leaderboard(limit=-1)
+    with pytest.raises(ValueError):
+        service.leaderboard(limit=query_service.LEADERBOARD_TOP_K + 1)
+
+
+def test_top_products_on_a_database_without_rankings(query_service, market_db, tmp_path):
+    # Base au schéma 3, antérieure à la table product_rankings
+    db_path = str(tmp_path / "schema_v3.db")
+    shutil.copyfile(market_db, db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE product_rankings;")
+    conn.execute("PRAGMA user_version = 3;")
+    conn.commit()
+    conn.close()
+
+    service = query_service.QueryService(db_path)
+    try:
+        df = service.run('Top_Produits', use_cache=False, limit=10)
+        with service.cursor('Top_Produits', limit=10) as cursor:
+            rows = cursor.fetchall()
+        plan = service.explain('Top_Produits', limit=10)
+    finally:
+        service.close()
+
+    assert len(df) == 10
+    assert len(rows) == 10
+    assert not any("product_rankings" in detail for detail in plan)
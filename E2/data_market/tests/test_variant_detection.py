@@ -0,0 +1,43 @@
+import pandas as pd
+
+
+def products(urls, names):
+    return pd.DataFrame({
+        'product_id': range(1, len(urls) + 1),
+        'url': urls,
+        'name': names,
+        'description': None,
+        'brand_id': 1
+    })
+
+
+def test_short_number_suffix_keeps_distinct_products_apart(variant_detection):
+    variants = variant_detection.detect_variants(products(
+        ["https://shop.example/products/tent", "https://shop.example/products/tent-2",
+         "https://shop.example/products/tent-3"],
+        ["Tente 1 place", "Tente 2 places", "Tente 3 places"]
+    ))
+
+    assert variants['variant_group_id'].nunique() == 3
+    assert variants['canonical_slug'].tolist() == ["tent", "tent-2", "tent-3"]
+    assert (variants['match_type'] == 'unique').all()
+
+
+def test_short_number_suffix_groups_products_with_the_same_name(variant_detection):
+    variants = variant_detection.detect_variants(products(
+        ["https://shop.example/products/shirt", "https://shop.example/products/shirt-1"],
+        ["Chemise lin", "Chemise lin"]
+    ))
+
+    assert variants['variant_group_id'].tolist() == [1, 1]
+    assert variants['match_type'].tolist() == ['slug', 'slug']
+
+
+def test_article_code_suffix_always_groups(variant_detection):
+    variants = variant_detection.detect_variants(products(
+        ["https://shop.example/products/shoe-8551234", "https://shop.example/products/shoe-8551235"],
+        ["Chaussure running bleue", "Chaussure running noire"]
+    ))
+
+    assert variants['canonical_slug'].tolist() == ["shoe", "shoe"]
+    assert variants['variant_group_id'].tolist() == [1, 1]